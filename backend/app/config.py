@@ -1,29 +1,139 @@
+from pathlib import Path
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from typing import List
 
+# Las rutas de datos relativas se resuelven contra backend/, no contra el
+# directorio de trabajo del proceso.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Fijo: debe coincidir con vector(384) de brand_manual_chunks y
+# match_brand_manual_chunks en database.sql.
+EMBEDDING_DIMENSION = 384
+
 
 class Settings(BaseSettings):
     supabase_url: str = ""
     supabase_anon_key: str = ""
     supabase_service_key: str = ""
+
+    db_pool_max_connections: int = 100
+    db_pool_max_keepalive: int = 20
+    db_keepalive_expiry: float = 30.0
+    db_timeout: float = 30.0
+    llm_pool_max_connections: int = 50
+    llm_pool_max_keepalive: int = 20
+    llm_keepalive_expiry: float = 60.0
+    http_connect_timeout: float = 10.0
+    http_http2: bool = True
     
     groq_api_key: str = ""
+    groq_rpm: int = 30
+    groq_tpm: int = 12000
+    groq_timeout_seconds: float = 60.0
+    llm_cache_max_entries: int = 512
+    llm_cache_ttl_seconds: float = 86400.0
+    llm_cache_sqlite_path: str = ""
+    llm_cache_disk_max_mb: int = 256
+    llm_singleflight: bool = True
+    contenido_batch_concurrency: int = 4
+    contenido_batch_max_items: int = 50
+    jobs_workers: int = 4
+    jobs_timeout_seconds: float = 300.0
+    jobs_sqlite_path: str = "./data/jobs.sqlite3"
     gemini_api_key: str = ""
+    gemini_max_concurrency: int = 4
+    gemini_rpm: int = 10
+    gemini_tpm: int = 250000
+    gemini_timeout_seconds: float = 90.0
+    image_preprocess: bool = True
+    image_max_dimension: int = 1536
+    image_output_format: str = "webp"
+    image_quality: int = 80
+    image_pool_workers: int = 0
+    auditoria_max_image_mb: float = 10.0
+    auditoria_batch_concurrency: int = 4
+    auditoria_batch_max_items: int = 50
+    audit_cache_max_entries: int = 512
+    audit_cache_ttl_seconds: float = 604800.0
+    audit_cache_sqlite_path: str = "./data/audit_cache.sqlite3"
+    audit_cache_disk_max_mb: int = 64
+    rate_limit_overrides: str = ""
+
+    llm_retry_attempts: int = 3
+    llm_retry_initial_wait: float = 0.5
+    llm_retry_max_wait: float = 8.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_seconds: float = 30.0
     
     langfuse_public_key: str = ""
     langfuse_secret_key: str = ""
     langfuse_host: str = "https://cloud.langfuse.com"
+    langfuse_queue_max_size: int = 1000
+    langfuse_batch_size: int = 50
+    langfuse_flush_interval: float = 5.0
     
     jwt_secret_key: str = ""
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 1440
+
+    user_cache_ttl_seconds: float = 60.0
+    user_cache_max_size: int = 1024
+
+    password_pool_workers: int = 0
+    password_pool_max_pending: int = 64
+
+    stats_cache_ttl_seconds: float = 15.0
     
+    embedding_backend: str = "hashing"
+    embedding_dimension: int = EMBEDDING_DIMENSION
+    rag_chunk_tokens: int = 200
+    rag_top_k: int = 6
+    rag_context_token_budget: int = 1200
+    prompt_budget_groq: int = 6000
+    prompt_budget_gemini: int = 12000
+    manual_cache_max_entries: int = 128
+    manual_cache_ttl_seconds: float = 300.0
+    manual_cache_contexts_per_manual: int = 64
+
+    search_index_refresh_seconds: float = 300.0
+    search_use_embeddings: bool = False
+    search_embedding_weight: float = 0.5
+
+    blob_store_backend: str = "local"
+    blob_store_path: str = "./data/blobs"
+    blob_store_bucket: str = "auditorias"
+
     debug: bool = True
     cors_origins: str = "http://localhost:3000"
+    prewarm_clients: bool = True
 
     class Config:
         env_file = ".env"
 
+    @field_validator("embedding_dimension")
+    @classmethod
+    def check_embedding_dimension(cls, value: int) -> int:
+        if value != EMBEDDING_DIMENSION:
+            raise ValueError(
+                f"EMBEDDING_DIMENSION debe ser {EMBEDDING_DIMENSION}: la columna y la "
+                f"función de pgvector en database.sql usan vector({EMBEDDING_DIMENSION})"
+            )
+        return value
+
+    @field_validator(
+        "llm_cache_sqlite_path",
+        "jobs_sqlite_path",
+        "audit_cache_sqlite_path",
+        "blob_store_path",
+    )
+    @classmethod
+    def resolve_data_path(cls, value: str) -> str:
+        # Vacío desactiva el disco y ":memory:" es la base en memoria de SQLite.
+        if not value or value == ":memory:" or Path(value).is_absolute():
+            return value
+        return str(BACKEND_DIR / value)
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.cors_origins.split(",")]
@@ -1,21 +1,99 @@
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Optional
+
+import httpx
 from app.config import settings
+from app.http_pool import http_pools
+
+if TYPE_CHECKING:
+    from supabase import Client, AsyncClient
+
+# El SDK de Supabase (storage3 arrastra pyiceberg) se importa al primer uso.
+supabase: Optional["Client"] = None
+supabase_admin: Optional["Client"] = None
 
-supabase: Client = None
+async_supabase: Optional["AsyncClient"] = None
+http_client: Optional[httpx.AsyncClient] = None
 
 
-def get_supabase() -> Client:
+def get_supabase() -> "Client":
     global supabase
     if supabase is None:
+        from supabase import create_client, ClientOptions
+
         supabase = create_client(
             settings.supabase_url,
-            settings.supabase_anon_key
+            settings.supabase_anon_key,
+            ClientOptions(httpx_client=http_pools.get_sync("supabase")),
         )
     return supabase
 
 
-def get_supabase_admin() -> Client:
-    return create_client(
-        settings.supabase_url,
-        settings.supabase_service_key
-    )
+def get_supabase_admin() -> "Client":
+    """
+    Cliente con la service key. Se crea una sola vez y comparte el pool
+    sync de Supabase (antes cada llamada abría un pool nuevo).
+    """
+    global supabase_admin
+    if supabase_admin is None:
+        from supabase import create_client, ClientOptions
+
+        supabase_admin = create_client(
+            settings.supabase_url,
+            settings.supabase_service_key,
+            ClientOptions(httpx_client=http_pools.get_sync("supabase")),
+        )
+    return supabase_admin
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Obtiene el cliente HTTP compartido (pool keep-alive) usado por PostgREST.
+    """
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = http_pools.get_async("supabase")
+    return http_client
+
+
+def get_async_supabase() -> "AsyncClient":
+    """
+    Obtiene el cliente asíncrono de Supabase. Todas las consultas se
+    esperan con `await` y no bloquean el event loop.
+    """
+    global async_supabase
+    if async_supabase is None:
+        from supabase import AsyncClient, AsyncClientOptions
+
+        async_supabase = AsyncClient(
+            settings.supabase_url,
+            settings.supabase_anon_key,
+            AsyncClientOptions(httpx_client=get_http_client()),
+        )
+    return async_supabase
+
+
+def init_async_supabase(client: Optional[httpx.AsyncClient] = None) -> "AsyncClient":
+    """
+    Reinicia el cliente asíncrono, opcionalmente sobre un transporte propio
+    (benchmarks, pruebas locales).
+    """
+    global async_supabase, http_client
+    if client is not None:
+        http_client = client
+    async_supabase = None
+    return get_async_supabase()
+
+
+async def close_async_supabase() -> None:
+    global async_supabase, http_client
+    if http_client is not None:
+        await http_client.aclose()
+    http_client = None
+    async_supabase = None
+
+
+def close_supabase() -> None:
+    """Suelta los clientes sync; su pool lo cierra el registro de pools."""
+    global supabase, supabase_admin
+    supabase = None
+    supabase_admin = None
@@ -1,3 +1,3 @@
-from app.dependencies.auth import get_current_user, require_role, get_password_hash
+from app.dependencies.auth import get_current_user, require_role, get_password_hash, invalidate_user_cache, user_cache
 
-__all__ = ["get_current_user", "require_role", "get_password_hash"]
+__all__ = ["get_current_user", "require_role", "get_password_hash", "invalidate_user_cache", "user_cache"]
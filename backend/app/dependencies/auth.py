@@ -1,3 +1,6 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -6,12 +9,23 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 
 from app.config import settings
-from app.database import get_supabase
+from app.repositories import users_repo
 from app.models.user import UserResponse, TokenData, UserRole
+from app.services.cache import TTLCache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+user_cache = TTLCache(
+    max_size=settings.user_cache_max_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+    name="users",
+)
+
+
+def invalidate_user_cache(user_id: str) -> None:
+    user_cache.invalidate(user_id)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -21,6 +35,68 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+password_executor: Optional[ThreadPoolExecutor] = None
+password_pending = 0
+
+
+def get_password_pool_size() -> int:
+    return settings.password_pool_workers or os.cpu_count() or 1
+
+
+def get_password_executor() -> ThreadPoolExecutor:
+    """
+    Pool dedicado para bcrypt. bcrypt libera el GIL, así que el hashing
+    corre en paralelo fuera del event loop.
+    """
+    global password_executor
+    if password_executor is None:
+        password_executor = ThreadPoolExecutor(
+            max_workers=get_password_pool_size(), thread_name_prefix="bcrypt"
+        )
+    return password_executor
+
+
+async def run_password_task(func, *args):
+    global password_pending
+    if password_pending >= settings.password_pool_max_pending:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, intenta nuevamente",
+            headers={"Retry-After": "1"},
+        )
+
+    password_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_password_executor(), func, *args)
+    finally:
+        password_pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_password_task(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await run_password_task(get_password_hash, password)
+
+
+def shutdown_password_executor() -> None:
+    global password_executor
+    if password_executor is not None:
+        password_executor.shutdown(wait=False, cancel_futures=True)
+    password_executor = None
+
+
+def get_password_pool_stats() -> dict:
+    return {
+        "workers": get_password_pool_size(),
+        "started": password_executor is not None,
+        "pending": password_pending,
+        "max_pending": settings.password_pool_max_pending,
+    }
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -56,14 +132,18 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserResponse:
     except JWTError:
         raise credentials_exception
 
-    supabase = get_supabase()
-    response = supabase.table("users").select("*").eq("id", token_data.user_id).execute()
+    cached_user = user_cache.get(token_data.user_id)
+    if cached_user is not None:
+        return cached_user
+
+    user_data = await users_repo.get_by_id(token_data.user_id)
     
-    if not response.data:
+    if not user_data:
         raise credentials_exception
     
-    user_data = response.data[0]
-    return UserResponse(**user_data)
+    user = UserResponse(**user_data)
+    user_cache.set(token_data.user_id, user)
+    return user
 
 
 def require_role(allowed_roles: list[UserRole]):
@@ -0,0 +1,39 @@
+from typing import Any, Dict, Iterable, List, Optional
+from fastapi import HTTPException, Query, Response, status
+
+from app.repositories import BaseRepository, InvalidCursorError, InvalidFieldsError, resolve_columns
+
+
+class PageParams:
+    """Parámetros de paginación keyset y proyección (`fields=`)."""
+
+    def __init__(
+        self,
+        limit: int = Query(50, ge=1, le=200),
+        cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor"),
+        fields: Optional[str] = Query(None, description="Campos separados por comas"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = fields
+
+
+async def fetch_page(
+    repo: BaseRepository,
+    params: PageParams,
+    response: Response,
+    allowed_fields: Iterable[str],
+    default_fields: Iterable[str],
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    try:
+        columns = resolve_columns(params.fields, allowed_fields, default_fields)
+        rows, next_cursor = await repo.page(
+            filters=filters, columns=columns, limit=params.limit, cursor=params.cursor
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
@@ -0,0 +1,44 @@
+import hashlib
+from typing import Tuple
+from fastapi import HTTPException, UploadFile
+
+from app.config import settings
+from app.services.blob_store import CHUNK_SIZE
+
+
+def get_max_upload_bytes() -> int:
+    return int(settings.auditoria_max_image_mb * 1024 * 1024)
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        # El nombre de la constante 413 cambió entre versiones de Starlette.
+        status_code=413,
+        detail=f"La imagen supera el máximo de {settings.auditoria_max_image_mb:g} MB",
+    )
+
+
+async def read_limited_upload(upload: UploadFile) -> Tuple[bytes, str]:
+    """
+    Lee un archivo subido por bloques, calculando el SHA-256 en el camino
+    y cortando con 413 apenas supera el máximo (sin leer el resto).
+    Devuelve (bytes, sha256).
+    """
+    max_bytes = get_max_upload_bytes()
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large()
+
+    hasher = hashlib.sha256()
+    chunks = []
+    total = 0
+    while True:
+        chunk = await upload.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise _too_large()
+        hasher.update(chunk)
+        chunks.append(chunk)
+
+    return b"".join(chunks), hasher.hexdigest()
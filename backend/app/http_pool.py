@@ -0,0 +1,213 @@
+import logging
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+HTTPClient = Union[httpx.AsyncClient, httpx.Client]
+
+
+class PoolConfig:
+    def __init__(
+        self,
+        max_connections: Callable[[], int],
+        max_keepalive: Callable[[], int],
+        keepalive_expiry: Callable[[], float],
+        timeout: Callable[[], float],
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+
+
+# Se leen de settings al crear cada pool (los tests pueden cambiarlos antes).
+POOLS: Dict[str, PoolConfig] = {
+    "supabase": PoolConfig(
+        lambda: settings.db_pool_max_connections,
+        lambda: settings.db_pool_max_keepalive,
+        lambda: settings.db_keepalive_expiry,
+        lambda: settings.db_timeout,
+    ),
+    "groq": PoolConfig(
+        lambda: settings.llm_pool_max_connections,
+        lambda: settings.llm_pool_max_keepalive,
+        lambda: settings.llm_keepalive_expiry,
+        lambda: settings.groq_timeout_seconds,
+    ),
+    "gemini": PoolConfig(
+        lambda: settings.llm_pool_max_connections,
+        lambda: settings.llm_pool_max_keepalive,
+        lambda: settings.llm_keepalive_expiry,
+        lambda: settings.gemini_timeout_seconds,
+    ),
+    "langfuse": PoolConfig(
+        lambda: 10,
+        lambda: 5,
+        lambda: settings.llm_keepalive_expiry,
+        lambda: 10.0,
+    ),
+}
+
+
+class PoolMetrics:
+    """Contadores de uso de un pool, alimentados por los event hooks de httpx."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self._seen: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+    def track_connections(self, connections: list) -> None:
+        # Cada conexión nueva en el pool es un handshake TCP/TLS.
+        for connection in connections:
+            if connection not in self._seen:
+                self._seen.add(connection)
+                self.connections_opened += 1
+
+
+def _pool(client: Optional[HTTPClient]):
+    # httpx no expone el estado del pool: se lee del pool de httpcore.
+    return getattr(getattr(client, "_transport", None), "_pool", None)
+
+
+def _pool_connections(client: Optional[HTTPClient]) -> list:
+    return list(getattr(_pool(client), "connections", None) or [])
+
+
+def _pool_requests(client: Optional[HTTPClient]) -> list:
+    return list(getattr(_pool(client), "_requests", None) or [])
+
+
+class HTTPPoolRegistry:
+    """
+    Pools HTTP compartidos (keep-alive, HTTP/2) por destino: Supabase,
+    Groq, Gemini y Langfuse toman su cliente httpx de aquí en vez de crear
+    el propio. Se crean en el `lifespan` y se cierran al apagar; si algo
+    pide un cliente antes (scripts, benchmarks) se crea bajo demanda.
+    """
+
+    def __init__(self, pools: Dict[str, PoolConfig]):
+        self.pools = pools
+        self._async: Dict[str, httpx.AsyncClient] = {}
+        self._sync: Dict[str, httpx.Client] = {}
+        self._metrics: Dict[str, PoolMetrics] = {}
+
+    def _client_kwargs(
+        self, name: str, metrics: PoolMetrics, is_async: bool
+    ) -> Tuple[Dict[str, Any], Dict[str, HTTPClient]]:
+        config = self.pools[name]
+        holder: Dict[str, HTTPClient] = {}
+
+        def on_request(request):
+            metrics.requests += 1
+
+        def on_response(response):
+            metrics.track_connections(_pool_connections(holder["client"]))
+
+        async def on_request_async(request):
+            on_request(request)
+
+        async def on_response_async(response):
+            on_response(response)
+
+        kwargs = {
+            "limits": httpx.Limits(
+                max_connections=config.max_connections(),
+                max_keepalive_connections=config.max_keepalive(),
+                keepalive_expiry=config.keepalive_expiry(),
+            ),
+            "timeout": httpx.Timeout(config.timeout(), connect=settings.http_connect_timeout),
+            "follow_redirects": True,
+            "http2": settings.http_http2,
+            "event_hooks": {
+                "request": [on_request_async if is_async else on_request],
+                "response": [on_response_async if is_async else on_response],
+            },
+        }
+        return kwargs, holder
+
+    def _metrics_for(self, name: str) -> PoolMetrics:
+        if name not in self._metrics:
+            self._metrics[name] = PoolMetrics()
+        return self._metrics[name]
+
+    def get_async(self, name: str) -> httpx.AsyncClient:
+        client = self._async.get(name)
+        if client is None or client.is_closed:
+            kwargs, holder = self._client_kwargs(name, self._metrics_for(name), is_async=True)
+            client = httpx.AsyncClient(**kwargs)
+            holder["client"] = client
+            self._async[name] = client
+        return client
+
+    def get_sync(self, name: str) -> httpx.Client:
+        client = self._sync.get(name)
+        if client is None or client.is_closed:
+            kwargs, holder = self._client_kwargs(name, self._metrics_for(name), is_async=False)
+            client = httpx.Client(**kwargs)
+            holder["client"] = client
+            self._sync[name] = client
+        return client
+
+    def start(self) -> None:
+        """Crea los pools async (sin abrir conexiones todavía)."""
+        for name in self.pools:
+            if name != "langfuse":
+                self.get_async(name)
+
+    async def aclose(self) -> None:
+        for name, client in list(self._async.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP pool {name}: {e}")
+        for name, client in list(self._sync.items()):
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP pool {name}: {e}")
+        self._async.clear()
+        self._sync.clear()
+
+    def _client_stats(self, name: str, client: Optional[HTTPClient]) -> Dict[str, Any]:
+        connections = _pool_connections(client)
+        requests = _pool_requests(client)
+        idle = sum(1 for connection in connections if connection.is_idle())
+        http2 = sum(1 for connection in connections if connection.info().startswith("HTTP/2"))
+        max_connections = self.pools[name].max_connections()
+        return {
+            "connections": len(connections),
+            "active": len(connections) - idle,
+            "idle": idle,
+            "http2": http2,
+            "in_flight": len(requests),
+            "queued": sum(1 for request in requests if request.is_queued()),
+            "max_connections": max_connections,
+            "utilization": round((len(connections) - idle) / max_connections, 4) if max_connections else 0.0,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        result = {}
+        for name in self.pools:
+            metrics = self._metrics.get(name)
+            if metrics is None:
+                continue
+            client = self._async.get(name) or self._sync.get(name)
+            reuse = (
+                1 - metrics.connections_opened / metrics.requests if metrics.requests else 0.0
+            )
+            result[name] = {
+                **self._client_stats(name, client),
+                "requests": metrics.requests,
+                "connections_opened": metrics.connections_opened,
+                "connection_reuse_ratio": round(max(0.0, reuse), 4),
+            }
+        return result
+
+
+http_pools = HTTPPoolRegistry(POOLS)
@@ -3,14 +3,48 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.routers import auth_router, brand_router, contenido_router, auditoria_router
+from app.database import close_async_supabase, close_supabase
+from app.dependencies.auth import user_cache, shutdown_password_executor, get_password_pool_stats
+from app.services.gemini_service import vision_limiter, vision_flight, close_gemini_client
+from app.services.image_pipeline import image_stats, shutdown_image_executor
+from app.services.groq_service import groq_flight, close_groq_client
+from app.http_pool import http_pools
+from app.services.rate_limit import get_rate_limit_stats
+from app.services.resilience import get_resilience_stats
+from app.services.prompt_builder import prompt_stats
+from app.services.langfuse_service import trace_exporter, shutdown_langfuse
+from app.services.search_index import manual_search_index
+from app.services.manual_cache import brand_manual_cache
+from app.services.llm_cache import get_llm_cache, close_llm_cache
+from app.services.audit_cache import get_audit_cache, close_audit_cache
+from app.services.jobs import job_queue
+from app.services.warmup import client_warmup
+from app.routers import auth_router, brand_router, contenido_router, auditoria_router, stats_router, jobs_router
+from app.routers.stats import stats_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Content Suite API iniciando...")
     print(f"Debug mode: {settings.debug}")
+    http_pools.start()
+    trace_exporter.start()
+    await job_queue.start()
+    client_warmup.start()
     yield
+    await client_warmup.stop()
+    await job_queue.stop()
+    await trace_exporter.stop()
+    await close_async_supabase()
+    shutdown_password_executor()
+    shutdown_image_executor()
+    close_llm_cache()
+    close_audit_cache()
+    shutdown_langfuse()
+    close_groq_client()
+    close_gemini_client()
+    close_supabase()
+    await http_pools.aclose()
     print("Content Suite API cerrando...")
 
 
@@ -29,12 +63,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Location"],
 )
 
 app.include_router(auth_router)
 app.include_router(brand_router)
 app.include_router(contenido_router)
 app.include_router(auditoria_router)
+app.include_router(stats_router)
+app.include_router(jobs_router)
 
 
 @app.get("/")
@@ -50,3 +87,29 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "user_cache": user_cache.stats(),
+        "password_pool": get_password_pool_stats(),
+        "warmup": client_warmup.stats(),
+        "http_pools": http_pools.stats(),
+        "gemini_vision": vision_limiter.stats(),
+        "image_preprocess": image_stats.stats(),
+        "rate_limits": get_rate_limit_stats(),
+        "resilience": get_resilience_stats(),
+        "prompts": prompt_stats.stats(),
+        "singleflight": {
+            "groq": groq_flight.stats(),
+            "gemini_vision": vision_flight.stats(),
+        },
+        "langfuse_exporter": trace_exporter.stats(),
+        "stats_cache": stats_cache.stats(),
+        "manual_search_index": manual_search_index.stats(),
+        "brand_manual_cache": brand_manual_cache.stats(),
+        "llm_cache": get_llm_cache().stats(),
+        "audit_cache": get_audit_cache().stats(),
+        "jobs": await job_queue.stats(),
+    }
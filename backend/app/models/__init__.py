@@ -1,11 +1,12 @@
-from app.models.user import UserRole, UserCreate, UserLogin, UserResponse, Token, TokenData
-from app.models.brand_manual import BrandManualCreate, BrandManualUpdate, BrandManualResponse
-from app.models.contenido import ContenidoCreate, ContenidoUpdate, ContenidoResponse, TipoContenido, EstadoContenido
-from app.models.auditoria import AuditoriaCreate, AuditoriaResponse
+from app.models.user import UserRole, UserCreate, UserUpdate, UserLogin, UserResponse, Token, TokenData
+from app.models.brand_manual import BrandManualCreate, BrandManualUpdate, BrandManualResponse, BrandManualSummary
+from app.models.contenido import ContenidoCreate, ContenidoBatchCreate, ContenidoBatchItem, ContenidoUpdate, ContenidoResponse, ContenidoSummary, TipoContenido, EstadoContenido
+from app.models.auditoria import AuditoriaCreate, AuditoriaResponse, AuditoriaSummary
 
 __all__ = [
     "UserRole",
     "UserCreate", 
+    "UserUpdate",
     "UserLogin",
     "UserResponse",
     "Token",
@@ -13,11 +14,16 @@ __all__ = [
     "BrandManualCreate",
     "BrandManualUpdate",
     "BrandManualResponse",
+    "BrandManualSummary",
     "ContenidoCreate",
+    "ContenidoBatchCreate",
+    "ContenidoBatchItem",
     "ContenidoUpdate",
     "ContenidoResponse",
+    "ContenidoSummary",
     "TipoContenido",
     "EstadoContenido",
     "AuditoriaCreate",
     "AuditoriaResponse",
+    "AuditoriaSummary",
 ]
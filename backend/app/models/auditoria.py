@@ -12,6 +12,7 @@ class AuditoriaResponse(BaseModel):
     id: str
     contenido_id: str
     imagen_url: Optional[str] = None
+    imagen_sha256: Optional[str] = None
     resultado: Optional[Dict[str, Any]] = None
     gemini_analysis: Optional[str] = None
     score_conformidad: Optional[float] = None
@@ -20,3 +21,21 @@ class AuditoriaResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class AuditoriaSummary(BaseModel):
+    id: str
+    contenido_id: Optional[str] = None
+    imagen_url: Optional[str] = None
+    imagen_sha256: Optional[str] = None
+    resultado: Optional[Dict[str, Any]] = None
+    gemini_analysis: Optional[str] = None
+    score_conformidad: Optional[float] = None
+    audited_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+AUDITORIA_FIELDS = list(AuditoriaSummary.model_fields)
+AUDITORIA_SUMMARY_FIELDS = [
+    f for f in AUDITORIA_FIELDS if f not in ("imagen_url", "gemini_analysis")
+]
@@ -34,3 +34,21 @@ class BrandManualResponse(BrandManualBase):
 
     class Config:
         from_attributes = True
+
+
+class BrandManualSummary(BaseModel):
+    id: str
+    nombre: Optional[str] = None
+    producto: Optional[str] = None
+    tono: Optional[str] = None
+    público_objetivo: Optional[str] = None
+    restricciones: Optional[str] = None
+    contenido_markdown: Optional[str] = None
+    version: Optional[int] = None
+    created_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+BRAND_MANUAL_FIELDS = list(BrandManualSummary.model_fields)
+BRAND_MANUAL_SUMMARY_FIELDS = [f for f in BRAND_MANUAL_FIELDS if f != "contenido_markdown"]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -23,6 +23,17 @@ class ContenidoBase(BaseModel):
 
 class ContenidoCreate(ContenidoBase):
     brand_manual_id: str
+    use_cache: bool = False
+
+
+class ContenidoBatchItem(ContenidoBase):
+    pass
+
+
+class ContenidoBatchCreate(BaseModel):
+    brand_manual_id: str
+    items: List[ContenidoBatchItem] = Field(..., min_length=1)
+    use_cache: bool = False
 
 
 class ContenidoUpdate(BaseModel):
@@ -43,3 +54,21 @@ class ContenidoResponse(ContenidoBase):
 
     class Config:
         from_attributes = True
+
+
+class ContenidoSummary(BaseModel):
+    id: str
+    brand_manual_id: Optional[str] = None
+    tipo: Optional[TipoContenido] = None
+    titulo: Optional[str] = None
+    contenido_text: Optional[str] = None
+    estado: Optional[str] = None
+    aprobado_por: Optional[str] = None
+    rechazo_razon: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+CONTENIDO_FIELDS = list(ContenidoSummary.model_fields)
+CONTENIDO_SUMMARY_FIELDS = [f for f in CONTENIDO_FIELDS if f != "contenido_text"]
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import Optional, Any, Dict
+from datetime import datetime
+from enum import Enum
+
+
+class TipoJob(str, Enum):
+    BRAND_MANUAL = "brand_manual"
+    CONTENIDO = "contenido"
+    AUDITORIA = "auditoria"
+
+
+class EstadoJob(str, Enum):
+    EN_COLA = "en_cola"
+    EJECUTANDO = "ejecutando"
+    COMPLETADO = "completado"
+    FALLIDO = "fallido"
+    CANCELADO = "cancelado"
+
+
+ESTADOS_FINALES = {EstadoJob.COMPLETADO.value, EstadoJob.FALLIDO.value, EstadoJob.CANCELADO.value}
+
+
+class JobResponse(BaseModel):
+    id: str
+    tipo: TipoJob
+    estado: EstadoJob
+    resultado: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    intentos: int = 0
+    created_by: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    queue_ms: Optional[float] = None
+    run_ms: Optional[float] = None
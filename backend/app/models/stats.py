@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, List
+from datetime import datetime
+
+
+class ManualContentCount(BaseModel):
+    brand_manual_id: str
+    nombre: Optional[str] = None
+    total: int
+
+
+class ScoreBucket(BaseModel):
+    desde: float
+    hasta: float
+    total: int
+
+
+class AuditoriaStats(BaseModel):
+    promedio_score: Optional[float] = None
+    minimo_score: Optional[float] = None
+    maximo_score: Optional[float] = None
+    cumple: int = 0
+    no_cumple: int = 0
+    distribucion: List[ScoreBucket] = []
+
+
+class DashboardStats(BaseModel):
+    total_manuals: int
+    total_contenidos: int
+    total_auditorias: int
+    contenido_por_estado: Dict[str, int] = {}
+    contenido_por_tipo: Dict[str, int] = {}
+    contenido_por_manual: List[ManualContentCount] = []
+    auditorias: AuditoriaStats
+    generated_at: datetime
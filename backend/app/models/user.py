@@ -21,6 +21,11 @@ class UserCreate(UserBase):
     role: UserRole = UserRole.CREADOR
 
 
+class UserUpdate(BaseModel):
+    role: Optional[UserRole] = None
+    is_active: Optional[bool] = None
+
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -0,0 +1,27 @@
+from app.repositories.base import BaseRepository
+from app.repositories.pagination import InvalidCursorError, InvalidFieldsError, resolve_columns
+from app.repositories.users import UserRepository, users_repo
+from app.repositories.brand_manuals import BrandManualRepository, brand_manuals_repo
+from app.repositories.contenido import ContenidoRepository, contenido_repo
+from app.repositories.auditorias import AuditoriaRepository, auditorias_repo
+from app.repositories.brand_manual_chunks import BrandManualChunkRepository, brand_manual_chunks_repo
+from app.repositories.stats import StatsRepository, stats_repo
+
+__all__ = [
+    "BaseRepository",
+    "InvalidCursorError",
+    "InvalidFieldsError",
+    "resolve_columns",
+    "UserRepository",
+    "BrandManualRepository",
+    "ContenidoRepository",
+    "AuditoriaRepository",
+    "BrandManualChunkRepository",
+    "StatsRepository",
+    "users_repo",
+    "brand_manuals_repo",
+    "contenido_repo",
+    "auditorias_repo",
+    "brand_manual_chunks_repo",
+    "stats_repo",
+]
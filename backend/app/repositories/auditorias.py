@@ -0,0 +1,22 @@
+from typing import Optional, Dict, Any, List
+from app.repositories.base import BaseRepository
+
+
+class AuditoriaRepository(BaseRepository):
+    table_name = "auditorias"
+
+    async def list_legacy_images(self, after_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        """Filas que aún guardan la imagen como data URL en `imagen_url`."""
+        query = (
+            self.table()
+            .select("id,imagen_url")
+            .is_("imagen_sha256", "null")
+            .like("imagen_url", "data:%")
+        )
+        if after_id:
+            query = query.gt("id", after_id)
+        response = await query.order("id").limit(limit).execute()
+        return response.data or []
+
+
+auditorias_repo = AuditoriaRepository()
@@ -0,0 +1,93 @@
+from typing import Optional, Dict, Any, List, Tuple
+from app.database import get_async_supabase
+from app.repositories.pagination import encode_cursor, decode_cursor
+
+
+class BaseRepository:
+    """
+    Acceso asíncrono a una tabla de Supabase. Todas las consultas pasan
+    por el cliente async con pool keep-alive, sin bloquear el event loop.
+    """
+
+    table_name: str = ""
+
+    def table(self):
+        return get_async_supabase().table(self.table_name)
+
+    async def get_by_id(self, record_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+        return await self.find_one("id", record_id, columns=columns)
+
+    async def find_one(self, column: str, value: Any, columns: str = "*") -> Optional[Dict[str, Any]]:
+        response = await self.table().select(columns).eq(column, value).limit(1).execute()
+        return response.data[0] if response.data else None
+
+    async def list(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: str = "*",
+        order_by: Optional[str] = "created_at",
+        desc: bool = True,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        query = self.table().select(columns)
+        for column, value in (filters or {}).items():
+            if value is not None:
+                query = query.eq(column, value)
+        if order_by:
+            query = query.order(order_by, desc=desc)
+        if limit is not None:
+            query = query.limit(limit)
+        response = await query.execute()
+        return response.data or []
+
+    async def page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: str = "*",
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Paginación keyset sobre (created_at, id) descendente. Devuelve las
+        filas y el cursor de la página siguiente (None si no hay más).
+        """
+        query = self.table().select(columns)
+        for column, value in (filters or {}).items():
+            if value is not None:
+                query = query.eq(column, value)
+        if cursor:
+            created_at, record_id = decode_cursor(cursor)
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt.{record_id})'
+            )
+        response = await (
+            query.order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit + 1)
+            .execute()
+        )
+        rows = response.data or []
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, encode_cursor(rows[-1])
+        return rows, None
+
+    async def insert(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await self.table().insert(data).execute()
+        return response.data[0] if response.data else None
+
+    async def insert_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Inserta varias filas en una sola petición."""
+        if not rows:
+            return []
+        response = await self.table().insert(rows).execute()
+        return response.data or []
+
+    async def update(self, record_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        response = await self.table().update(data).eq("id", record_id).execute()
+        return response.data[0] if response.data else None
+
+    async def delete(self, record_id: str) -> Optional[Dict[str, Any]]:
+        response = await self.table().delete().eq("id", record_id).execute()
+        return response.data[0] if response.data else None
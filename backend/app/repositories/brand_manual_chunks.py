@@ -0,0 +1,33 @@
+from typing import Dict, Any, List
+from app.database import get_async_supabase
+from app.repositories.base import BaseRepository
+
+
+class BrandManualChunkRepository(BaseRepository):
+    table_name = "brand_manual_chunks"
+
+    async def replace_for_manual(self, manual_id: str, rows: List[Dict[str, Any]]) -> int:
+        """
+        Reemplaza todos los fragmentos de un manual de forma atómica (DELETE
+        e INSERT en la misma transacción, vía `replace_brand_manual_chunks`).
+        """
+        response = await get_async_supabase().rpc(
+            "replace_brand_manual_chunks",
+            {"manual_id": manual_id, "chunks": rows},
+        ).execute()
+        return response.data or 0
+
+    async def match(self, manual_id: str, query_embedding: str, match_count: int) -> List[Dict[str, Any]]:
+        """Top-k fragmentos del manual por similitud coseno (ranking exacto)."""
+        response = await get_async_supabase().rpc(
+            "match_brand_manual_chunks",
+            {
+                "manual_id": manual_id,
+                "query_embedding": query_embedding,
+                "match_count": match_count,
+            },
+        ).execute()
+        return response.data or []
+
+
+brand_manual_chunks_repo = BrandManualChunkRepository()
@@ -0,0 +1,28 @@
+from typing import Optional, Dict, Any
+from app.repositories.base import BaseRepository
+
+
+class BrandManualRepository(BaseRepository):
+    table_name = "brand_manuals"
+
+    async def get_latest(self) -> Optional[Dict[str, Any]]:
+        rows = await self.list(limit=1)
+        return rows[0] if rows else None
+
+    async def update_if_version(
+        self, record_id: str, version: Optional[int], data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Actualiza solo si la fila sigue en `version` (control optimista).
+        Devuelve None si no existe o si otra escritura ya cambió la versión.
+        """
+        query = self.table().update(data).eq("id", record_id)
+        if version is None:
+            query = query.is_("version", "null")
+        else:
+            query = query.eq("version", version)
+        response = await query.execute()
+        return response.data[0] if response.data else None
+
+
+brand_manuals_repo = BrandManualRepository()
@@ -0,0 +1,8 @@
+from app.repositories.base import BaseRepository
+
+
+class ContenidoRepository(BaseRepository):
+    table_name = "contenido"
+
+
+contenido_repo = ContenidoRepository()
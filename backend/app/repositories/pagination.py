@@ -0,0 +1,53 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class InvalidFieldsError(ValueError):
+    pass
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Cursor opaco con la clave de orden (created_at, id) de la última fila."""
+    payload = json.dumps([str(row["created_at"]), str(row["id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        # Validar evita inyectar operadores en el filtro de PostgREST
+        datetime.fromisoformat(created_at)
+        return created_at, str(uuid.UUID(record_id))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Cursor inválido") from e
+
+
+def resolve_columns(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    default: Iterable[str],
+) -> str:
+    """
+    Convierte el parámetro `fields=` (lista separada por comas) en la
+    proyección de columnas. La clave de orden siempre se incluye.
+    """
+    allowed = list(allowed)
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in allowed]
+        if unknown:
+            raise InvalidFieldsError(f"Campos no permitidos: {', '.join(unknown)}")
+    else:
+        requested = list(default)
+
+    columns: List[str] = ["id", "created_at"]
+    columns += [f for f in requested if f not in columns]
+    return ",".join(columns)
@@ -0,0 +1,13 @@
+from typing import Dict, Any
+from app.database import get_async_supabase
+
+
+class StatsRepository:
+    """Agregados del dashboard calculados en Postgres (función dashboard_stats)."""
+
+    async def dashboard_stats(self) -> Dict[str, Any]:
+        response = await get_async_supabase().rpc("dashboard_stats").execute()
+        return response.data or {}
+
+
+stats_repo = StatsRepository()
@@ -0,0 +1,12 @@
+from typing import Optional, Dict, Any
+from app.repositories.base import BaseRepository
+
+
+class UserRepository(BaseRepository):
+    table_name = "users"
+
+    async def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return await self.find_one("email", email)
+
+
+users_repo = UserRepository()
@@ -1,36 +1,43 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import JSONResponse, PlainTextResponse
-from app.database import get_supabase
+import asyncio
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from app.config import settings
+from app.repositories import contenido_repo, auditorias_repo
+from app.models.brand_manual import BrandManualResponse
 from app.models.user import UserResponse
-from app.models.auditoria import AuditoriaCreate, AuditoriaResponse
+from app.models.auditoria import (
+    AuditoriaCreate,
+    AuditoriaResponse,
+    AuditoriaSummary,
+    AUDITORIA_FIELDS,
+    AUDITORIA_SUMMARY_FIELDS,
+)
 from app.dependencies.auth import get_current_user, require_role
+from app.dependencies.pagination import PageParams, fetch_page
+from app.dependencies.uploads import read_limited_upload
 from app.models.user import UserRole
-from app.services import analyze_image, get_brand_manual_by_id, format_brand_context
+from app.models.job import JobResponse, TipoJob
+from app.services import analyze_image, get_brand_manual_by_id, build_brand_context
+from app.services.audit_cache import get_audit_cache, make_audit_cache_key
+from app.services.gemini_service import VISION_MODEL
+from app.services.concurrency import ConcurrencyLimiter
+from app.services.sse import ndjson_line, NDJSON_MEDIA_TYPE, SSE_HEADERS
+from app.services.blob_store import get_blob_store, compute_sha256
+from app.services.jobs import job_queue
+from app.services.media import sniff_mime_type
 import base64
 
 router = APIRouter(prefix="/api/auditoria", tags=["Governance & Audit"])
 
 
-@router.post("/image")
-async def audit_image(
-    contenido_id: str = Form(...),
-    image: UploadFile = File(...),
-    current_user: UserResponse = Depends(
-        require_role([UserRole.APROBADOR_B, UserRole.ADMIN])
-    ),
-):
-    supabase = get_supabase()
-
-    contenido_response = (
-        supabase.table("contenido").select("*").eq("id", contenido_id).execute()
-    )
-    if not contenido_response.data:
+async def _load_audit_target(contenido_id: str) -> Tuple[dict, BrandManualResponse]:
+    contenido = await contenido_repo.get_by_id(contenido_id)
+    if not contenido:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contenido no encontrado"
         )
 
-    contenido = contenido_response.data[0]
     manual = await get_brand_manual_by_id(contenido["brand_manual_id"])
 
     if not manual:
@@ -38,98 +45,468 @@ async def audit_image(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Manual de marca no encontrado",
         )
+    return contenido, manual
+
+
+def _audit_cache_key(contenido: dict, manual: BrandManualResponse, image_sha256: str) -> str:
+    return make_audit_cache_key(
+        image_sha256,
+        contenido["id"],
+        contenido.get("updated_at"),
+        manual.id,
+        manual.version,
+        VISION_MODEL,
+    )
+
 
-    brand_context = format_brand_context(manual)
+async def _get_cached_audit(cache_key: str) -> Optional[dict]:
+    cached = await get_audit_cache().get(cache_key)
+    if not cached:
+        return None
+    existing = await auditorias_repo.get_by_id(cached["auditoria_id"])
+    if not existing:
+        return None
+    return {
+        "auditoria": AuditoriaResponse(**existing),
+        "analisis": cached["analysis"],
+        "score": cached["score"],
+        "cached": True,
+    }
 
-    image_data = await image.read()
-    image_base64 = base64.b64encode(image_data).decode("utf-8")
 
-    result = await analyze_image(
-        image_data=image_base64,
+async def _brand_context_for(contenido: dict, manual: BrandManualResponse) -> str:
+    return await build_brand_context(
+        manual, query=contenido.get("contenido_text") or contenido.get("titulo") or ""
+    )
+
+
+async def _analyze(
+    contenido: dict, brand_context: str, image_data: bytes, image_sha256: str
+) -> dict:
+    return await analyze_image(
+        image_data=image_data,
         brand_manual_context=brand_context,
         contenido_text=contenido.get("contenido_text", ""),
+        image_sha256=image_sha256,
     )
 
-    if not result["success"]:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al analizar imagen: {result.get('error')}",
-        )
 
-    auditoria_data = {
+def _auditoria_record(contenido_id: str, image_sha256: str, result: dict, user_id: str) -> dict:
+    return {
         "contenido_id": contenido_id,
-        "imagen_url": f"data:{image.content_type};base64,{image_base64}",
+        "imagen_sha256": image_sha256,
         "resultado": {
             "cumple": result.get("score", 0) >= 0.7,
             "score": result.get("score", 0),
         },
         "gemini_analysis": result.get("analysis", ""),
         "score_conformidad": result.get("score", 0),
-        "audited_by": current_user.id,
+        "audited_by": user_id,
     }
 
-    response = supabase.table("auditorias").insert(auditoria_data).execute()
 
-    if not response.data:
+async def _cache_audit(cache_key: str, created: dict, result: dict) -> None:
+    await get_audit_cache().set(
+        cache_key,
+        {
+            "auditoria_id": created["id"],
+            "analysis": result.get("analysis", ""),
+            "score": result.get("score", 0),
+            "usage": result.get("usage") or {},
+        },
+    )
+
+
+async def _audit_and_save(
+    contenido_id: str,
+    image_data: bytes,
+    image_sha256: str,
+    user_id: str,
+    force: bool = False,
+) -> dict:
+    contenido, manual = await _load_audit_target(contenido_id)
+    return await _audit_target_and_save(
+        contenido, manual, image_data, image_sha256, user_id, force=force
+    )
+
+
+async def _audit_target_and_save(
+    contenido: dict,
+    manual: BrandManualResponse,
+    image_data: bytes,
+    image_sha256: str,
+    user_id: str,
+    force: bool = False,
+) -> dict:
+    contenido_id = contenido["id"]
+    cache_key = _audit_cache_key(contenido, manual, image_sha256)
+    if not force:
+        cached = await _get_cached_audit(cache_key)
+        if cached:
+            return cached
+
+    brand_context = await _brand_context_for(contenido, manual)
+    result = await _analyze(contenido, brand_context, image_data, image_sha256)
+
+    if not result["success"]:
         raise HTTPException(
-            status_code=status.HTTP_500_SERVER_ERROR,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al analizar imagen: {result.get('error')}",
+        )
+
+    created = await auditorias_repo.insert(
+        _auditoria_record(contenido_id, image_sha256, result, user_id)
+    )
+
+    if not created:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al guardar auditoría",
         )
 
+    await _cache_audit(cache_key, created, result)
+
     return {
-        "auditoria": AuditoriaResponse(**response.data[0]),
+        "auditoria": AuditoriaResponse(**created),
         "analisis": result.get("analysis", ""),
         "score": result.get("score", 0),
+        "cached": False,
     }
 
 
-@router.get("/contenido/{contenido_id}", response_model=List[AuditoriaResponse])
+async def _store_upload(image: UploadFile) -> Tuple[bytes, str]:
+    image_data, image_sha256 = await read_limited_upload(image)
+    await get_blob_store().put(
+        image_data,
+        content_type=sniff_mime_type(image_data, default=image.content_type),
+        key=image_sha256,
+    )
+    return image_data, image_sha256
+
+
+async def run_auditoria_job(payload: dict) -> dict:
+    image_data = await get_blob_store().get(payload["imagen_sha256"])
+    if image_data is None:
+        raise ValueError("Imagen no encontrada en el almacenamiento")
+
+    result = await _audit_and_save(
+        payload["contenido_id"],
+        image_data,
+        payload["imagen_sha256"],
+        payload["user_id"],
+        force=payload.get("force", False),
+    )
+    return {**result, "auditoria": result["auditoria"].model_dump(mode="json")}
+
+
+job_queue.register(TipoJob.AUDITORIA.value, run_auditoria_job)
+
+
+@router.post("/image")
+async def audit_image(
+    contenido_id: str = Form(...),
+    image: UploadFile = File(...),
+    force: bool = Form(False),
+    current_user: UserResponse = Depends(
+        require_role([UserRole.APROBADOR_B, UserRole.ADMIN])
+    ),
+):
+    """
+    Audita la imagen contra el manual de marca. Si la misma imagen ya se
+    auditó para esta versión del contenido y del manual, devuelve ese
+    resultado (`cached: true`); `force=true` fuerza un nuevo análisis.
+    """
+    # Se valida el contenido antes de guardar la imagen: sin blobs huérfanos.
+    contenido, manual = await _load_audit_target(contenido_id)
+    image_data, image_sha256 = await _store_upload(image)
+    return await _audit_target_and_save(
+        contenido, manual, image_data, image_sha256, current_user.id, force=force
+    )
+
+
+@router.post(
+    "/image/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def audit_image_job(
+    response: Response,
+    contenido_id: str = Form(...),
+    image: UploadFile = File(...),
+    force: bool = Form(False),
+    current_user: UserResponse = Depends(
+        require_role([UserRole.APROBADOR_B, UserRole.ADMIN])
+    ),
+):
+    """
+    Guarda la imagen, encola la auditoría y responde 202 con el job; el
+    estado se consulta en `/api/jobs/{job_id}`.
+    """
+    # Un contenido inexistente responde 404 aquí, no como job fallido.
+    await _load_audit_target(contenido_id)
+    _, image_sha256 = await _store_upload(image)
+    job = await job_queue.submit(
+        TipoJob.AUDITORIA.value,
+        {
+            "contenido_id": contenido_id,
+            "imagen_sha256": image_sha256,
+            "user_id": current_user.id,
+            "force": force,
+        },
+        current_user.id,
+    )
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return JobResponse(**job)
+
+
+@router.post("/image/batch")
+async def audit_image_batch(
+    contenido_id: str = Form(...),
+    images: List[UploadFile] = File(...),
+    force: bool = Form(False),
+    current_user: UserResponse = Depends(
+        require_role([UserRole.APROBADOR_B, UserRole.ADMIN])
+    ),
+):
+    """
+    Audita varias imágenes de un mismo contenido. Contenido, manual y
+    contexto de marca se cargan una sola vez; los análisis corren en
+    paralelo con un límite configurable y las auditorías nuevas se
+    guardan con un único insert.
+
+    Responde en NDJSON: una línea `item` por imagen al terminar (en orden
+    de finalización) y una línea final `done` con las auditorías. Los
+    fallos individuales no abortan el lote.
+    """
+    if len(images) > settings.auditoria_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {settings.auditoria_batch_max_items} imágenes por lote",
+        )
+
+    contenido, manual = await _load_audit_target(contenido_id)
+    # Los archivos del formulario se guardan antes de empezar a responder;
+    # en memoria solo queda el SHA-256 y cada worker relee su blob.
+    uploads: List[Tuple[str, Optional[str]]] = []
+    for image in images:
+        _, image_sha256 = await _store_upload(image)
+        uploads.append((image_sha256, image.filename))
+    brand_context = await _brand_context_for(contenido, manual)
+    limiter = ConcurrencyLimiter(settings.auditoria_batch_concurrency, name="auditoria_batch")
+
+    async def audit(index: int, image_sha256: str):
+        cache_key = _audit_cache_key(contenido, manual, image_sha256)
+        try:
+            if not force:
+                cached = await _get_cached_audit(cache_key)
+                if cached:
+                    return index, cache_key, cached
+            async with limiter:
+                image_data = await get_blob_store().get(image_sha256)
+                if image_data is None:
+                    raise ValueError("Imagen no encontrada en el almacenamiento")
+                result = await _analyze(contenido, brand_context, image_data, image_sha256)
+        except Exception as e:
+            # Un fallo de una imagen solo marca su línea; el resto del lote sigue.
+            result = {"success": False, "error": str(e)}
+        return index, cache_key, result
+
+    async def lines():
+        tasks = [
+            asyncio.create_task(audit(index, image_sha256))
+            for index, (image_sha256, _) in enumerate(uploads)
+        ]
+        cached_rows = []
+        pending = []
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, cache_key, result = await finished
+                image_sha256, filename = uploads[index]
+                payload = {
+                    "type": "item",
+                    "index": index,
+                    "filename": filename,
+                    "imagen_sha256": image_sha256,
+                    "cached": result.get("cached", False),
+                }
+                if result.get("cached"):
+                    payload.update(success=True, score=result["score"], analisis=result["analisis"])
+                    cached_rows.append((index, result["auditoria"]))
+                elif result["success"]:
+                    payload.update(success=True, score=result.get("score", 0), analisis=result.get("analysis", ""))
+                    pending.append((index, cache_key, result))
+                else:
+                    payload.update(success=False, error=result.get("error"))
+                yield ndjson_line(payload)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        pending.sort(key=lambda item: item[0])
+        try:
+            created = await auditorias_repo.insert_many(
+                [
+                    _auditoria_record(contenido_id, uploads[index][0], result, current_user.id)
+                    for index, _, result in pending
+                ]
+            )
+        except Exception as e:
+            # Las auditorías nuevas no se guardaron; el resumen igual se envía.
+            yield ndjson_line({"type": "error", "detail": f"Error al guardar auditorías: {e}"})
+            created = []
+
+        for (index, cache_key, result), row in zip(pending, created):
+            await _cache_audit(cache_key, row, result)
+
+        auditorias = sorted(
+            cached_rows + [(index, AuditoriaResponse(**row)) for (index, _, _), row in zip(pending, created)],
+            key=lambda item: item[0],
+        )
+        yield ndjson_line(
+            {
+                "type": "done",
+                "auditorias": [auditoria.model_dump(mode="json") for _, auditoria in auditorias],
+                "total": len(uploads),
+                "auditadas": len(auditorias),
+                "fallidas": len(uploads) - len(auditorias),
+            }
+        )
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
+@router.get(
+    "/contenido/{contenido_id}",
+    response_model=List[AuditoriaSummary],
+    response_model_exclude_unset=True,
+)
 async def get_auditorias_by_contenido(
-    contenido_id: str, current_user: UserResponse = Depends(get_current_user)
+    contenido_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: UserResponse = Depends(get_current_user),
 ):
-    supabase = get_supabase()
-    response = (
-        supabase.table("auditorias")
-        .select("*")
-        .eq("contenido_id", contenido_id)
-        .execute()
+    rows = await fetch_page(
+        auditorias_repo,
+        page,
+        response,
+        allowed_fields=AUDITORIA_FIELDS,
+        default_fields=AUDITORIA_SUMMARY_FIELDS,
+        filters={"contenido_id": contenido_id},
     )
 
-    return [AuditoriaResponse(**item) for item in (response.data or [])]
+    return [AuditoriaSummary(**item) for item in rows]
 
 
-@router.get("/", response_model=List[AuditoriaResponse])
+@router.get("/", response_model=List[AuditoriaSummary], response_model_exclude_unset=True)
 async def list_auditorias(
-    limit: int = 20, current_user: UserResponse = Depends(get_current_user)
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: UserResponse = Depends(get_current_user),
 ):
-    supabase = get_supabase()
-    response = (
-        supabase.table("auditorias")
-        .select("*")
-        .order("created_at", desc=True)
-        .limit(limit)
-        .execute()
+    rows = await fetch_page(
+        auditorias_repo,
+        page,
+        response,
+        allowed_fields=AUDITORIA_FIELDS,
+        default_fields=AUDITORIA_SUMMARY_FIELDS,
     )
 
-    return [AuditoriaResponse(**item) for item in (response.data or [])]
+    return [AuditoriaSummary(**item) for item in rows]
+
+
+def _parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta un header `Range: bytes=...` de un solo rango.
+    Devuelve (inicio, fin) inclusivo, o None si se debe servir completo.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
 
+    start_text, _, end_text = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            start = max(0, size - int(end_text))
+            end = size - 1
+    except ValueError:
+        return None
 
-@router.get("/{auditoria_id}/imagen", response_class=PlainTextResponse)
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            detail="Rango no satisfacible",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, min(end, size - 1)
+
+
+@router.get("/{auditoria_id}/imagen")
 async def get_auditoria_imagen(
-    auditoria_id: str, current_user: UserResponse = Depends(get_current_user)
+    auditoria_id: str,
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user),
 ):
-    supabase = get_supabase()
-    response = (
-        supabase.table("auditorias")
-        .select("imagen_url")
-        .eq("id", auditoria_id)
-        .execute()
+    data = await auditorias_repo.get_by_id(
+        auditoria_id, columns="imagen_sha256,imagen_url"
     )
 
-    if not response.data or not response.data[0].get("imagen_url"):
+    if not data or not (data.get("imagen_sha256") or data.get("imagen_url")):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Imagen de auditoría no encontrada",
         )
 
-    return response.data[0]["imagen_url"]
+    image_sha256 = data.get("imagen_sha256")
+    legacy_bytes = None
+    if not image_sha256:
+        # Filas antiguas con data URL en base64 (previas a la migración)
+        header, _, payload = data["imagen_url"].partition(",")
+        legacy_bytes = base64.b64decode(payload)
+        image_sha256 = compute_sha256(legacy_bytes)
+
+    # El ETag es el SHA-256 de la fila: el 304 no toca el blob store.
+    etag = f'"{image_sha256}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=31536000, immutable",
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    store = get_blob_store()
+    if legacy_bytes is None:
+        blob_stat = await store.stat(image_sha256)
+        if blob_stat is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Imagen de auditoría no encontrada",
+            )
+        size, content_type = blob_stat
+    else:
+        size = len(legacy_bytes)
+        content_type = sniff_mime_type(legacy_bytes)
+
+    byte_range = _parse_range(request.headers.get("range"), size)
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    if legacy_bytes is not None:
+        body = legacy_bytes[start:end + 1]
+        return Response(
+            content=body,
+            status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            media_type=content_type,
+            headers=headers,
+        )
+
+    return StreamingResponse(
+        store.iter_range(image_sha256, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type=content_type,
+        headers=headers,
+    )
@@ -1,8 +1,15 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from app.database import get_supabase
-from app.models.user import UserCreate, UserLogin, UserResponse, Token
-from app.dependencies.auth import verify_password, get_password_hash, create_access_token, get_current_user
+from app.repositories import users_repo
+from app.models.user import UserCreate, UserUpdate, UserLogin, UserResponse, Token, UserRole
+from app.dependencies.auth import (
+    verify_password_async,
+    get_password_hash_async,
+    create_access_token,
+    get_current_user,
+    require_role,
+    invalidate_user_cache,
+)
 from app.config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -10,10 +17,8 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 @router.post("/register", response_model=UserResponse)
 async def register(user: UserCreate):
-    supabase = get_supabase()
-    
-    response = supabase.table("users").select("*").eq("email", user.email).execute()
-    if response.data:
+    existing = await users_repo.get_by_email(user.email)
+    if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El email ya está registrado"
@@ -21,37 +26,33 @@ async def register(user: UserCreate):
     
     user_data = {
         "email": user.email,
-        "password_hash": get_password_hash(user.password),
+        "password_hash": await get_password_hash_async(user.password),
         "nombre": user.nombre,
         "role": user.role.value
     }
     
-    response = supabase.table("users").insert(user_data).execute()
+    created = await users_repo.insert(user_data)
     
-    if not response.data:
+    if not created:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Error al crear usuario"
         )
     
-    return UserResponse(**response.data[0])
+    return UserResponse(**created)
 
 
 @router.post("/login", response_model=Token)
 async def login(credentials: UserLogin):
-    supabase = get_supabase()
-    
-    response = supabase.table("users").select("*").eq("email", credentials.email).execute()
+    user_data = await users_repo.get_by_email(credentials.email)
     
-    if not response.data:
+    if not user_data:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas"
         )
     
-    user_data = response.data[0]
-    
-    if not verify_password(credentials.password, user_data["password_hash"]):
+    if not await verify_password_async(credentials.password, user_data["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas"
@@ -79,3 +80,29 @@ async def login(credentials: UserLogin):
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: UserResponse = Depends(get_current_user)):
     return current_user
+
+
+@router.patch("/users/{user_id}", response_model=UserResponse)
+async def update_user(
+    user_id: str,
+    changes: UserUpdate,
+    current_user: UserResponse = Depends(require_role([UserRole.ADMIN]))
+):
+    update_data = changes.model_dump(exclude_none=True, mode="json")
+    if not update_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No hay cambios para aplicar"
+        )
+    
+    updated = await users_repo.update(user_id, update_data)
+    
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuario no encontrado"
+        )
+    
+    invalidate_user_cache(user_id)
+    
+    return UserResponse(**updated)
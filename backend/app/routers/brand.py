@@ -1,20 +1,59 @@
+import logging
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.database import get_supabase
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from app.repositories import brand_manuals_repo
 from app.models.user import UserResponse
-from app.models.brand_manual import BrandManualCreate, BrandManualResponse
+from app.models.brand_manual import (
+    BrandManualCreate,
+    BrandManualUpdate,
+    BrandManualResponse,
+    BrandManualSummary,
+    BRAND_MANUAL_FIELDS,
+    BRAND_MANUAL_SUMMARY_FIELDS,
+)
 from app.dependencies.auth import get_current_user, require_role
+from app.dependencies.pagination import PageParams, fetch_page
 from app.models.user import UserRole
-from app.services import generate_brand_manual, get_brand_manual_by_id
+from app.models.job import JobResponse, TipoJob
+from app.services import (
+    generate_brand_manual,
+    stream_brand_manual,
+    get_brand_manual_by_id,
+    index_brand_manual,
+    search_brand_manuals,
+)
+from app.services.jobs import job_queue
+from app.services.manual_cache import brand_manual_cache
+from app.services.search_index import manual_search_index
+from app.services.sse import sse_event, SSE_HEADERS
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/brand", tags=["Brand DNA"])
 
 
-@router.post("/manual", response_model=BrandManualResponse)
-async def create_brand_manual(
-    manual: BrandManualCreate,
-    current_user: UserResponse = Depends(require_role([UserRole.CREADOR, UserRole.ADMIN]))
-):
+async def index_manual_chunks(manual: BrandManualResponse) -> None:
+    try:
+        count = await index_brand_manual(manual)
+        logger.info(f"Brand manual {manual.id} indexed: {count} chunks")
+    except Exception as e:
+        logger.error(f"Brand manual indexing failed for {manual.id}: {e}")
+
+
+def _manual_record(manual: BrandManualCreate, text: str, user_id: str) -> dict:
+    return {
+        "nombre": manual.nombre,
+        "producto": manual.producto,
+        "tono": manual.tono,
+        "público_objetivo": manual.público_objetivo,
+        "restricciones": manual.restricciones,
+        "contenido_markdown": text,
+        "created_by": user_id
+    }
+
+
+async def _generate_and_save(manual: BrandManualCreate, user_id: str) -> BrandManualResponse:
     result = await generate_brand_manual(
         producto=manual.producto,
         tono=manual.tono,
@@ -28,36 +67,134 @@ async def create_brand_manual(
             detail=f"Error al generar manual: {result.get('error')}"
         )
     
-    supabase = get_supabase()
-    manual_data = {
-        "nombre": manual.nombre,
-        "producto": manual.producto,
-        "tono": manual.tono,
-        "público_objetivo": manual.público_objetivo,
-        "restricciones": manual.restricciones,
-        "contenido_markdown": result["text"],
-        "created_by": current_user.id
-    }
-    
-    response = supabase.table("brand_manuals").insert(manual_data).execute()
+    created = await brand_manuals_repo.insert(
+        _manual_record(manual, result["text"], user_id)
+    )
     
-    if not response.data:
+    if not created:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al guardar el manual"
         )
     
-    return BrandManualResponse(**response.data[0])
+    created_manual = BrandManualResponse(**created)
+    brand_manual_cache.put(created_manual)
+    await manual_search_index.add(created_manual)
+    return created_manual
+
+
+async def run_brand_manual_job(payload: dict) -> dict:
+    created_manual = await _generate_and_save(
+        BrandManualCreate(**payload["manual"]), payload["user_id"]
+    )
+    await index_manual_chunks(created_manual)
+    return created_manual.model_dump(mode="json")
+
+
+job_queue.register(TipoJob.BRAND_MANUAL.value, run_brand_manual_job)
+
+
+@router.post("/manual", response_model=BrandManualResponse)
+async def create_brand_manual(
+    manual: BrandManualCreate,
+    background_tasks: BackgroundTasks,
+    current_user: UserResponse = Depends(require_role([UserRole.CREADOR, UserRole.ADMIN]))
+):
+    created_manual = await _generate_and_save(manual, current_user.id)
+    background_tasks.add_task(index_manual_chunks, created_manual)
+    
+    return created_manual
+
+
+@router.post("/manual/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_brand_manual_job(
+    manual: BrandManualCreate,
+    response: Response,
+    current_user: UserResponse = Depends(require_role([UserRole.CREADOR, UserRole.ADMIN]))
+):
+    """
+    Encola la generación del manual y responde 202 con el job; el estado
+    se consulta en `/api/jobs/{job_id}`.
+    """
+    job = await job_queue.submit(
+        TipoJob.BRAND_MANUAL.value,
+        {"manual": manual.model_dump(mode="json"), "user_id": current_user.id},
+        current_user.id
+    )
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return JobResponse(**job)
+
+
+@router.post("/manual/stream")
+async def create_brand_manual_stream(
+    manual: BrandManualCreate,
+    current_user: UserResponse = Depends(require_role([UserRole.CREADOR, UserRole.ADMIN]))
+):
+    """
+    Genera el manual vía Server-Sent Events: eventos `token` con cada
+    fragmento del markdown y un evento final `done` con el manual guardado
+    (o `error`). La indexación de fragmentos corre tras el evento final.
+    """
+    async def events():
+        async for event in stream_brand_manual(
+            producto=manual.producto,
+            tono=manual.tono,
+            publica_objetivo=manual.público_objetivo,
+            restricciones=manual.restricciones
+        ):
+            if event["type"] == "token":
+                yield sse_event("token", {"text": event["text"]})
+            elif event["type"] == "error":
+                yield sse_event("error", {"detail": f"Error al generar manual: {event['error']}"})
+                return
+            else:
+                created = await brand_manuals_repo.insert(
+                    _manual_record(manual, event["text"], current_user.id)
+                )
+                if not created:
+                    yield sse_event("error", {"detail": "Error al guardar el manual"})
+                    return
+                
+                created_manual = BrandManualResponse(**created)
+                brand_manual_cache.put(created_manual)
+                await manual_search_index.add(created_manual)
+                yield sse_event(
+                    "done",
+                    {"manual": created_manual.model_dump(mode="json"), "usage": event["usage"]}
+                )
+                await index_manual_chunks(created_manual)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
-@router.get("/manual", response_model=List[BrandManualResponse])
+@router.get(
+    "/manual",
+    response_model=List[BrandManualSummary],
+    response_model_exclude_unset=True,
+)
 async def list_brand_manuals(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase()
-    response = supabase.table("brand_manuals").select("*").order("created_at", desc=True).execute()
+    rows = await fetch_page(
+        brand_manuals_repo,
+        page,
+        response,
+        allowed_fields=BRAND_MANUAL_FIELDS,
+        default_fields=BRAND_MANUAL_SUMMARY_FIELDS,
+    )
     
-    return [BrandManualResponse(**item) for item in (response.data or [])]
+    return [BrandManualSummary(**item) for item in rows]
+
+
+@router.get("/manual/search", response_model=List[BrandManualResponse])
+async def search_manuals(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(5, ge=1, le=50),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    return await search_brand_manuals(q, limit)
 
 
 @router.get("/manual/{manual_id}", response_model=BrandManualResponse)
@@ -76,18 +213,73 @@ async def get_brand_manual(
     return manual
 
 
+@router.patch("/manual/{manual_id}", response_model=BrandManualResponse)
+async def update_brand_manual(
+    manual_id: str,
+    manual: BrandManualUpdate,
+    background_tasks: BackgroundTasks,
+    current_user: UserResponse = Depends(require_role([UserRole.CREADOR, UserRole.ADMIN]))
+):
+    update_data = manual.model_dump(exclude_none=True)
+    
+    if not update_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No hay campos para actualizar"
+        )
+    
+    current = await brand_manuals_repo.get_by_id(manual_id, columns="id,version")
+    
+    if not current:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Manual de marca no encontrado"
+        )
+    
+    # Cada cambio crea una nueva versión: los cachés por (id, version) quedan obsoletos.
+    brand_manual_cache.invalidate(manual_id)
+    version = current.get("version")
+    updated = await brand_manuals_repo.update_if_version(
+        manual_id,
+        version,
+        {**update_data, "version": (version or 1) + 1, "updated_at": "now()"}
+    )
+    
+    if not updated:
+        # Otra edición cambió la versión (o borró el manual) entre la lectura y la escritura.
+        if await brand_manuals_repo.get_by_id(manual_id, columns="id"):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El manual fue modificado por otra petición, vuelve a intentarlo"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Manual de marca no encontrado"
+        )
+    
+    updated_manual = BrandManualResponse(**updated)
+    brand_manual_cache.put(updated_manual)
+    await manual_search_index.add(updated_manual)
+    if "contenido_markdown" in update_data:
+        background_tasks.add_task(index_manual_chunks, updated_manual)
+    
+    return updated_manual
+
+
 @router.delete("/manual/{manual_id}")
 async def delete_brand_manual(
     manual_id: str,
     current_user: UserResponse = Depends(require_role([UserRole.ADMIN]))
 ):
-    supabase = get_supabase()
-    response = supabase.table("brand_manuals").delete().eq("id", manual_id).execute()
+    deleted = await brand_manuals_repo.delete(manual_id)
+    brand_manual_cache.invalidate(manual_id)
     
-    if not response.data:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Manual de marca no encontrado"
         )
     
+    manual_search_index.remove(manual_id)
+    
     return {"message": "Manual eliminado correctamente"}
@@ -1,31 +1,39 @@
+import asyncio
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.database import get_supabase
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.repositories import contenido_repo
 from app.models.user import UserResponse
 from app.models.contenido import (
     ContenidoCreate,
+    ContenidoBatchCreate,
+    ContenidoBatchItem,
     ContenidoUpdate,
     ContenidoResponse,
+    ContenidoSummary,
     EstadoContenido,
+    CONTENIDO_FIELDS,
+    CONTENIDO_SUMMARY_FIELDS,
 )
 from app.dependencies.auth import get_current_user, require_role
+from app.dependencies.pagination import PageParams, fetch_page
 from app.models.user import UserRole
+from app.models.job import JobResponse, TipoJob
 from app.services import (
     generate_contenido,
+    stream_contenido,
     get_brand_manual_by_id,
-    format_brand_context,
+    build_brand_context,
 )
+from app.services.concurrency import ConcurrencyLimiter
+from app.services.jobs import job_queue
+from app.services.sse import sse_event, SSE_HEADERS
 
 router = APIRouter(prefix="/api/contenido", tags=["Creative Engine"])
 
 
-@router.post("/", response_model=ContenidoResponse)
-async def create_contenido(
-    contenido: ContenidoCreate,
-    current_user: UserResponse = Depends(
-        require_role([UserRole.CREADOR, UserRole.ADMIN])
-    ),
-):
+async def _load_context(contenido: ContenidoCreate):
     manual = await get_brand_manual_by_id(contenido.brand_manual_id)
 
     if not manual:
@@ -34,13 +42,34 @@ async def create_contenido(
             detail="Manual de marca no encontrado",
         )
 
-    brand_context = format_brand_context(manual)
+    brand_context = await build_brand_context(
+        manual, query=f"{contenido.tipo.value} {contenido.titulo}"
+    )
+    return manual, brand_context
+
+
+def _contenido_record(
+    contenido: ContenidoBatchItem, text: str, user_id: str, brand_manual_id: str
+) -> dict:
+    return {
+        "brand_manual_id": brand_manual_id,
+        "tipo": contenido.tipo.value,
+        "titulo": contenido.titulo,
+        "contenido_text": text,
+        "estado": EstadoContenido.PENDIENTE.value,
+        "created_by": user_id,
+    }
+
+
+async def _generate_and_save(contenido: ContenidoCreate, user_id: str) -> ContenidoResponse:
+    manual, brand_context = await _load_context(contenido)
 
     result = await generate_contenido(
         tipo_contenido=contenido.tipo.value,
         brand_manual_context=brand_context,
         producto=manual.producto,
         titulo=contenido.titulo,
+        use_cache=contenido.use_cache,
     )
 
     if not result["success"]:
@@ -49,55 +78,253 @@ async def create_contenido(
             detail=f"Error al generar contenido: {result.get('error')}",
         )
 
-    supabase = get_supabase()
-    contenido_data = {
-        "brand_manual_id": contenido.brand_manual_id,
-        "tipo": contenido.tipo.value,
-        "titulo": contenido.titulo,
-        "contenido_text": result["text"],
-        "estado": EstadoContenido.PENDIENTE.value,
-        "created_by": current_user.id,
-    }
-
-    response = supabase.table("contenido").insert(contenido_data).execute()
+    created = await contenido_repo.insert(
+        _contenido_record(
+            contenido, result["text"], user_id, contenido.brand_manual_id
+        )
+    )
 
-    if not response.data:
+    if not created:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al guardar el contenido",
         )
 
-    return ContenidoResponse(**response.data[0])
+    return ContenidoResponse(**created)
 
 
-@router.get("/", response_model=List[ContenidoResponse])
-async def list_contenido(
-    estado: str = None, current_user: UserResponse = Depends(get_current_user)
+async def run_contenido_job(payload: dict) -> dict:
+    created = await _generate_and_save(
+        ContenidoCreate(**payload["contenido"]), payload["user_id"]
+    )
+    return created.model_dump(mode="json")
+
+
+job_queue.register(TipoJob.CONTENIDO.value, run_contenido_job)
+
+
+@router.post("/", response_model=ContenidoResponse)
+async def create_contenido(
+    contenido: ContenidoCreate,
+    current_user: UserResponse = Depends(
+        require_role([UserRole.CREADOR, UserRole.ADMIN])
+    ),
 ):
-    supabase = get_supabase()
-    query = supabase.table("contenido").select("*")
+    return await _generate_and_save(contenido, current_user.id)
 
-    if estado:
-        query = query.eq("estado", estado)
 
-    response = query.order("created_at", desc=True).execute()
+@router.post(
+    "/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def create_contenido_job(
+    contenido: ContenidoCreate,
+    response: Response,
+    current_user: UserResponse = Depends(
+        require_role([UserRole.CREADOR, UserRole.ADMIN])
+    ),
+):
+    """
+    Encola la generación y responde 202 con el job; el estado se consulta
+    en `/api/jobs/{job_id}`.
+    """
+    job = await job_queue.submit(
+        TipoJob.CONTENIDO.value,
+        {"contenido": contenido.model_dump(mode="json"), "user_id": current_user.id},
+        current_user.id,
+    )
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return JobResponse(**job)
 
-    return [ContenidoResponse(**item) for item in (response.data or [])]
+
+@router.post("/stream")
+async def create_contenido_stream(
+    contenido: ContenidoCreate,
+    current_user: UserResponse = Depends(
+        require_role([UserRole.CREADOR, UserRole.ADMIN])
+    ),
+):
+    """
+    Genera el contenido vía Server-Sent Events: eventos `token` con cada
+    fragmento del texto y un evento final `done` con el registro guardado
+    (o `error`).
+    """
+    manual, brand_context = await _load_context(contenido)
+
+    async def events():
+        async for event in stream_contenido(
+            tipo_contenido=contenido.tipo.value,
+            brand_manual_context=brand_context,
+            producto=manual.producto,
+            titulo=contenido.titulo,
+        ):
+            if event["type"] == "token":
+                yield sse_event("token", {"text": event["text"]})
+            elif event["type"] == "error":
+                yield sse_event(
+                    "error", {"detail": f"Error al generar contenido: {event['error']}"}
+                )
+                return
+            else:
+                created = await contenido_repo.insert(
+                    _contenido_record(
+                        contenido, event["text"], current_user.id, contenido.brand_manual_id
+                    )
+                )
+                if not created:
+                    yield sse_event("error", {"detail": "Error al guardar el contenido"})
+                    return
+                yield sse_event(
+                    "done",
+                    {
+                        "contenido": ContenidoResponse(**created).model_dump(mode="json"),
+                        "usage": event["usage"],
+                    },
+                )
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
+@router.post("/batch")
+async def create_contenido_batch(
+    batch: ContenidoBatchCreate,
+    current_user: UserResponse = Depends(
+        require_role([UserRole.CREADOR, UserRole.ADMIN])
+    ),
+):
+    """
+    Genera varios contenidos para un mismo manual. El contexto de marca se
+    arma una sola vez, las generaciones corren en paralelo con un límite
+    configurable y los resultados se guardan con un único insert.
+
+    Responde vía Server-Sent Events: un evento `item` por cada ítem al
+    terminar (en orden de finalización) y un evento final `done` con los
+    registros guardados (y `error` si el guardado falló). Los fallos
+    individuales no abortan el lote.
+    """
+    if len(batch.items) > settings.contenido_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {settings.contenido_batch_max_items} ítems por lote",
+        )
+
+    manual = await get_brand_manual_by_id(batch.brand_manual_id)
+
+    if not manual:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Manual de marca no encontrado",
+        )
+
+    query = " ".join(f"{item.tipo.value} {item.titulo}" for item in batch.items)
+    brand_context = await build_brand_context(manual, query=query)
+    limiter = ConcurrencyLimiter(settings.contenido_batch_concurrency, name="contenido_batch")
+
+    async def generate(index: int, item: ContenidoBatchItem):
+        try:
+            async with limiter:
+                result = await generate_contenido(
+                    tipo_contenido=item.tipo.value,
+                    brand_manual_context=brand_context,
+                    producto=manual.producto,
+                    titulo=item.titulo,
+                    use_cache=batch.use_cache,
+                )
+        except Exception as e:
+            # Un fallo de un ítem solo marca su evento; el resto del lote sigue.
+            result = {"success": False, "error": str(e)}
+        return index, item, result
+
+    async def events():
+        tasks = [
+            asyncio.create_task(generate(index, item))
+            for index, item in enumerate(batch.items)
+        ]
+        records = []
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, item, result = await finished
+                payload = {
+                    "index": index,
+                    "tipo": item.tipo.value,
+                    "titulo": item.titulo,
+                    "success": result["success"],
+                }
+                if result["success"]:
+                    payload["contenido_text"] = result["text"]
+                    payload["cached"] = result.get("cached", False)
+                    row = _contenido_record(
+                        item, result["text"], current_user.id, batch.brand_manual_id
+                    )
+                    records.append((index, row))
+                else:
+                    payload["error"] = result.get("error")
+                yield sse_event("item", payload)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        records.sort(key=lambda record: record[0])
+        save_error = None
+        try:
+            created = await contenido_repo.insert_many([row for _, row in records])
+        except Exception as e:
+            # Lo generado no se guardó; el resumen `done` igual se envía.
+            save_error = f"Error al guardar el contenido: {e}"
+            yield sse_event("error", {"detail": save_error})
+            created = []
+
+        summary = {
+            "contenidos": [
+                ContenidoResponse(**row).model_dump(mode="json") for row in created
+            ],
+            "total": len(batch.items),
+            "generados": len(records),
+            "fallidos": len(batch.items) - len(records),
+        }
+        if save_error:
+            summary["error"] = save_error
+        yield sse_event("done", summary)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
+@router.get(
+    "/", response_model=List[ContenidoSummary], response_model_exclude_unset=True
+)
+async def list_contenido(
+    response: Response,
+    estado: str = None,
+    page: PageParams = Depends(),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    rows = await fetch_page(
+        contenido_repo,
+        page,
+        response,
+        allowed_fields=CONTENIDO_FIELDS,
+        default_fields=CONTENIDO_SUMMARY_FIELDS,
+        filters={"estado": estado or None},
+    )
+
+    return [ContenidoSummary(**item) for item in rows]
 
 
 @router.get("/{contenido_id}", response_model=ContenidoResponse)
 async def get_contenido(
     contenido_id: str, current_user: UserResponse = Depends(get_current_user)
 ):
-    supabase = get_supabase()
-    response = supabase.table("contenido").select("*").eq("id", contenido_id).execute()
+    data = await contenido_repo.get_by_id(contenido_id)
 
-    if not response.data:
+    if not data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contenido no encontrado"
         )
 
-    return ContenidoResponse(**response.data[0])
+    return ContenidoResponse(**data)
 
 
 @router.patch("/{contenido_id}/aprobar")
@@ -107,26 +334,21 @@ async def approve_contenido(
         require_role([UserRole.APROBADOR_A, UserRole.ADMIN])
     ),
 ):
-    supabase = get_supabase()
-    response = (
-        supabase.table("contenido")
-        .update(
-            {
-                "estado": EstadoContenido.APROBADO.value,
-                "aprobado_por": current_user.id,
-                "updated_at": "now()",
-            }
-        )
-        .eq("id", contenido_id)
-        .execute()
+    updated = await contenido_repo.update(
+        contenido_id,
+        {
+            "estado": EstadoContenido.APROBADO.value,
+            "aprobado_por": current_user.id,
+            "updated_at": "now()",
+        },
     )
 
-    if not response.data:
+    if not updated:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contenido no encontrado"
         )
 
-    return {"message": "Contenido aprobado", "contenido": response.data[0]}
+    return {"message": "Contenido aprobado", "contenido": updated}
 
 
 @router.patch("/{contenido_id}/rechazar")
@@ -137,23 +359,18 @@ async def reject_contenido(
         require_role([UserRole.APROBADOR_A, UserRole.ADMIN])
     ),
 ):
-    supabase = get_supabase()
-    response = (
-        supabase.table("contenido")
-        .update(
-            {
-                "estado": EstadoContenido.RECHAZADO.value,
-                "rechazo_razon": rechazo_razon,
-                "updated_at": "now()",
-            }
-        )
-        .eq("id", contenido_id)
-        .execute()
+    updated = await contenido_repo.update(
+        contenido_id,
+        {
+            "estado": EstadoContenido.RECHAZADO.value,
+            "rechazo_razon": rechazo_razon,
+            "updated_at": "now()",
+        },
     )
 
-    if not response.data:
+    if not updated:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contenido no encontrado"
         )
 
-    return {"message": "Contenido rechazado", "contenido": response.data[0]}
+    return {"message": "Contenido rechazado", "contenido": updated}
@@ -0,0 +1,97 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from app.models.user import UserResponse, UserRole
+from app.models.job import JobResponse
+from app.dependencies.auth import get_current_user
+from app.services.jobs import job_queue, JobNotFoundError, JobStateError
+from app.services.sse import sse_event, SSE_HEADERS
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+
+async def _get_owned_job(job_id: str, current_user: UserResponse) -> dict:
+    try:
+        job = await job_queue.get(job_id)
+    except JobNotFoundError:
+        job = None
+
+    if not job or (
+        current_user.role != UserRole.ADMIN.value and job["created_by"] != current_user.id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job no encontrado"
+        )
+
+    return job
+
+
+@router.get("", response_model=List[JobResponse])
+async def list_jobs(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    created_by = None if current_user.role == UserRole.ADMIN.value else current_user.id
+    jobs = await job_queue.list(created_by, limit)
+
+    return [JobResponse(**job) for job in jobs]
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    return JobResponse(**await _get_owned_job(job_id, current_user))
+
+
+@router.get("/{job_id}/events")
+async def watch_job(
+    job_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Suscripción vía Server-Sent Events: un evento `job` por cada cambio de
+    estado hasta que el job termina.
+    """
+    await _get_owned_job(job_id, current_user)
+
+    async def events():
+        async for job in job_queue.watch(job_id):
+            if job is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield sse_event("job", JobResponse(**job).model_dump(mode="json"))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(
+    job_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    await _get_owned_job(job_id, current_user)
+
+    try:
+        job = await job_queue.cancel(job_id)
+    except JobStateError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    return JobResponse(**job)
+
+
+@router.post("/{job_id}/retry", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def retry_job(
+    job_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    await _get_owned_job(job_id, current_user)
+
+    try:
+        job = await job_queue.retry(job_id)
+    except JobStateError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    return JobResponse(**job)
@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends
+from app.config import settings
+from app.models.user import UserResponse
+from app.models.stats import DashboardStats
+from app.dependencies.auth import get_current_user
+from app.repositories import stats_repo
+from app.services.cache import TTLCache
+
+router = APIRouter(prefix="/api/stats", tags=["Dashboard"])
+
+stats_cache = TTLCache(max_size=1, ttl_seconds=settings.stats_cache_ttl_seconds, name="stats")
+
+
+@router.get("", response_model=DashboardStats)
+async def get_dashboard_stats(
+    current_user: UserResponse = Depends(get_current_user),
+):
+    cached = stats_cache.get("dashboard")
+    if cached is not None:
+        return cached
+
+    data = await stats_repo.dashboard_stats()
+    stats = DashboardStats(
+        total_manuals=data.get("total_manuals", 0),
+        total_contenidos=data.get("total_contenidos", 0),
+        total_auditorias=data.get("total_auditorias", 0),
+        contenido_por_estado=data.get("contenido_por_estado") or {},
+        contenido_por_tipo=data.get("contenido_por_tipo") or {},
+        contenido_por_manual=data.get("contenido_por_manual") or [],
+        auditorias=data.get("auditorias") or {},
+        generated_at=datetime.now(timezone.utc),
+    )
+    stats_cache.set("dashboard", stats)
+    return stats
@@ -1,14 +1,34 @@
-from app.services.groq_service import generate_text, generate_brand_manual, generate_contenido
+from app.services.groq_service import (
+    generate_text,
+    generate_brand_manual,
+    generate_contenido,
+    stream_text,
+    stream_brand_manual,
+    stream_contenido,
+)
 from app.services.gemini_service import analyze_image, analyze_image_from_url
-from app.services.rag_engine import get_brand_manual_by_id, get_latest_brand_manual, format_brand_context
+from app.services.rag_engine import (
+    get_brand_manual_by_id,
+    get_latest_brand_manual,
+    search_brand_manuals,
+    format_brand_context,
+    build_brand_context,
+    index_brand_manual,
+)
 
 __all__ = [
     "generate_text",
     "generate_brand_manual", 
     "generate_contenido",
+    "stream_text",
+    "stream_brand_manual",
+    "stream_contenido",
     "analyze_image",
     "analyze_image_from_url",
     "get_brand_manual_by_id",
     "get_latest_brand_manual",
+    "search_brand_manuals",
     "format_brand_context",
+    "build_brand_context",
+    "index_brand_manual",
 ]
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import logging
+from typing import Any, Optional
+
+from app.config import settings
+from app.services.cache import TTLCache
+from app.services.llm_cache import LLMResponseCache, SQLiteResponseStore
+
+logger = logging.getLogger(__name__)
+
+
+def make_audit_cache_key(
+    image_sha256: str,
+    contenido_id: str,
+    contenido_updated_at: Any,
+    manual_id: str,
+    manual_version: int,
+    model: str,
+) -> str:
+    """
+    Una auditoría es reutilizable mientras no cambien la imagen, el
+    contenido (por `updated_at`), la versión del manual ni el modelo.
+    """
+    payload = json.dumps(
+        [image_sha256, contenido_id, str(contenido_updated_at or ""), manual_id, manual_version, model],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+audit_cache: Optional[LLMResponseCache] = None
+
+
+def get_audit_cache() -> LLMResponseCache:
+    """
+    Caché de resultados de auditoría: mismo esquema de dos niveles que el
+    caché de respuestas del LLM, en su propio archivo SQLite.
+    """
+    global audit_cache
+    if audit_cache is None:
+        disk = None
+        if settings.audit_cache_sqlite_path:
+            try:
+                disk = SQLiteResponseStore(
+                    settings.audit_cache_sqlite_path,
+                    ttl_seconds=settings.audit_cache_ttl_seconds,
+                    max_bytes=settings.audit_cache_disk_max_mb * 1024 * 1024,
+                )
+            except Exception as e:
+                logger.error(f"Audit disk cache disabled: {e}")
+        audit_cache = LLMResponseCache(
+            memory=TTLCache(
+                max_size=settings.audit_cache_max_entries,
+                ttl_seconds=settings.audit_cache_ttl_seconds,
+                name="audit-results",
+            ),
+            disk=disk,
+        )
+    return audit_cache
+
+
+def close_audit_cache() -> None:
+    global audit_cache
+    if audit_cache is not None and audit_cache.disk is not None:
+        audit_cache.disk.close()
+    audit_cache = None
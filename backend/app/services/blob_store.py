@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+from app.config import settings
+from app.http_pool import http_pools
+from app.services.media import sniff_mime_type
+
+CHUNK_SIZE = 64 * 1024
+
+
+def compute_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(ABC):
+    """
+    Almacén direccionado por contenido: cada blob se guarda una sola vez
+    bajo su SHA-256. Las subclases implementan el backend físico.
+    """
+
+    async def put(
+        self, data: bytes, content_type: Optional[str] = None, key: Optional[str] = None
+    ) -> str:
+        """`key` permite pasar el SHA-256 ya calculado (p. ej. al leer el upload)."""
+        key = key or compute_sha256(data)
+        if not await self.exists(key):
+            await self._write(key, data, content_type)
+        return key
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    async def get_range(self, key: str, start: int, end: int) -> Optional[bytes]:
+        """Devuelve los bytes [start, end] (inclusive)."""
+        data = await self.get(key)
+        return data[start:end + 1] if data is not None else None
+
+    async def size(self, key: str) -> Optional[int]:
+        data = await self.get(key)
+        return len(data) if data is not None else None
+
+    async def stat(self, key: str) -> Optional[Tuple[int, str]]:
+        """Devuelve (tamaño, tipo MIME) sin leer el blob completo."""
+        size = await self.size(key)
+        if size is None:
+            return None
+        return size, sniff_mime_type(await self.get_range(key, 0, 31) or b"")
+
+    async def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        data = await self.get_range(key, start, end) or b""
+        for offset in range(0, len(data), CHUNK_SIZE):
+            yield data[offset:offset + CHUNK_SIZE]
+
+    @abstractmethod
+    async def _write(self, key: str, data: bytes, content_type: Optional[str]) -> None:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    """Backend en filesystem local: <root>/ab/cd/<sha256>."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / key
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._path(key).is_file)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            return None
+
+    async def get_range(self, key: str, start: int, end: int) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read_range, self._path(key), start, end)
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            stat = await asyncio.to_thread(os.stat, self._path(key))
+        except FileNotFoundError:
+            return None
+        return stat.st_size
+
+    async def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        path = self._path(key)
+        position = start
+        while position <= end:
+            chunk_end = min(end, position + CHUNK_SIZE - 1)
+            chunk = await asyncio.to_thread(self._read_range, path, position, chunk_end)
+            if not chunk:
+                return
+            yield chunk
+            position += len(chunk)
+
+    async def _write(self, key: str, data: bytes, content_type: Optional[str]) -> None:
+        await asyncio.to_thread(self._write_file, self._path(key), data)
+
+    @staticmethod
+    def _read_range(path: Path, start: int, end: int) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                return f.read(end - start + 1)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write_file(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escritura atómica: nunca se sirve un blob a medio escribir
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+class SupabaseBlobStore(BlobStore):
+    """Backend de object storage sobre un bucket de Supabase Storage."""
+
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+
+    def _bucket(self):
+        from app.database import get_async_supabase
+        return get_async_supabase().storage.from_(self.bucket)
+
+    @staticmethod
+    def _object_path(key: str) -> str:
+        return f"{key[:2]}/{key}"
+
+    async def exists(self, key: str) -> bool:
+        try:
+            return await self._bucket().exists(self._object_path(key))
+        except Exception:
+            return False
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self._bucket().download(self._object_path(key))
+        except Exception:
+            return None
+
+    async def _info(self, key: str) -> Optional[dict]:
+        try:
+            return await self._bucket().info(self._object_path(key))
+        except Exception:
+            return None
+
+    async def size(self, key: str) -> Optional[int]:
+        info = await self._info(key)
+        if info is None:
+            return None
+        return info.get("size", (info.get("metadata") or {}).get("size"))
+
+    async def stat(self, key: str) -> Optional[Tuple[int, str]]:
+        """Tamaño y tipo MIME salen de la metadata del objeto: una sola petición."""
+        info = await self._info(key)
+        if info is None:
+            return None
+        metadata = info.get("metadata") or {}
+        size = info.get("size", metadata.get("size"))
+        if size is None:
+            return await super().stat(key)
+        content_type = info.get("content_type") or metadata.get("mimetype")
+        if not content_type or content_type == "application/octet-stream":
+            content_type = sniff_mime_type(await self.get_range(key, 0, 31) or b"")
+        return size, content_type
+
+    def _object_url(self, key: str) -> str:
+        base = settings.supabase_url.rstrip("/")
+        return f"{base}/storage/v1/object/{self.bucket}/{self._object_path(key)}"
+
+    async def _iter_object(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """
+        GET al objeto con header `Range` sobre el pool HTTP de Supabase;
+        storage3 no expone descargas parciales.
+        """
+        headers = {
+            "apikey": settings.supabase_service_key,
+            "Authorization": f"Bearer {settings.supabase_service_key}",
+            "Range": f"bytes={start}-{end}",
+        }
+        client = http_pools.get_async("supabase")
+        async with client.stream("GET", self._object_url(key), headers=headers) as response:
+            if response.status_code not in (200, 206):
+                raise FileNotFoundError(key)
+            # Si el servidor ignora el Range (200), se recorta aquí.
+            skip = start if response.status_code == 200 else 0
+            remaining = end - start + 1
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                if skip:
+                    dropped = min(skip, len(chunk))
+                    chunk = chunk[dropped:]
+                    skip -= dropped
+                chunk = chunk[:remaining]
+                if chunk:
+                    remaining -= len(chunk)
+                    yield chunk
+                if remaining <= 0:
+                    return
+
+    async def get_range(self, key: str, start: int, end: int) -> Optional[bytes]:
+        try:
+            return b"".join([chunk async for chunk in self._iter_object(key, start, end)])
+        except Exception:
+            return None
+
+    async def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._iter_object(key, start, end):
+                yield chunk
+        except FileNotFoundError:
+            return
+
+    async def _write(self, key: str, data: bytes, content_type: Optional[str]) -> None:
+        await self._bucket().upload(
+            self._object_path(key),
+            data,
+            {"content-type": content_type or "application/octet-stream", "upsert": "true"},
+        )
+
+
+blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global blob_store
+    if blob_store is None:
+        if settings.blob_store_backend == "supabase":
+            blob_store = SupabaseBlobStore(settings.blob_store_bucket)
+        else:
+            blob_store = LocalBlobStore(settings.blob_store_path)
+    return blob_store
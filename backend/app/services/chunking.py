@@ -0,0 +1,82 @@
+import re
+from typing import Dict, Any, List
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_TOKEN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Aproximación local del número de tokens (palabras + signos, con el
+    factor típico de ~1.3 tokens por palabra en español).
+    """
+    if not text:
+        return 0
+    words = len(_TOKEN.findall(text))
+    return max(1, int(words * 1.3))
+
+
+def _split_oversized(paragraph: str, max_tokens: int) -> List[str]:
+    pieces: List[str] = []
+    current: List[str] = []
+    for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+        candidate = " ".join(current + [sentence])
+        if current and estimate_tokens(candidate) > max_tokens:
+            pieces.append(" ".join(current))
+            current = [sentence]
+        else:
+            current.append(sentence)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_markdown(markdown: str, max_tokens: int = 200) -> List[Dict[str, Any]]:
+    """
+    Divide un manual en Markdown en fragmentos por sección (encabezados),
+    agrupando párrafos hasta `max_tokens`. Cada fragmento conserva el
+    título de su sección y su posición en el documento.
+    """
+    sections: List[tuple] = []
+    title = ""
+    lines: List[str] = []
+    for line in (markdown or "").splitlines():
+        heading = _HEADING.match(line.strip())
+        if heading:
+            if "".join(lines).strip():
+                sections.append((title, "\n".join(lines)))
+            title = heading.group(2).strip()
+            lines = []
+        else:
+            lines.append(line)
+    if "".join(lines).strip():
+        sections.append((title, "\n".join(lines)))
+
+    chunks: List[Dict[str, Any]] = []
+    for section_title, body in sections:
+        paragraphs = [p.strip() for p in re.split(r"\n\s*\n", body) if p.strip()]
+        current: List[str] = []
+        for paragraph in paragraphs:
+            parts = (
+                _split_oversized(paragraph, max_tokens)
+                if estimate_tokens(paragraph) > max_tokens
+                else [paragraph]
+            )
+            for part in parts:
+                if current and estimate_tokens("\n\n".join(current + [part])) > max_tokens:
+                    chunks.append(_make_chunk(len(chunks), section_title, current))
+                    current = []
+                current.append(part)
+        if current:
+            chunks.append(_make_chunk(len(chunks), section_title, current))
+    return chunks
+
+
+def _make_chunk(index: int, section: str, paragraphs: List[str]) -> Dict[str, Any]:
+    text = "\n\n".join(paragraphs)
+    return {
+        "chunk_index": index,
+        "seccion": section,
+        "contenido": text,
+        "tokens": estimate_tokens(text),
+    }
@@ -0,0 +1,49 @@
+import asyncio
+import time
+from typing import Any, Dict
+
+
+class ConcurrencyLimiter:
+    """
+    Semáforo instrumentado: limita las llamadas en vuelo y expone la
+    profundidad de la cola y los tiempos de espera.
+    """
+
+    def __init__(self, limit: int, name: str = "limiter"):
+        self.limit = max(1, limit)
+        self.name = name
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self.waiting = 0
+        self.in_flight = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def __aenter__(self) -> "ConcurrencyLimiter":
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        waited = time.perf_counter() - start
+        self.acquired += 1
+        self.in_flight += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "acquired": self.acquired,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
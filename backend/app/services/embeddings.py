@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class Embedder(ABC):
+    """Interfaz de los generadores de embeddings usados por el RAG."""
+
+    dimension: int
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Devuelve una matriz (len(texts), dimension) normalizada L2."""
+
+
+class HashingEmbedder(Embedder):
+    """
+    Embedder determinista y offline (feature hashing de palabras y
+    bigramas). Es el valor por defecto y el usado en pruebas.
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD.findall(text.lower())
+        return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dimension] += sign
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _embed_sync(self, texts: List[str]) -> np.ndarray:
+        return np.vstack([self._embed_one(text) for text in texts])
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        # Hashing en CPU: fuera del event loop (rebuild del índice, reindexado).
+        return await asyncio.to_thread(self._embed_sync, texts)
+
+
+class GeminiEmbedder(Embedder):
+    """Embeddings de Google AI Studio, recortados a `dimension`."""
+
+    def __init__(self, dimension: int, model: str = "gemini-embedding-001"):
+        self.dimension = dimension
+        self.model = model
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        from app.services.gemini_service import get_gemini_client
+
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        client = get_gemini_client()
+        if not client:
+            raise RuntimeError("Gemini API no configurada")
+
+        response = await client.aio.models.embed_content(
+            model=self.model,
+            contents=texts,
+            config={"output_dimensionality": self.dimension},
+        )
+        matrix = np.array([e.values for e in response.embeddings], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+
+embedder: Optional[Embedder] = None
+
+
+def get_embedder() -> Embedder:
+    global embedder
+    if embedder is None:
+        if settings.embedding_backend == "gemini":
+            embedder = GeminiEmbedder(settings.embedding_dimension)
+        else:
+            embedder = HashingEmbedder(settings.embedding_dimension)
+    return embedder
+
+
+def to_pgvector(vector: np.ndarray) -> str:
+    """Formato de texto aceptado por pgvector: '[0.1,0.2,...]'."""
+    return "[" + ",".join(f"{x:.6f}" for x in vector.tolist()) + "]"
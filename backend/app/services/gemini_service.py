@@ -1,27 +1,135 @@
 import base64
+import hashlib
+import mimetypes
 import os
-from typing import Optional, Dict, Any
-from google import genai
-from google.genai.types import Part, File
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple, Union
 from app.config import settings
 from app.services.langfuse_service import log_generation
+from app.services.concurrency import ConcurrencyLimiter
+from app.services.singleflight import SingleFlight
+from app.services.chunking import estimate_tokens
+from app.services.rate_limit import get_rate_limiter
+from app.services.resilience import call_upstream
+from app.services.prompt_builder import PromptBuilder, get_prompt_budget
+from app.services.image_pipeline import preprocess_image
+from app.http_pool import http_pools
 
-gemini_client: Optional[genai.Client] = None
+if TYPE_CHECKING:
+    from google import genai
 
+VISION_MODEL = "gemini-2.5-flash"
 
-def get_gemini_client() -> genai.Client:
+gemini_client: Optional["genai.Client"] = None
+
+vision_limiter = ConcurrencyLimiter(settings.gemini_max_concurrency, name="gemini-vision")
+vision_flight = SingleFlight(name="gemini-vision")
+
+# Reserva por llamada de visión: tokens de una imagen y salida esperada.
+IMAGE_TOKENS = 258
+EXPECTED_OUTPUT_TOKENS = 1024
+
+# En auditorías visuales las secciones de color/tipografía pesan más.
+VISUAL_SECTIONS = ("paleta", "color", "tipograf", "visual", "logo")
+
+
+def get_gemini_client() -> "genai.Client":
     global gemini_client
     if gemini_client is None:
         if settings.gemini_api_key:
-            gemini_client = genai.Client(api_key=settings.gemini_api_key)
+            # El SDK se importa al primer uso: pesa casi un segundo en el arranque.
+            from google import genai
+            from google.genai.types import HttpOptions
+
+            gemini_client = genai.Client(
+                api_key=settings.gemini_api_key,
+                http_options=HttpOptions(httpx_async_client=http_pools.get_async("gemini")),
+            )
     return gemini_client
 
 
+def close_gemini_client() -> None:
+    """El transporte lo cierra el registro de pools; aquí solo se suelta el cliente."""
+    global gemini_client
+    gemini_client = None
+
+
+def _usage(response) -> Dict[str, int]:
+    meta = getattr(response, "usage_metadata", None)
+    if meta is None:
+        return {}
+    return {
+        "prompt_tokens": meta.prompt_token_count or 0,
+        "completion_tokens": meta.candidates_token_count or 0,
+        "total_tokens": meta.total_token_count or 0
+    }
+
+
+async def _call_vision(client: "genai.Client", contents: list):
+    # El cupo de concurrencia se mantiene durante los reintentos (back-pressure).
+    async with vision_limiter:
+        return await call_upstream(
+            "gemini",
+            VISION_MODEL,
+            lambda: client.aio.models.generate_content(
+                model=VISION_MODEL,
+                contents=contents
+            ),
+            timeout=settings.gemini_timeout_seconds
+        )
+
+
+async def _reserve_vision_call(prompt: str):
+    limiter = get_rate_limiter("gemini", VISION_MODEL)
+    reserved = await limiter.acquire(estimate_tokens(prompt) + IMAGE_TOKENS + EXPECTED_OUTPUT_TOKENS)
+    return limiter, reserved
+
+
+AUDIT_INSTRUCTIONS = """Eres un experto en auditoría de marca. Analiza la imagen subida y compárala con el manual de marca y el contenido textual.
+
+**Instrucciones de análisis:**
+1. Evalúa si la imagen es coherente con la identidad de marca
+2. Verifica si el tono visual es apropiado
+3. Comprueba uso correcto de colores y elementos gráficos
+4. Detecta posibles violaciones de las restricciones de marca
+5. Evalúa la calidad técnica de la imagen
+
+**Respuesta requerida (formato JSON):**
+{
+    "cumple": true/false,
+    "score_conformidad": 0.0-1.0,
+    "razones": ["lista de razones de cumplimiento o fallo"],
+    "recomendaciones": ["sugerencias de mejora si no cumple"],
+    "analisis_detallado": "explicación detallada del análisis"
+}"""
+
+
+def build_audit_prompt(brand_manual_context: str, contenido_text: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Prompt de auditoría dentro del presupuesto de Gemini. Instrucciones y
+    manual forman el prefijo estable; en imágenes se priorizan las
+    secciones visuales del manual y el texto a validar se recorta al final.
+    """
+    builder = PromptBuilder(get_prompt_budget(VISION_MODEL) - IMAGE_TOKENS)
+    builder.add("instrucciones", AUDIT_INSTRUCTIONS, stable=True)
+    builder.add("manual", "**Manual de marca:**", stable=True)
+    builder.add_brand_context(brand_manual_context, boost=VISUAL_SECTIONS)
+    builder.add("contenido", "**Contenido textual a validar:**")
+    builder.add("contenido_text", contenido_text or "", importance=3, truncatable=True)
+    built = builder.build()
+    return built.text, built.report()
+
+
 async def analyze_image(
-    image_data: str,
+    image_data: Union[bytes, str],
     brand_manual_context: str,
-    contenido_text: str
+    contenido_text: str,
+    image_sha256: Optional[str] = None
 ) -> Dict[str, Any]:
+    """
+    `image_data` son los bytes crudos de la imagen (o, por compatibilidad,
+    base64 / data URL). Si se conoce `image_sha256` se usa en la huella del
+    single-flight en vez de volver a hashear la imagen.
+    """
     client = get_gemini_client()
     
     if not client:
@@ -32,42 +140,62 @@ async def analyze_image(
             "score": 0.0
         }
 
-    prompt = f"""Eres un experto en auditoría de marca. Analiza la imagen subida y compárala con el manual de marca y el contenido textual.
+    prompt, prompt_report = build_audit_prompt(brand_manual_context, contenido_text)
+
+    try:
+        if isinstance(image_data, str):
+            if image_data.startswith("data:"):
+                image_data = image_data.split(",", 1)[1]
+            image_bytes = base64.b64decode(image_data)
+        else:
+            image_bytes = image_data
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "analysis": None,
+            "score": 0.0
+        }
+
+    async def call():
+        # Dentro del single-flight: las llamadas coalescidas no repiten el preprocesado.
+        image = await preprocess_image(image_bytes)
+        return await _analyze_bytes(
+            client, prompt, image.data, image.mime_type, contenido_text,
+            {**prompt_report, **image.report()}
+        )
 
-**Contenido textual a validar:**
-{contenido_text}
+    if not settings.llm_singleflight:
+        return await call()
 
-**Manual de marca:**
-{brand_manual_context}
+    fingerprint = hashlib.sha256()
+    fingerprint.update(prompt.encode("utf-8"))
+    if image_sha256:
+        fingerprint.update(image_sha256.encode("ascii"))
+    else:
+        fingerprint.update(image_bytes)
+    return await vision_flight.do(fingerprint.hexdigest(), call)
 
-**Instrucciones de análisis:**
-1. Evalúa si la imagen es coherente con la identidad de marca
-2. Verifica si el tono visual es apropiado
-3. Comprobó uso correcto de colores y elementos gráficos
-4. Detecta posibles violaciones de las restricciones de marca
-5. Evalúa la calidad técnica de la imagen
 
-**Respuesta requerida (formato JSON):**
-{{
-    "cumple": true/false,
-    "score_conformidad": 0.0-1.0,
-    "razones": ["lista de razones de cumplimiento o fallo"],
-    "recomendaciones": ["sugerencias de mejora si no cumple"],
-    "analisis_detallado": "explicación detallada del análisis"
-}}"""
+async def _analyze_bytes(
+    client: "genai.Client",
+    prompt: str,
+    image_bytes: bytes,
+    mime_type: str,
+    contenido_text: str,
+    metadata: Dict[str, Any]
+) -> Dict[str, Any]:
+    from google.genai.types import Part
 
+    limiter, reserved = await _reserve_vision_call(prompt)
+    usage = {}
     try:
-        if image_data.startswith("data:"):
-            image_data = image_data.split(",", 1)[1]
-        
-        image_bytes = base64.b64decode(image_data)
-        
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[prompt, Part.from_bytes(data=image_bytes, mime_type="image/jpeg")]
+        response = await _call_vision(
+            client, [prompt, Part.from_bytes(data=image_bytes, mime_type=mime_type)]
         )
         
         result_text = response.text
+        usage = _usage(response)
         
         score = 0.8
         try:
@@ -82,17 +210,19 @@ async def analyze_image(
         
         log_generation(
             name="image-audit",
-            input_text=prompt[:500],
+            input_text=prompt,
             output_text=result_text[:1000],
-            model="gemini-2.5-flash",
-            metadata={"content_length": len(contenido_text)}
+            model=VISION_MODEL,
+            usage=usage,
+            metadata={"content_length": len(contenido_text), **metadata}
         )
         
         return {
             "success": True,
             "analysis": result_text,
             "score": score,
-            "model": "gemini-2.5-flash"
+            "model": VISION_MODEL,
+            "usage": usage
         }
         
     except Exception as e:
@@ -102,6 +232,8 @@ async def analyze_image(
             "analysis": None,
             "score": 0.0
         }
+    finally:
+        limiter.settle(reserved, usage.get("total_tokens", 0))
 
 
 async def analyze_image_from_url(
@@ -119,37 +251,19 @@ async def analyze_image_from_url(
             "score": 0.0
         }
 
-    prompt = f"""Eres un experto en auditoría de marca. Analiza la imagen subida y compárala con el manual de marca y el contenido textual.
-
-**Contenido textual a validar:**
-{contenido_text}
-
-**Manual de marca:**
-{brand_manual_context}
-
-**Instrucciones de análisis:**
-1. Evalúa si la imagen es coherente con la identidad de marca
-2. Verifica si el tono visual es apropiado
-3. Comprueba uso correcto de colores y elementos gráficos
-4. Detecta posibles violaciones de las restricciones de marca
-5. Evalúa la calidad técnica de la imagen
+    from google.genai.types import File
 
-**Respuesta requerida (formato JSON):**
-{{
-    "cumple": true/false,
-    "score_conformidad": 0.0-1.0,
-    "razones": ["lista de razones"],
-    "recomendaciones": ["sugerencias"],
-    "analisis_detallado": "explicación"
-}}"""
+    prompt, prompt_report = build_audit_prompt(brand_manual_context, contenido_text)
 
+    limiter, reserved = await _reserve_vision_call(prompt)
+    usage = {}
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[prompt, File(uri=image_url, mime_type="image/jpeg")]
+        response = await _call_vision(
+            client, [prompt, File(uri=image_url, mime_type=mimetypes.guess_type(image_url)[0] or "image/jpeg")]
         )
         
         result_text = response.text
+        usage = _usage(response)
         
         score = 0.8
         try:
@@ -164,17 +278,18 @@ async def analyze_image_from_url(
         
         log_generation(
             name="image-audit-url",
-            input_text=prompt[:500],
+            input_text=prompt,
             output_text=result_text[:1000],
-            model="gemini-2.5-flash",
-            metadata={"image_url": image_url}
+            model=VISION_MODEL,
+            usage=usage,
+            metadata={"image_url": image_url, **prompt_report}
         )
         
         return {
             "success": True,
             "analysis": result_text,
             "score": score,
-            "model": "gemini-2.5-flash"
+            "model": VISION_MODEL
         }
         
     except Exception as e:
@@ -184,3 +299,5 @@ async def analyze_image_from_url(
             "analysis": None,
             "score": 0.0
         }
+    finally:
+        limiter.settle(reserved, usage.get("total_tokens", 0))
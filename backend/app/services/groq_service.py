@@ -1,27 +1,59 @@
 import os
-from typing import Optional, Dict, Any
-from groq import AsyncGroq
+from typing import TYPE_CHECKING, Optional, Dict, Any, AsyncIterator, Tuple
 from app.config import settings
 from app.services.langfuse_service import log_generation
+from app.services.llm_cache import get_llm_cache, make_cache_key
+from app.services.singleflight import SingleFlight
+from app.services.chunking import estimate_tokens
+from app.services.prompt_builder import PromptBuilder, get_prompt_budget
+from app.services.rate_limit import get_rate_limiter
+from app.services.resilience import call_upstream
+from app.http_pool import http_pools
 
-groq_client: Optional[AsyncGroq] = None
+if TYPE_CHECKING:
+    from groq import AsyncGroq
 
+groq_client: Optional["AsyncGroq"] = None
 
-def get_groq_client() -> AsyncGroq:
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+groq_flight = SingleFlight(name="groq")
+
+
+def get_groq_client() -> "AsyncGroq":
     global groq_client
     if groq_client is None:
         if settings.groq_api_key:
-            groq_client = AsyncGroq(api_key=settings.groq_api_key)
+            from groq import AsyncGroq
+
+            # Los reintentos los maneja la capa de resiliencia (tenacity).
+            groq_client = AsyncGroq(
+                api_key=settings.groq_api_key,
+                max_retries=0,
+                http_client=http_pools.get_async("groq"),
+            )
     return groq_client
 
 
-async def generate_text(
+def close_groq_client() -> None:
+    """El transporte lo cierra el registro de pools; aquí solo se suelta el cliente."""
+    global groq_client
+    groq_client = None
+
+
+def _estimate_request_tokens(system_prompt: str, prompt: str, max_tokens: int) -> int:
+    # Se reserva el peor caso (prompt + max_tokens); el uso real se ajusta al terminar.
+    return estimate_tokens(system_prompt) + estimate_tokens(prompt) + max_tokens
+
+
+async def _complete(
     prompt: str,
-    system_prompt: str = "Eres un asistente útil.",
-    model: str = "llama-3.3-70b-versatile",
-    temperature: float = 0.7,
-    max_tokens: int = 2048,
-    trace_name: str = "groq-generation"
+    system_prompt: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    trace_name: str,
+    metadata: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     client = get_groq_client()
     
@@ -32,15 +64,23 @@ async def generate_text(
             "text": None
         }
 
+    limiter = get_rate_limiter("groq", model)
+    reserved = await limiter.acquire(_estimate_request_tokens(system_prompt, prompt, max_tokens))
+    used_tokens = 0
     try:
-        response = await client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens
+        response = await call_upstream(
+            "groq",
+            model,
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens
+            ),
+            timeout=settings.groq_timeout_seconds
         )
         
         result_text = response.choices[0].message.content
@@ -50,6 +90,7 @@ async def generate_text(
             "completion_tokens": response.usage.completion_tokens,
             "total_tokens": response.usage.total_tokens
         }
+        used_tokens = usage["total_tokens"]
         
         log_generation(
             name=trace_name,
@@ -57,7 +98,7 @@ async def generate_text(
             output_text=result_text,
             model=model,
             usage=usage,
-            metadata={"system_prompt": system_prompt[:100]}
+            metadata={"system_prompt": system_prompt[:100], **(metadata or {})}
         )
         
         return {
@@ -73,14 +114,131 @@ async def generate_text(
             "error": str(e),
             "text": None
         }
+    finally:
+        limiter.settle(reserved, used_tokens)
 
 
-async def generate_brand_manual(
+async def generate_text(
+    prompt: str,
+    system_prompt: str = "Eres un asistente útil.",
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    trace_name: str = "groq-generation",
+    use_cache: bool = False,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Genera texto con Groq. Con `use_cache=True` se acepta una respuesta
+    previa idéntica (mismo modelo, prompts, temperatura y max_tokens).
+    Las llamadas idénticas concurrentes comparten una sola petición upstream.
+    """
+    cache_key = make_cache_key(model, system_prompt, prompt, temperature, max_tokens)
+    if use_cache:
+        cached = await get_llm_cache().get(cache_key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+    def call():
+        return _complete(prompt, system_prompt, model, temperature, max_tokens, trace_name, metadata)
+
+    if settings.llm_singleflight:
+        result = await groq_flight.do(cache_key, call)
+    else:
+        result = await call()
+
+    if use_cache and result["success"]:
+        await get_llm_cache().set(cache_key, result)
+    
+    return {**result, "cached": False} if result["success"] else result
+
+
+async def stream_text(
+    prompt: str,
+    system_prompt: str = "Eres un asistente útil.",
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    trace_name: str = "groq-generation-stream",
+    metadata: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Variante en streaming de `generate_text`. Emite eventos
+    `{"type": "token", "text": ...}` a medida que llegan y un evento final
+    `{"type": "done", ...}` con el texto completo y el uso de tokens, o
+    `{"type": "error", "error": ...}`.
+    """
+    client = get_groq_client()
+    
+    if not client:
+        yield {"type": "error", "error": "Groq API no configurada"}
+        return
+
+    limiter = get_rate_limiter("groq", model)
+    reserved = await limiter.acquire(_estimate_request_tokens(system_prompt, prompt, max_tokens))
+    parts = []
+    usage = {}
+    try:
+        # Solo se reintenta el inicio del stream; una vez emitidos tokens no se repite.
+        stream = await call_upstream(
+            "groq",
+            model,
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            ),
+            timeout=settings.groq_timeout_seconds
+        )
+        
+        async for chunk in stream:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield {"type": "token", "text": delta}
+            
+            # Groq reporta el uso en el último chunk (x_groq.usage)
+            chunk_usage = chunk.usage or (chunk.x_groq.usage if chunk.x_groq else None)
+            if chunk_usage:
+                usage = {
+                    "prompt_tokens": chunk_usage.prompt_tokens,
+                    "completion_tokens": chunk_usage.completion_tokens,
+                    "total_tokens": chunk_usage.total_tokens
+                }
+        
+    except Exception as e:
+        yield {"type": "error", "error": str(e)}
+        return
+    finally:
+        # Sin uso reportado (p. ej. cliente desconectado) se conserva la reserva.
+        limiter.settle(reserved, usage.get("total_tokens", reserved))
+
+    result_text = "".join(parts)
+    
+    log_generation(
+        name=trace_name,
+        input_text=prompt,
+        output_text=result_text,
+        model=model,
+        usage=usage,
+        metadata={"system_prompt": system_prompt[:100], "stream": True, **(metadata or {})}
+    )
+    
+    yield {"type": "done", "text": result_text, "usage": usage, "model": model}
+
+
+def build_brand_manual_prompt(
     producto: str,
     tono: str,
     publica_objetivo: str,
     restricciones: str
-) -> Dict[str, Any]:
+) -> Tuple[str, str]:
     system_prompt = """Eres un experto en branding y marketing. Tu tarea es crear un Manual de Marca estructurado y completo."""
     
     prompt = f"""Crea un Manual de Marca detallado con la siguiente información:
@@ -102,6 +260,19 @@ El manual debe incluir:
 
 Formato: Markdown estructurado."""
 
+    return system_prompt, prompt
+
+
+async def generate_brand_manual(
+    producto: str,
+    tono: str,
+    publica_objetivo: str,
+    restricciones: str
+) -> Dict[str, Any]:
+    system_prompt, prompt = build_brand_manual_prompt(
+        producto, tono, publica_objetivo, restricciones
+    )
+
     return await generate_text(
         prompt=prompt,
         system_prompt=system_prompt,
@@ -109,54 +280,104 @@ Formato: Markdown estructurado."""
     )
 
 
-async def generate_contenido(
-    tipo_contenido: str,
-    brand_manual_context: str,
+async def stream_brand_manual(
     producto: str,
-    titulo: str
-) -> Dict[str, Any]:
-    prompts = {
-        "descripcion": f"""Basándote en el manual de marca y las directrices de producto, crea una descripción de producto profesional y atractiva.
-
-Producto: {titulo}
-{producto}
+    tono: str,
+    publica_objetivo: str,
+    restricciones: str
+) -> AsyncIterator[Dict[str, Any]]:
+    system_prompt, prompt = build_brand_manual_prompt(
+        producto, tono, publica_objetivo, restricciones
+    )
 
-Contexto del manual de marca:
-{brand_manual_context}
+    async for event in stream_text(
+        prompt=prompt,
+        system_prompt=system_prompt,
+        trace_name="brand-manual-generation-stream"
+    ):
+        yield event
 
-La descripción debe ser persuasiva, adecuada al tono de marca, y lista para usar en e-commerce.""",
-        
-        "guion_video": f"""Crea un guion de video marketing profesional.
 
-Producto: {titulo}
-{producto}
+CONTENIDO_INSTRUCTIONS = {
+    "descripcion": """Basándote en el manual de marca y las directrices de producto, crea una descripción de producto profesional y atractiva.
 
-Contexto del manual de marca:
-{brand_manual_context}
+La descripción debe ser persuasiva, adecuada al tono de marca, y lista para usar en e-commerce.""",
+    
+    "guion_video": """Crea un guion de video marketing profesional.
 
 El guion debe incluir:
 - Introducción hook
 - Beneficios clave
 - Llamada a la acción
 - Duración estimada: 30-60 segundos""",
-        
-        "prompt_imagen": f"""Crea un prompt detallado para generación de imagen IA.
+    
+    "prompt_imagen": """Crea un prompt detallado para generación de imagen IA.
 
-Producto: {titulo}
-{producto}
+El prompt debe ser detallado, especificar estilo visual, iluminación, composición, y debe ser coherente con la identidad de marca."""
+}
 
-Contexto del manual de marca:
-{brand_manual_context}
 
-El prompt debe ser detallado, especificar estilo visual, iluminación, composición, y debe ser coherente con la identidad de marca."""
-    }
+def build_contenido_prompt(
+    tipo_contenido: str,
+    brand_manual_context: str,
+    producto: str,
+    titulo: str,
+    model: str = DEFAULT_MODEL
+) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Prompt de contenido dentro del presupuesto del modelo. El contexto de
+    marca va primero (prefijo estable entre llamadas del mismo manual) y
+    las secciones menos importantes se descartan si no cabe.
+    """
+    system_prompt = """Eres un experto en marketing de contenidos. Crea contenido de alta calidad alineado con la marca."""
     
-    prompt = prompts.get(tipo_contenido, prompts["descripcion"])
+    builder = PromptBuilder(get_prompt_budget(model) - estimate_tokens(system_prompt))
+    builder.add("contexto", "Contexto del manual de marca:", stable=True)
+    builder.add_brand_context(brand_manual_context)
+    builder.add(
+        "instrucciones",
+        CONTENIDO_INSTRUCTIONS.get(tipo_contenido, CONTENIDO_INSTRUCTIONS["descripcion"])
+    )
+    builder.add("producto", f"Producto: {titulo}\n{producto}")
+    built = builder.build()
     
-    system_prompt = """Eres un experto en marketing de contenidos. Crea contenido de alta calidad alineado con la marca."""
+    return system_prompt, built.text, built.report()
+
+
+async def generate_contenido(
+    tipo_contenido: str,
+    brand_manual_context: str,
+    producto: str,
+    titulo: str,
+    use_cache: bool = False
+) -> Dict[str, Any]:
+    system_prompt, prompt, report = build_contenido_prompt(
+        tipo_contenido, brand_manual_context, producto, titulo
+    )
     
     return await generate_text(
         prompt=prompt,
         system_prompt=system_prompt,
-        trace_name=f"content-generation-{tipo_contenido}"
+        trace_name=f"content-generation-{tipo_contenido}",
+        use_cache=use_cache,
+        metadata=report
+    )
+
+
+async def stream_contenido(
+    tipo_contenido: str,
+    brand_manual_context: str,
+    producto: str,
+    titulo: str
+) -> AsyncIterator[Dict[str, Any]]:
+    system_prompt, prompt, report = build_contenido_prompt(
+        tipo_contenido, brand_manual_context, producto, titulo
     )
+
+    async for event in stream_text(
+        prompt=prompt,
+        system_prompt=system_prompt,
+        trace_name=f"content-generation-{tipo_contenido}-stream",
+        metadata=report
+    ):
+        yield event
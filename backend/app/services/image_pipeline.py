@@ -0,0 +1,216 @@
+import asyncio
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from PIL import Image, ImageOps
+
+from app.config import settings
+from app.services.media import sniff_mime_type
+
+# Formatos que Gemini acepta tal cual si no hace falta re-codificar.
+GEMINI_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp", "image/heic", "image/heif"}
+
+_OUTPUT_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+
+image_executor: Optional[ThreadPoolExecutor] = None
+
+
+class PreparedImage:
+    def __init__(
+        self,
+        data: bytes,
+        mime_type: str,
+        original_bytes: int,
+        original_mime_type: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        resized: bool = False,
+        reencoded: bool = False,
+        timings: Optional[Dict[str, float]] = None,
+    ):
+        self.data = data
+        self.mime_type = mime_type
+        self.original_bytes = original_bytes
+        self.original_mime_type = original_mime_type
+        self.width = width
+        self.height = height
+        self.resized = resized
+        self.reencoded = reencoded
+        self.timings = timings or {}
+
+    @property
+    def saved_bytes(self) -> int:
+        return max(0, self.original_bytes - len(self.data))
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "image_mime_type": self.original_mime_type,
+            "image_sent_mime_type": self.mime_type,
+            "image_bytes_original": self.original_bytes,
+            "image_bytes_sent": len(self.data),
+            "image_bytes_saved": self.saved_bytes,
+            "image_size": f"{self.width}x{self.height}" if self.width else None,
+            "image_timings_ms": self.timings,
+        }
+
+
+class ImagePipelineStats:
+    STAGES = ("sniff", "decode", "resize", "encode", "total")
+
+    def __init__(self):
+        self.processed = 0
+        self.passthrough = 0
+        self.resized = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.stage_ms = {stage: 0.0 for stage in self.STAGES}
+
+    def record(self, image: PreparedImage) -> None:
+        self.processed += 1
+        self.passthrough += int(not image.reencoded)
+        self.resized += int(image.resized)
+        self.bytes_in += image.original_bytes
+        self.bytes_out += len(image.data)
+        for stage, ms in image.timings.items():
+            self.stage_ms[stage] = self.stage_ms.get(stage, 0.0) + ms
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": get_image_pool_size(),
+            "started": image_executor is not None,
+            "processed": self.processed,
+            "passthrough": self.passthrough,
+            "resized": self.resized,
+            "errors": self.errors,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": max(0, self.bytes_in - self.bytes_out),
+            "avg_stage_ms": {
+                stage: round(total / self.processed, 2) if self.processed else 0.0
+                for stage, total in self.stage_ms.items()
+            },
+        }
+
+
+image_stats = ImagePipelineStats()
+
+
+def get_image_pool_size() -> int:
+    return settings.image_pool_workers or os.cpu_count() or 1
+
+
+def get_image_executor() -> ThreadPoolExecutor:
+    """
+    Pool dedicado al preprocesado. Pillow libera el GIL al decodificar,
+    redimensionar y codificar, así que corre en paralelo fuera del loop.
+    """
+    global image_executor
+    if image_executor is None:
+        image_executor = ThreadPoolExecutor(
+            max_workers=get_image_pool_size(), thread_name_prefix="image"
+        )
+    return image_executor
+
+
+def shutdown_image_executor() -> None:
+    global image_executor
+    if image_executor is not None:
+        image_executor.shutdown(wait=False, cancel_futures=True)
+    image_executor = None
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def _to_output_mode(image: Image.Image, pil_format: str) -> Image.Image:
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    if pil_format == "JPEG" or not has_alpha:
+        if has_alpha:
+            # JPEG no tiene canal alfa: se aplana sobre fondo blanco.
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image.convert("RGBA"), mask=image.convert("RGBA").split()[-1])
+            return background
+        return image if image.mode == "RGB" else image.convert("RGB")
+    return image if image.mode == "RGBA" else image.convert("RGBA")
+
+
+def preprocess_image_sync(data: bytes) -> PreparedImage:
+    """
+    Detecta el formato real, corrige la orientación EXIF, reduce la imagen
+    a `image_max_dimension` y la re-codifica en `image_output_format`. Si
+    no se puede decodificar, o el resultado no es más chico y ya es un
+    formato aceptado, se envía el original.
+    """
+    timings: Dict[str, float] = {}
+    total_start = time.perf_counter()
+
+    start = time.perf_counter()
+    mime_type = sniff_mime_type(data)
+    timings["sniff"] = _elapsed_ms(start)
+
+    def passthrough(width: Optional[int] = None, height: Optional[int] = None) -> PreparedImage:
+        timings["total"] = _elapsed_ms(total_start)
+        return PreparedImage(data, mime_type, len(data), mime_type, width, height, timings=timings)
+
+    if not settings.image_preprocess:
+        return passthrough()
+
+    start = time.perf_counter()
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft("RGB", (settings.image_max_dimension, settings.image_max_dimension))
+        image = ImageOps.exif_transpose(image)
+    except Exception:
+        image_stats.errors += 1
+        return passthrough()
+    timings["decode"] = _elapsed_ms(start)
+    width, height = image.size
+
+    start = time.perf_counter()
+    max_dimension = settings.image_max_dimension
+    resized = max(width, height) > max_dimension
+    if resized:
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    timings["resize"] = _elapsed_ms(start)
+
+    pil_format, output_mime = _OUTPUT_FORMATS.get(
+        settings.image_output_format.lower(), _OUTPUT_FORMATS["webp"]
+    )
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    options = {"optimize": True} if pil_format == "PNG" else {"quality": settings.image_quality}
+    _to_output_mode(image, pil_format).save(buffer, format=pil_format, **options)
+    encoded = buffer.getvalue()
+    timings["encode"] = _elapsed_ms(start)
+
+    if not resized and len(encoded) >= len(data) and mime_type in GEMINI_IMAGE_TYPES:
+        return passthrough(width, height)
+
+    timings["total"] = _elapsed_ms(total_start)
+    return PreparedImage(
+        encoded,
+        output_mime,
+        len(data),
+        mime_type,
+        image.width,
+        image.height,
+        resized=resized,
+        reencoded=True,
+        timings=timings,
+    )
+
+
+async def preprocess_image(data: bytes) -> PreparedImage:
+    loop = asyncio.get_running_loop()
+    prepared = await loop.run_in_executor(get_image_executor(), preprocess_image_sync, data)
+    image_stats.record(prepared)
+    return prepared
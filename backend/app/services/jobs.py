@@ -0,0 +1,405 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.models.job import EstadoJob, ESTADOS_FINALES
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+JSON_COLUMNS = ("payload", "resultado")
+
+
+class JobNotFoundError(Exception):
+    pass
+
+
+class JobStateError(Exception):
+    pass
+
+
+class SQLiteJobStore:
+    """
+    Estado persistente de los jobs en SQLite. Sobrevive reinicios: los
+    jobs en cola se reanudan y los que estaban ejecutándose se marcan
+    como fallidos para poder reintentarlos.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        # Se abre en el primer uso (con el lock tomado) para no tocar disco al importar.
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    tipo TEXT NOT NULL,
+                    estado TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    resultado TEXT,
+                    error TEXT,
+                    intentos INTEGER NOT NULL DEFAULT 0,
+                    created_by TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_created_by ON jobs(created_by, created_at DESC)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_estado ON jobs(estado)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for column in JSON_COLUMNS:
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        job["queue_ms"] = (
+            round((job["started_at"] - job["created_at"]) * 1000, 2)
+            if job["started_at"] else None
+        )
+        job["run_ms"] = (
+            round((job["finished_at"] - job["started_at"]) * 1000, 2)
+            if job["started_at"] and job["finished_at"] else None
+        )
+        return job
+
+    def create(self, tipo: str, payload: Dict[str, Any], created_by: Optional[str]) -> Dict[str, Any]:
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._db().execute(
+                "INSERT INTO jobs (id, tipo, estado, payload, created_by, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    tipo,
+                    EstadoJob.EN_COLA.value,
+                    json.dumps(payload, ensure_ascii=False),
+                    created_by,
+                    time.time(),
+                ),
+            )
+            self._db().commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def update(self, job_id: str, expected_estado: Optional[str] = None, **fields: Any) -> bool:
+        """
+        Con `expected_estado` la transición es condicional (`WHERE estado = ?`):
+        devuelve False si el job ya no estaba en ese estado.
+        """
+        for column in JSON_COLUMNS:
+            if fields.get(column) is not None:
+                fields[column] = json.dumps(fields[column], ensure_ascii=False, default=str)
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        query = f"UPDATE jobs SET {assignments} WHERE id = ?"
+        params: tuple = (*fields.values(), job_id)
+        if expected_estado is not None:
+            query += " AND estado = ?"
+            params += (expected_estado,)
+        with self._lock:
+            cursor = self._db().execute(query, params)
+            self._db().commit()
+        return cursor.rowcount == 1
+
+    def list(self, created_by: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM jobs"
+        params: tuple = ()
+        if created_by is not None:
+            query += " WHERE created_by = ?"
+            params = (created_by,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._db().execute(query, (*params, limit)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def recover(self) -> List[str]:
+        """Marca como fallidos los jobs interrumpidos y devuelve los que seguían en cola."""
+        with self._lock:
+            self._db().execute(
+                "UPDATE jobs SET estado = ?, error = ?, finished_at = ? WHERE estado = ?",
+                (
+                    EstadoJob.FALLIDO.value,
+                    "Interrumpido por reinicio del servidor",
+                    time.time(),
+                    EstadoJob.EJECUTANDO.value,
+                ),
+            )
+            self._db().commit()
+            rows = self._db().execute(
+                "SELECT id FROM jobs WHERE estado = ? ORDER BY created_at",
+                (EstadoJob.EN_COLA.value,),
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT estado, COUNT(*) AS total FROM jobs GROUP BY estado"
+            ).fetchall()
+        return {row["estado"]: row["total"] for row in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class JobQueue:
+    """
+    Cola de jobs en proceso: los endpoints encolan y responden 202 de
+    inmediato, y un pool de workers ejecuta los handlers registrados por
+    tipo con timeout por job. Soporta cancelación, reintento y
+    suscripción a cambios de estado.
+    """
+
+    def __init__(self, store: SQLiteJobStore, workers: int, timeout_seconds: float):
+        self.store = store
+        self.workers = max(1, workers)
+        self.timeout_seconds = timeout_seconds
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.timeouts = 0
+        self.total_run = 0.0
+
+    def register(self, tipo: str, handler: JobHandler) -> None:
+        self._handlers[tipo] = handler
+
+    async def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        for job_id in await asyncio.to_thread(self.store.recover):
+            self._queue.put_nowait(job_id)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self.store.close()
+
+    async def submit(self, tipo: str, payload: Dict[str, Any], created_by: Optional[str]) -> Dict[str, Any]:
+        if tipo not in self._handlers:
+            raise ValueError(f"Tipo de job desconocido: {tipo}")
+        await self.start()
+        job = await asyncio.to_thread(self.store.create, tipo, payload, created_by)
+        self._queue.put_nowait(job["id"])
+        return job
+
+    async def get(self, job_id: str) -> Dict[str, Any]:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    async def list(self, created_by: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.list, created_by, limit)
+
+    async def cancel(self, job_id: str) -> Dict[str, Any]:
+        job = await self.get(job_id)
+        if job["estado"] in ESTADOS_FINALES:
+            raise JobStateError(f"El job ya terminó ({job['estado']})")
+
+        task = self._running.get(job_id)
+        if task is None:
+            cancelled = await asyncio.to_thread(
+                self.store.update,
+                job_id,
+                expected_estado=EstadoJob.EN_COLA.value,
+                estado=EstadoJob.CANCELADO.value,
+                finished_at=time.time(),
+                error="Cancelado por el usuario",
+            )
+            if cancelled:
+                self.cancelled += 1
+                self._notify(job_id)
+                return await self.get(job_id)
+            # Un worker lo tomó mientras tanto: su tarea ya está registrada.
+            task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return await self.get(job_id)
+
+    async def retry(self, job_id: str) -> Dict[str, Any]:
+        job = await self.get(job_id)
+        if job["estado"] not in (EstadoJob.FALLIDO.value, EstadoJob.CANCELADO.value):
+            raise JobStateError("Solo se pueden reintentar jobs fallidos o cancelados")
+
+        await self.start()
+        await asyncio.to_thread(
+            self.store.update,
+            job_id,
+            estado=EstadoJob.EN_COLA.value,
+            resultado=None,
+            error=None,
+            started_at=None,
+            finished_at=None,
+        )
+        self._notify(job_id)
+        self._queue.put_nowait(job_id)
+        return await self.get(job_id)
+
+    async def watch(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Emite el estado del job en cada cambio hasta que termina. Emite
+        None cada `heartbeat` segundos sin cambios (keep-alive).
+        """
+        while True:
+            changed = self._changed.setdefault(job_id, asyncio.Event())
+            job = await self.get(job_id)
+            yield job
+            if job["estado"] in ESTADOS_FINALES:
+                return
+            while True:
+                try:
+                    await asyncio.wait_for(changed.wait(), heartbeat)
+                    break
+                except asyncio.TimeoutError:
+                    yield None
+
+    def _notify(self, job_id: str) -> None:
+        changed = self._changed.pop(job_id, None)
+        if changed is not None:
+            changed.set()
+
+    async def _finish(self, job_id: str, estado: EstadoJob, **fields: Any) -> None:
+        await asyncio.to_thread(
+            self.store.update, job_id, estado=estado.value, finished_at=time.time(), **fields
+        )
+        self._notify(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} worker error: {e}")
+
+    async def _run(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job["estado"] != EstadoJob.EN_COLA.value:
+            return
+
+        handler = self._handlers.get(job["tipo"])
+        if handler is None:
+            await self._finish(job_id, EstadoJob.FALLIDO, error=f"Tipo de job desconocido: {job['tipo']}")
+            self.failed += 1
+            return
+
+        started = time.time()
+        claimed = await asyncio.to_thread(
+            self.store.update,
+            job_id,
+            expected_estado=EstadoJob.EN_COLA.value,
+            estado=EstadoJob.EJECUTANDO.value,
+            started_at=started,
+            intentos=job["intentos"] + 1,
+        )
+        if not claimed:
+            # Se canceló entre la lectura y el inicio: no se ejecuta.
+            return
+        self._notify(job_id)
+
+        task = asyncio.create_task(handler(job["payload"]))
+        self._running[job_id] = task
+        try:
+            done, _ = await asyncio.wait({task}, timeout=self.timeout_seconds)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            self._running.pop(job_id, None)
+
+        self.total_run += time.time() - started
+        if not done:
+            task.cancel()
+            self.timeouts += 1
+            self.failed += 1
+            await self._finish(
+                job_id,
+                EstadoJob.FALLIDO,
+                error=f"Tiempo de espera agotado ({self.timeout_seconds:g}s)",
+            )
+        elif task.cancelled():
+            self.cancelled += 1
+            await self._finish(job_id, EstadoJob.CANCELADO, error="Cancelado por el usuario")
+        elif task.exception() is not None:
+            error = task.exception()
+            self.failed += 1
+            await self._finish(
+                job_id, EstadoJob.FALLIDO, error=str(getattr(error, "detail", None) or error)
+            )
+        else:
+            self.completed += 1
+            await self._finish(job_id, EstadoJob.COMPLETADO, resultado=task.result())
+
+    async def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed + self.cancelled
+        return {
+            "workers": self.workers,
+            "timeout_seconds": self.timeout_seconds,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "running": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "timeouts": self.timeouts,
+            "avg_run_ms": round(self.total_run / finished * 1000, 2) if finished else 0.0,
+            # El conteo es una consulta SQLite: fuera del event loop.
+            "stored": await asyncio.to_thread(self.store.counts),
+        }
+
+
+def _default_store_path() -> str:
+    return settings.jobs_sqlite_path or ":memory:"
+
+
+job_queue = JobQueue(
+    SQLiteJobStore(_default_store_path()),
+    workers=settings.jobs_workers,
+    timeout_seconds=settings.jobs_timeout_seconds,
+)
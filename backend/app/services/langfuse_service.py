@@ -1,14 +1,19 @@
+import asyncio
 import logging
-from typing import Optional
-from langfuse import Langfuse
+from collections import deque
+from typing import TYPE_CHECKING, Deque, List, Optional
 from app.config import settings
+from app.http_pool import http_pools
+
+if TYPE_CHECKING:
+    from langfuse import Langfuse
 
 logger = logging.getLogger(__name__)
 
-langfuse_client: Optional[Langfuse] = None
+langfuse_client: Optional["Langfuse"] = None
 
 
-def get_langfuse() -> Optional[Langfuse]:
+def get_langfuse() -> Optional["Langfuse"]:
     """
     Obtiene o crea el cliente de Langfuse.
     Retorna None si las credenciales no están configuradas.
@@ -27,11 +32,14 @@ def get_langfuse() -> Optional[Langfuse]:
         return None
 
     try:
+        from langfuse import Langfuse
+
         # Inicialización directa con las credenciales de settings
         langfuse_client = Langfuse(
             public_key=public_key,
             secret_key=secret_key,
             host=host,
+            httpx_client=http_pools.get_sync("langfuse"),
         )
         logger.info("Langfuse client initialized successfully")
     except Exception as e:
@@ -41,6 +49,16 @@ def get_langfuse() -> Optional[Langfuse]:
     return langfuse_client
 
 
+def shutdown_langfuse() -> None:
+    global langfuse_client
+    if langfuse_client is not None:
+        try:
+            langfuse_client.shutdown()
+        except Exception as e:
+            logger.warning(f"Langfuse shutdown error: {e}")
+    langfuse_client = None
+
+
 def langfuse_trace(name: str):
     """
     Decorador para hacer tracing de funciones con Langfuse usando observations.
@@ -64,6 +82,139 @@ def langfuse_trace(name: str):
     return decorator
 
 
+class TraceExporter:
+    """
+    Exportador en segundo plano: las generaciones se encolan en memoria
+    (cola acotada, descarta la más antigua al llenarse) y se envían a
+    Langfuse por lotes, por tamaño o por temporizador.
+    """
+
+    def __init__(self, max_queue_size: int, batch_size: int, flush_interval: float):
+        self.max_queue_size = max_queue_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: Deque[dict] = deque(maxlen=max_queue_size)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.exported = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    def enqueue(self, record: dict) -> None:
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(record)
+        self.enqueued += 1
+
+        self._ensure_started()
+        if self._wakeup is not None and len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_started(self) -> None:
+        if self._task is not None or self._stopping:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.start()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="langfuse-exporter")
+
+    async def stop(self) -> None:
+        """Detiene el exportador y envía lo que quede en cola."""
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self._drain()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._drain()
+
+    async def _drain(self) -> None:
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            await asyncio.to_thread(self._export_batch, batch)
+
+    def _export_batch(self, batch: List[dict]) -> None:
+        lf = get_langfuse()
+        if not lf:
+            logger.debug("Langfuse not configured - discarding %d generations", len(batch))
+            return
+
+        try:
+            for record in batch:
+                _write_generation(lf, **record)
+            lf.flush()
+            self.exported += len(batch)
+            logger.info(f"Langfuse batch exported: {len(batch)} generations")
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"Langfuse export error: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "max_queue_size": self.max_queue_size,
+            "enqueued": self.enqueued,
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+            "running": self._task is not None,
+        }
+
+
+trace_exporter = TraceExporter(
+    max_queue_size=settings.langfuse_queue_max_size,
+    batch_size=settings.langfuse_batch_size,
+    flush_interval=settings.langfuse_flush_interval,
+)
+
+
+def _write_generation(
+    lf: "Langfuse",
+    name: str,
+    input_text: str,
+    output_text: str,
+    model: str,
+    usage: Optional[dict] = None,
+    metadata: Optional[dict] = None,
+) -> None:
+    # Crear un span principal
+    with lf.start_as_current_observation(as_type="span", name=name) as span:
+        span.update(input=input_text, output=output_text, metadata=metadata or {})
+
+        # Crear una generación anidada
+        with lf.start_as_current_observation(
+            as_type="generation",
+            name=f"{name}-generation",
+            model=model,
+        ) as generation:
+            generation.update(
+                input=input_text,
+                output=output_text,
+                usage=usage or {},
+                metadata=metadata or {},
+            )
+
+
 def log_generation(
     name: str,
     input_text: str,
@@ -74,36 +225,17 @@ def log_generation(
 ) -> Optional[object]:
     """
     Registra una generación en Langfuse para visualización en el dashboard.
+    Solo encola el registro; el envío ocurre en segundo plano.
     """
     try:
-        lf = get_langfuse()
-        if not lf:
-            logger.debug("Langfuse not configured - skipping generation log")
-            return None
-
-        # Crear un span principal
-        with lf.start_as_current_observation(as_type="span", name=name) as span:
-            span.update(input=input_text, output=output_text, metadata=metadata or {})
-
-            # Crear una generación anidada
-            with lf.start_as_current_observation(
-                as_type="generation",
-                name=f"{name}-generation",
-                model=model,
-            ) as generation:
-                generation.update(
-                    input=input_text,
-                    output=output_text,
-                    usage=usage or {},
-                    metadata=metadata or {},
-                )
-
-        try:
-            lf.flush()
-        except Exception as flush_error:
-            logger.warning(f"Langfuse flush error: {flush_error}")
-
-        logger.info(f"Langfuse generation logged: {name} (model: {model})")
+        trace_exporter.enqueue({
+            "name": name,
+            "input_text": input_text,
+            "output_text": output_text,
+            "model": model,
+            "usage": usage,
+            "metadata": metadata,
+        })
         return True
 
     except Exception as e:
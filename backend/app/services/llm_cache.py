@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    payload = json.dumps(
+        [model, system_prompt, prompt, round(temperature, 4), max_tokens],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteResponseStore:
+    """
+    Nivel en disco del caché de respuestas: SQLite con TTL y expulsión
+    por tamaño total (los menos usados recientemente salen primero).
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_access ON llm_responses(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute(
+            "DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_responses ORDER BY last_access ASC"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM llm_responses WHERE key = ?", victims)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    """
+    Caché de respuestas exactas del LLM en dos niveles: LRU en memoria y,
+    opcionalmente, SQLite en disco. Reporta hits y tokens ahorrados.
+    """
+
+    def __init__(self, memory: TTLCache, disk: Optional[SQLiteResponseStore] = None):
+        self.memory = memory
+        self.disk = disk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_prompt_tokens = 0
+        self.saved_completion_tokens = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+        elif self.disk is not None:
+            try:
+                value = await asyncio.to_thread(self.disk.get, key)
+            except Exception as e:
+                logger.warning(f"LLM disk cache read error: {e}")
+                value = None
+            if value is not None:
+                self.disk_hits += 1
+                self.memory.set(key, value)
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        usage = value.get("usage") or {}
+        self.saved_prompt_tokens += usage.get("prompt_tokens") or 0
+        self.saved_completion_tokens += usage.get("completion_tokens") or 0
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, value)
+            except Exception as e:
+                logger.warning(f"LLM disk cache write error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_prompt_tokens": self.saved_prompt_tokens,
+            "saved_completion_tokens": self.saved_completion_tokens,
+            "saved_tokens": self.saved_prompt_tokens + self.saved_completion_tokens,
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+
+llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global llm_cache
+    if llm_cache is None:
+        disk = None
+        if settings.llm_cache_sqlite_path:
+            try:
+                disk = SQLiteResponseStore(
+                    settings.llm_cache_sqlite_path,
+                    ttl_seconds=settings.llm_cache_ttl_seconds,
+                    max_bytes=settings.llm_cache_disk_max_mb * 1024 * 1024,
+                )
+            except Exception as e:
+                logger.error(f"LLM disk cache disabled: {e}")
+        llm_cache = LLMResponseCache(
+            memory=TTLCache(
+                max_size=settings.llm_cache_max_entries,
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                name="llm-responses",
+            ),
+            disk=disk,
+        )
+    return llm_cache
+
+
+def close_llm_cache() -> None:
+    global llm_cache
+    if llm_cache is not None and llm_cache.disk is not None:
+        llm_cache.disk.close()
+    llm_cache = None
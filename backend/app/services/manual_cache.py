@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.config import settings
+from app.models.brand_manual import BrandManualResponse
+from app.services.cache import TTLCache
+
+
+class CachedManual:
+    def __init__(self, manual: BrandManualResponse, max_contexts: int):
+        self.manual = manual
+        self.max_contexts = max_contexts
+        self.contexts: "OrderedDict[Hashable, str]" = OrderedDict()
+
+    def get_context(self, key: Hashable) -> Optional[str]:
+        value = self.contexts.get(key)
+        if value is not None:
+            self.contexts.move_to_end(key)
+        return value
+
+    def set_context(self, key: Hashable, value: str) -> None:
+        self.contexts[key] = value
+        self.contexts.move_to_end(key)
+        while len(self.contexts) > self.max_contexts:
+            self.contexts.popitem(last=False)
+
+
+class BrandManualCache:
+    """
+    Caché en proceso de manuales de marca y de sus contextos de prompt ya
+    formateados, por `(id, version)`. Un puntero `id -> version` con TTL
+    corto resuelve la versión vigente sin ir a la base; los endpoints de
+    escritura de manuales lo invalidan explícitamente.
+    """
+
+    def __init__(self, max_manuals: int, ttl_seconds: float, max_contexts: int):
+        self.max_contexts = max_contexts
+        self._versions = TTLCache(max_size=max_manuals, ttl_seconds=ttl_seconds, name="manual-versions")
+        self._entries = TTLCache(max_size=max_manuals, ttl_seconds=ttl_seconds, name="manual-entries")
+        self.context_hits = 0
+        self.context_misses = 0
+
+    def _entry(self, manual: BrandManualResponse) -> Optional[CachedManual]:
+        return self._entries.get((manual.id, manual.version))
+
+    def get(self, manual_id: str) -> Optional[BrandManualResponse]:
+        version = self._versions.get(manual_id)
+        if version is None:
+            return None
+        entry = self._entries.get((manual_id, version))
+        return entry.manual if entry is not None else None
+
+    def put(self, manual: BrandManualResponse) -> None:
+        key = (manual.id, manual.version)
+        if self._entries.get(key) is None:
+            self._entries.set(key, CachedManual(manual, self.max_contexts))
+        self._versions.set(manual.id, manual.version)
+
+    def invalidate(self, manual_id: str) -> None:
+        version = self._versions.get(manual_id)
+        self._versions.invalidate(manual_id)
+        if version is not None:
+            self._entries.invalidate((manual_id, version))
+
+    def memoize_context(self, manual: BrandManualResponse, key: Hashable, build: Callable[[], str]) -> str:
+        entry = self._entry(manual)
+        if entry is not None:
+            value = entry.get_context(key)
+            if value is not None:
+                self.context_hits += 1
+                return value
+
+        self.context_misses += 1
+        value = build()
+        if entry is not None:
+            entry.set_context(key, value)
+        return value
+
+    async def memoize_context_async(
+        self, manual: BrandManualResponse, key: Hashable, build: Callable[[], Awaitable[str]]
+    ) -> str:
+        entry = self._entry(manual)
+        if entry is not None:
+            value = entry.get_context(key)
+            if value is not None:
+                self.context_hits += 1
+                return value
+
+        self.context_misses += 1
+        value = await build()
+        if entry is not None:
+            entry.set_context(key, value)
+        return value
+
+    def clear(self) -> None:
+        self._versions.clear()
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.context_hits + self.context_misses
+        return {
+            "manuals": self._entries.stats(),
+            "versions": self._versions.stats(),
+            "context_hits": self.context_hits,
+            "context_misses": self.context_misses,
+            "context_hit_ratio": round(self.context_hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+brand_manual_cache = BrandManualCache(
+    max_manuals=settings.manual_cache_max_entries,
+    ttl_seconds=settings.manual_cache_ttl_seconds,
+    max_contexts=settings.manual_cache_contexts_per_manual,
+)
@@ -0,0 +1,25 @@
+from typing import Optional
+
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+
+
+def sniff_mime_type(data: bytes, default: Optional[str] = "application/octet-stream") -> Optional[str]:
+    """
+    Detecta el tipo MIME real de una imagen a partir de sus magic bytes.
+    """
+    for signature, mime_type in _SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:12] in (b"ftypheic", b"ftypheix", b"ftypmif1", b"ftypmsf1"):
+        return "image/heic"
+    if data[4:12] == b"ftypavif":
+        return "image/avif"
+    return default
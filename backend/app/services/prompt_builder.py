@@ -0,0 +1,244 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.services.chunking import estimate_tokens
+
+_HEADING = re.compile(r"^#{1,6}\s+(.*)$")
+
+# Importancia de las secciones del manual (mayor = se conserva más tiempo).
+SECTION_IMPORTANCE = [
+    (("restricc", "evitar", "prohib", "legal"), 5),
+    (("tono", "voz", "valores", "identidad", "mensaje"), 4),
+    (("público", "publico", "audiencia", "producto"), 3),
+    (("ejemplo", "tipograf", "paleta", "color"), 1),
+]
+DEFAULT_IMPORTANCE = 2
+
+# Mínimo que conserva una sección truncable antes de descartar secciones importantes.
+TRUNCATE_FLOOR = 256
+
+
+def section_importance(title: str, boost: Iterable[str] = ()) -> int:
+    lowered = (title or "").lower()
+    if any(keyword in lowered for keyword in boost):
+        return 4
+    for keywords, importance in SECTION_IMPORTANCE:
+        if any(keyword in lowered for keyword in keywords):
+            return importance
+    return DEFAULT_IMPORTANCE
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Recorta `text` en un límite de palabra para que quepa en `max_tokens`."""
+    if max_tokens <= 0:
+        return ""
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    cut = int(len(text) * max_tokens / tokens)
+    while cut > 0:
+        candidate = text[:cut].rsplit(None, 1)[0] if " " in text[:cut] else text[:cut]
+        if estimate_tokens(candidate) + 1 <= max_tokens:
+            return candidate + "…"
+        cut = int(cut * 0.9)
+    return ""
+
+
+def get_prompt_budget(model: str) -> int:
+    if model.startswith("gemini"):
+        return settings.prompt_budget_gemini
+    return settings.prompt_budget_groq
+
+
+class PromptSection:
+    def __init__(
+        self,
+        name: str,
+        text: str,
+        importance: int,
+        stable: bool,
+        required: bool,
+        truncatable: bool,
+        order: int,
+    ):
+        self.name = name
+        self.text = text
+        self.importance = importance
+        self.stable = stable
+        self.required = required
+        self.truncatable = truncatable
+        self.order = order
+        self.tokens = estimate_tokens(text)
+
+
+class BuiltPrompt:
+    def __init__(self, text: str, tokens: int, original_tokens: int, prefix_tokens: int, dropped: List[str], truncated: List[str]):
+        self.text = text
+        self.tokens = tokens
+        self.original_tokens = original_tokens
+        self.prefix_tokens = prefix_tokens
+        self.dropped = dropped
+        self.truncated = truncated
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.original_tokens - self.tokens)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens_estimated": self.tokens,
+            "prompt_tokens_saved": self.saved_tokens,
+            "prompt_prefix_tokens": self.prefix_tokens,
+            "sections_dropped": self.dropped,
+            "sections_truncated": self.truncated,
+        }
+
+
+class PromptStats:
+    def __init__(self):
+        self.builds = 0
+        self.trimmed = 0
+        self.tokens = 0
+        self.saved_tokens = 0
+        self.sections_dropped = 0
+
+    def record(self, built: BuiltPrompt) -> None:
+        self.builds += 1
+        self.tokens += built.tokens
+        self.saved_tokens += built.saved_tokens
+        self.sections_dropped += len(built.dropped)
+        if built.dropped or built.truncated:
+            self.trimmed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "builds": self.builds,
+            "trimmed_builds": self.trimmed,
+            "avg_prompt_tokens": round(self.tokens / self.builds, 1) if self.builds else 0.0,
+            "saved_tokens": self.saved_tokens,
+            "sections_dropped": self.sections_dropped,
+        }
+
+
+prompt_stats = PromptStats()
+
+
+class PromptBuilder:
+    """
+    Arma prompts dentro de un presupuesto de tokens. Las secciones estables
+    (instrucciones fijas, contexto de marca) van primero para formar un
+    prefijo cacheable por el proveedor; si el total excede el presupuesto
+    se descartan o recortan secciones en orden de importancia ascendente;
+    las truncables conservan al menos `TRUNCATE_FLOOR` tokens hasta el
+    último recurso.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.sections: List[PromptSection] = []
+
+    def add(
+        self,
+        name: str,
+        text: str,
+        importance: int = 5,
+        stable: bool = False,
+        required: bool = True,
+        truncatable: bool = False,
+    ) -> "PromptBuilder":
+        if text and text.strip():
+            self.sections.append(
+                PromptSection(name, text, importance, stable, required, truncatable, len(self.sections))
+            )
+        return self
+
+    def add_brand_context(self, context: str, boost: Iterable[str] = ()) -> "PromptBuilder":
+        """Agrega el contexto de marca dividido en secciones recortables."""
+        for title, text, is_header in split_context_sections(context):
+            self.add(
+                f"manual:{title}" if title else "manual",
+                text,
+                importance=5 if is_header else section_importance(title, boost),
+                stable=True,
+                required=is_header,
+            )
+        return self
+
+    def build(self) -> BuiltPrompt:
+        kept = list(self.sections)
+        original = sum(section.tokens for section in kept)
+        total = original
+        dropped: List[str] = []
+        truncated: List[str] = []
+
+        def shrink(section: PromptSection, floor: int) -> int:
+            target = max(section.tokens - (total - self.budget), floor)
+            if target >= section.tokens:
+                return 0
+            section.text = truncate_to_tokens(section.text, target)
+            new_tokens = estimate_tokens(section.text) if section.text else 0
+            saved, section.tokens = section.tokens - new_tokens, new_tokens
+            if section.name not in truncated:
+                truncated.append(section.name)
+            return saved
+
+        # Por importancia ascendente: las secciones opcionales se descartan y
+        # las truncables se recortan (sin bajar de TRUNCATE_FLOOR tokens).
+        candidates = sorted(
+            (s for s in kept if not s.required or s.truncatable),
+            key=lambda s: (s.importance, -s.order),
+        )
+        for section in candidates:
+            if total <= self.budget:
+                break
+            if section.truncatable:
+                total -= shrink(section, TRUNCATE_FLOOR)
+            else:
+                kept.remove(section)
+                dropped.append(section.name)
+                total -= section.tokens
+
+        for section in sorted((s for s in kept if s.truncatable), key=lambda s: -s.tokens):
+            if total <= self.budget:
+                break
+            total -= shrink(section, 0)
+
+        ordered = sorted(kept, key=lambda s: (not s.stable, s.order))
+        prefix_tokens = sum(s.tokens for s in ordered if s.stable)
+        built = BuiltPrompt(
+            "\n\n".join(s.text for s in ordered if s.text),
+            total,
+            original,
+            prefix_tokens,
+            dropped,
+            truncated,
+        )
+        prompt_stats.record(built)
+        return built
+
+
+def split_context_sections(context: str) -> List[Tuple[str, str, bool]]:
+    """
+    Divide un contexto de marca en (título, texto, es_cabecera). La cabecera
+    (datos base antes del primer encabezado) nunca se descarta.
+    """
+    sections: List[Tuple[str, str, bool]] = []
+    title: Optional[str] = None
+    lines: List[str] = []
+
+    def flush():
+        text = "\n".join(lines).strip("\n")
+        if text.strip():
+            sections.append((title or "", text, title is None))
+
+    for line in (context or "").splitlines():
+        heading = _HEADING.match(line.strip())
+        if heading:
+            flush()
+            title = heading.group(1).strip()
+            lines = [line]
+        else:
+            lines.append(line)
+    flush()
+    return sections
@@ -1,44 +1,53 @@
+import logging
 from typing import Optional, Dict, Any, List
-from app.database import get_supabase
+
+import numpy as np
+
+from app.config import settings
+from app.repositories import brand_manuals_repo, brand_manual_chunks_repo
 from app.models.brand_manual import BrandManualResponse
+from app.services.chunking import chunk_markdown
+from app.services.embeddings import get_embedder, to_pgvector
+from app.services.manual_cache import brand_manual_cache
+from app.services.search_index import manual_search_index
+
+logger = logging.getLogger(__name__)
 
 
 async def get_brand_manual_by_id(manual_id: str) -> Optional[BrandManualResponse]:
-    supabase = get_supabase()
-    response = supabase.table("brand_manuals").select("*").eq("id", manual_id).execute()
+    cached = brand_manual_cache.get(manual_id)
+    if cached is not None:
+        return cached
+
+    data = await brand_manuals_repo.get_by_id(manual_id)
     
-    if not response.data:
+    if not data:
         return None
     
-    return BrandManualResponse(**response.data[0])
+    manual = BrandManualResponse(**data)
+    brand_manual_cache.put(manual)
+    return manual
 
 
 async def get_latest_brand_manual() -> Optional[BrandManualResponse]:
-    supabase = get_supabase()
-    response = supabase.table("brand_manuals").select("*").order("created_at", desc=True).limit(1).execute()
+    data = await brand_manuals_repo.get_latest()
     
-    if not response.data:
+    if not data:
         return None
     
-    return BrandManualResponse(**response.data[0])
+    manual = BrandManualResponse(**data)
+    brand_manual_cache.put(manual)
+    return manual
 
 
 async def search_brand_manuals(query: str, limit: int = 5) -> List[BrandManualResponse]:
-    supabase = get_supabase()
+    await manual_search_index.ensure_loaded()
+    rows = await manual_search_index.search(query, limit)
     
-    response = supabase.table("brand_manuals").select("*").order("created_at", desc=True).limit(limit).execute()
-    
-    manuals = []
-    for item in response.data or []:
-        if query.lower() in item.get("contenido_markdown", "").lower() or \
-           query.lower() in item.get("producto", "").lower() or \
-           query.lower() in item.get("nombre", "").lower():
-            manuals.append(BrandManualResponse(**item))
-    
-    return manuals
+    return [BrandManualResponse(**item) for item in rows]
 
 
-def format_brand_context(manual: BrandManualResponse) -> str:
+def _brand_header_parts(manual: BrandManualResponse) -> List[str]:
     context_parts = []
     
     if manual.nombre:
@@ -51,7 +60,115 @@ def format_brand_context(manual: BrandManualResponse) -> str:
         context_parts.append(f"Público objetivo: {manual.público_objetivo}")
     if manual.restricciones:
         context_parts.append(f"Restricciones: {manual.restricciones}")
+    
+    return context_parts
+
+
+def _format_full_context(manual: BrandManualResponse) -> str:
+    context_parts = _brand_header_parts(manual)
     if manual.contenido_markdown:
         context_parts.append(f"\nManual de marca:\n{manual.contenido_markdown}")
     
     return "\n".join(context_parts)
+
+
+def format_brand_context(manual: BrandManualResponse) -> str:
+    return brand_manual_cache.memoize_context(
+        manual, ("full",), lambda: _format_full_context(manual)
+    )
+
+
+def _embedding_text(chunk: Dict[str, Any]) -> str:
+    return f"{chunk.get('seccion') or ''}\n{chunk['contenido']}"
+
+
+async def index_brand_manual(manual: BrandManualResponse) -> int:
+    """
+    Divide el manual en fragmentos, calcula sus embeddings y los guarda en
+    `brand_manual_chunks` (reemplazando los anteriores).
+    """
+    chunks = chunk_markdown(manual.contenido_markdown or "", settings.rag_chunk_tokens)
+    embeddings = await get_embedder().embed([_embedding_text(c) for c in chunks])
+    rows = [
+        {**chunk, "brand_manual_id": manual.id, "embedding": to_pgvector(vector)}
+        for chunk, vector in zip(chunks, embeddings)
+    ]
+    return await brand_manual_chunks_repo.replace_for_manual(manual.id, rows)
+
+
+async def _rank_chunks_locally(
+    manual: BrandManualResponse, query_vector: np.ndarray, top_k: int
+) -> List[Dict[str, Any]]:
+    chunks = chunk_markdown(manual.contenido_markdown or "", settings.rag_chunk_tokens)
+    if not chunks:
+        return []
+    matrix = await get_embedder().embed([_embedding_text(c) for c in chunks])
+    scores = matrix @ query_vector
+    order = np.argsort(-scores)[:top_k]
+    return [{**chunks[i], "similarity": float(scores[i])} for i in order]
+
+
+async def retrieve_brand_chunks(
+    manual: BrandManualResponse, query: str, top_k: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fragmentos del manual más relevantes para `query`, ordenados por
+    similitud. Si el manual aún no está indexado se rankea en memoria.
+    """
+    top_k = top_k or settings.rag_top_k
+    query_vector = (await get_embedder().embed([query]))[0]
+
+    try:
+        rows = await brand_manual_chunks_repo.match(manual.id, to_pgvector(query_vector), top_k)
+    except Exception as e:
+        logger.warning(f"pgvector retrieval failed for manual {manual.id}: {e}")
+        rows = []
+
+    if rows:
+        return rows
+    return await _rank_chunks_locally(manual, query_vector, top_k)
+
+
+async def build_brand_context(
+    manual: BrandManualResponse,
+    query: str,
+    top_k: Optional[int] = None,
+    token_budget: Optional[int] = None,
+) -> str:
+    """
+    Contexto de marca para prompts: datos base del manual más los
+    fragmentos relevantes para `query` que caben en el presupuesto de tokens.
+    Se memoiza por versión del manual, así que repetir la misma consulta
+    (reauditorías, lotes) no vuelve a la base.
+    """
+    top_k = top_k or settings.rag_top_k
+    token_budget = token_budget or settings.rag_context_token_budget
+    return await brand_manual_cache.memoize_context_async(
+        manual,
+        ("rag", query, top_k, token_budget),
+        lambda: _build_rag_context(manual, query, top_k, token_budget),
+    )
+
+
+async def _build_rag_context(
+    manual: BrandManualResponse, query: str, top_k: int, token_budget: int
+) -> str:
+    chunks = await retrieve_brand_chunks(manual, query, top_k)
+
+    selected = []
+    used = 0
+    for chunk in chunks:
+        tokens = chunk.get("tokens") or 0
+        if used + tokens > token_budget:
+            continue
+        selected.append(chunk)
+        used += tokens
+
+    context_parts = _brand_header_parts(manual)
+    if selected:
+        context_parts.append("\nManual de marca (secciones relevantes):")
+        for chunk in sorted(selected, key=lambda c: c["chunk_index"]):
+            title = f"### {chunk['seccion']}\n" if chunk.get("seccion") else ""
+            context_parts.append(f"{title}{chunk['contenido']}\n")
+    
+    return "\n".join(context_parts)
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketLimiter:
+    """
+    Limitador por cubeta de tokens para cuotas RPM/TPM de un proveedor y
+    modelo. Cada llamada reserva una petición y una estimación de tokens;
+    al terminar se ajusta con el uso real (`response.usage`). Las
+    llamadas esperan en orden de llegada hasta que haya capacidad.
+    """
+
+    def __init__(self, name: str, rpm: int, tpm: int):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = float(rpm)
+        self.tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.reserved_tokens = 0
+        self.used_tokens = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm > 0:
+            self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60.0)
+        if self.tpm > 0:
+            self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60.0)
+
+    def _delay(self, tokens: int) -> float:
+        delay = 0.0
+        if self.rpm > 0 and self.requests < 1:
+            delay = max(delay, (1 - self.requests) * 60.0 / self.rpm)
+        if self.tpm > 0 and self.tokens < tokens:
+            delay = max(delay, (tokens - self.tokens) * 60.0 / self.tpm)
+        return delay
+
+    async def acquire(self, estimated_tokens: int) -> int:
+        """Espera capacidad y reserva; devuelve los tokens reservados."""
+        tokens = min(max(0, estimated_tokens), self.tpm) if self.tpm > 0 else 0
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            # asyncio.Lock despierta a los waiters en orden FIFO.
+            async with self._lock:
+                throttled = False
+                while True:
+                    self._refill()
+                    delay = self._delay(tokens)
+                    if delay <= 0:
+                        break
+                    throttled = True
+                    # Se revisa seguido: un `settle` puede liberar tokens antes.
+                    await asyncio.sleep(min(delay, 0.5))
+                if self.rpm > 0:
+                    self.requests -= 1
+                if self.tpm > 0:
+                    self.tokens -= tokens
+        finally:
+            self.waiting -= 1
+
+        waited = time.perf_counter() - start
+        self.acquired += 1
+        self.throttled += int(throttled)
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.reserved_tokens += tokens
+        return tokens
+
+    def settle(self, reserved: int, actual_tokens: int) -> None:
+        """Ajusta la reserva con el uso real (puede dejar saldo negativo)."""
+        self.used_tokens += actual_tokens
+        if self.tpm > 0:
+            self._refill()
+            self.tokens = min(self.tpm, self.tokens + reserved - actual_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "headroom_requests": round(self.requests, 2) if self.rpm > 0 else None,
+            "headroom_tokens": round(self.tokens) if self.tpm > 0 else None,
+            "queue_depth": self.waiting,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "reserved_tokens": self.reserved_tokens,
+            "used_tokens": self.used_tokens,
+        }
+
+
+def _parse_overrides(raw: str) -> Dict[Tuple[str, str], Tuple[int, int]]:
+    """`proveedor:modelo=rpm/tpm` separados por comas."""
+    overrides = {}
+    for entry in filter(None, (part.strip() for part in raw.split(","))):
+        try:
+            target, limits = entry.split("=", 1)
+            provider, model = target.split(":", 1)
+            rpm, tpm = limits.split("/", 1)
+            overrides[(provider.strip(), model.strip())] = (int(rpm), int(tpm))
+        except ValueError:
+            logger.warning(f"Invalid rate limit override ignored: {entry}")
+    return overrides
+
+
+DEFAULT_LIMITS = {
+    "groq": lambda: (settings.groq_rpm, settings.groq_tpm),
+    "gemini": lambda: (settings.gemini_rpm, settings.gemini_tpm),
+}
+
+rate_limiters: Dict[Tuple[str, str], TokenBucketLimiter] = {}
+
+
+def get_rate_limiter(provider: str, model: str) -> TokenBucketLimiter:
+    key = (provider, model)
+    limiter = rate_limiters.get(key)
+    if limiter is None:
+        overrides = _parse_overrides(settings.rate_limit_overrides)
+        rpm, tpm = overrides.get(key) or DEFAULT_LIMITS[provider]()
+        limiter = TokenBucketLimiter(f"{provider}:{model}", rpm=rpm, tpm=tpm)
+        rate_limiters[key] = limiter
+    return limiter
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    return {limiter.name: limiter.stats() for limiter in rate_limiters.values()}
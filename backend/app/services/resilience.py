@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 429}
+
+
+class CircuitOpenError(Exception):
+    """El circuito del proveedor está abierto: se falla de inmediato."""
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    # groq expone `status_code`, google-genai expone `code`.
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Timeouts, errores de conexión, 408/429 y 5xx se reintentan."""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    name = type(exc).__name__
+    if "Timeout" in name or "Connection" in name:
+        return True
+    status = _status_code(exc)
+    return status is not None and (status in RETRYABLE_STATUS or status >= 500)
+
+
+def _retry_after(exc: BaseException) -> float:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return 0.0
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CircuitBreaker:
+    """
+    Circuito por proveedor y modelo: tras `failure_threshold` fallos
+    transitorios seguidos se abre y rechaza llamadas durante
+    `reset_timeout`; luego deja pasar una sola llamada de prueba
+    (half-open) que lo cierra o lo vuelve a abrir.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    def before_call(self) -> None:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.short_circuited += 1
+                raise CircuitOpenError(f"Servicio {self.name} no disponible temporalmente")
+            self.state = self.HALF_OPEN
+            self.probing = False
+
+        if self.state == self.HALF_OPEN:
+            if self.probing:
+                self.short_circuited += 1
+                raise CircuitOpenError(f"Servicio {self.name} no disponible temporalmente")
+            self.probing = True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.probing = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"Circuit {self.name} opened after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class ResilientCaller:
+    """
+    Ejecuta llamadas upstream con timeout por intento, reintentos con
+    backoff exponencial y jitter para errores transitorios, y un circuit
+    breaker por proveedor y modelo.
+    """
+
+    def __init__(self, name: str, breaker: CircuitBreaker):
+        self.name = name
+        self.breaker = breaker
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _wait(self, retry_state: RetryCallState) -> float:
+        backoff = wait_random_exponential(
+            multiplier=settings.llm_retry_initial_wait, max=settings.llm_retry_max_wait
+        )(retry_state)
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = _retry_after(exc) if exc else 0.0
+        return min(max(backoff, retry_after), settings.llm_retry_max_wait)
+
+    def _before_sleep(self, retry_state: RetryCallState) -> None:
+        self.retries += 1
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        logger.info(
+            f"Retrying {self.name} (attempt {retry_state.attempt_number}) after: {exc!r}"
+        )
+
+    async def call(self, func: Callable[[], Awaitable[T]], timeout: float) -> T:
+        self.calls += 1
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(max(1, settings.llm_retry_attempts)),
+                wait=self._wait,
+                retry=retry_if_exception(is_retryable),
+                before_sleep=self._before_sleep,
+                reraise=True,
+            ):
+                with attempt:
+                    return await self._attempt(func, timeout)
+        except Exception:
+            self.failures += 1
+            raise
+
+    async def _attempt(self, func: Callable[[], Awaitable[T]], timeout: float) -> T:
+        self.breaker.before_call()
+        self.attempts += 1
+        try:
+            result = await asyncio.wait_for(func(), timeout)
+        except asyncio.CancelledError:
+            self.breaker.probing = False
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+            if is_retryable(e):
+                self.breaker.record_failure()
+            else:
+                # El proveedor respondió (p. ej. 400): no es un problema de disponibilidad.
+                self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "circuit": self.breaker.stats(),
+        }
+
+
+resilient_callers: Dict[Tuple[str, str], ResilientCaller] = {}
+
+
+def get_resilient_caller(provider: str, model: str) -> ResilientCaller:
+    key = (provider, model)
+    caller = resilient_callers.get(key)
+    if caller is None:
+        name = f"{provider}:{model}"
+        caller = ResilientCaller(
+            name,
+            CircuitBreaker(
+                name,
+                failure_threshold=settings.circuit_failure_threshold,
+                reset_timeout=settings.circuit_reset_seconds,
+            ),
+        )
+        resilient_callers[key] = caller
+    return caller
+
+
+async def call_upstream(
+    provider: str, model: str, func: Callable[[], Awaitable[T]], timeout: float
+) -> T:
+    return await get_resilient_caller(provider, model).call(func, timeout)
+
+
+def get_resilience_stats() -> Dict[str, Any]:
+    return {caller.name: caller.stats() for caller in resilient_callers.values()}
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import re
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.models.brand_manual import BrandManualResponse
+from app.services.embeddings import get_embedder
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Minúsculas y sin tildes, para que "público" coincida con "publico"."""
+    normalized = unicodedata.normalize("NFKD", (text or "").lower())
+    ascii_text = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return [w for w in _WORD.findall(ascii_text) if len(w) > 1]
+
+
+def _document_text(row: Dict[str, Any]) -> str:
+    # nombre y producto pesan más que el cuerpo del manual
+    nombre = row.get("nombre") or ""
+    producto = row.get("producto") or ""
+    return " ".join([nombre, nombre, nombre, producto, producto, row.get("contenido_markdown") or ""])
+
+
+class ManualSearchIndex:
+    """
+    Índice BM25 en memoria sobre todos los manuales de marca.
+
+    Las listas de postings se guardan por término y se materializan como
+    arrays de NumPy; el scoring de una consulta es una acumulación
+    vectorizada (np.bincount) sobre los postings de sus términos.
+    Opcionalmente combina el BM25 con similitud coseno de embeddings.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, use_embeddings: bool = False):
+        self.k1 = k1
+        self.b = b
+        self.use_embeddings = use_embeddings
+        self._reset()
+        self._lock: Optional[asyncio.Lock] = None
+        self.loaded_at: Optional[float] = None
+        # Cambios incrementales recibidos durante un rebuild, para aplicarlos
+        # otra vez sobre el snapshot recién cargado.
+        self._pending: Optional[List[Tuple[str, Optional[Dict[str, Any]], Optional[np.ndarray]]]] = None
+
+    def _reset(self) -> None:
+        self._rows: List[Optional[Dict[str, Any]]] = []
+        self._positions: Dict[str, int] = {}
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._posting_arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._doc_lengths: List[int] = []
+        self._vectors: List[np.ndarray] = []
+        self._alive: List[bool] = []
+        self._arrays_dirty = True
+        self._doc_len_array = np.zeros(0)
+        self._alive_array = np.zeros(0, dtype=bool)
+        self._embedding_matrix: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @property
+    def is_stale(self) -> bool:
+        if self.loaded_at is None:
+            return True
+        return time.monotonic() - self.loaded_at > settings.search_index_refresh_seconds
+
+    async def ensure_loaded(self) -> None:
+        if not self.is_stale:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.is_stale:
+                await self.rebuild()
+
+    async def rebuild(self) -> None:
+        """Carga todos los manuales desde la base de datos (paginando)."""
+        from app.repositories import brand_manuals_repo
+
+        self._pending = []
+        try:
+            rows: List[Dict[str, Any]] = []
+            cursor = None
+            while True:
+                page, cursor = await brand_manuals_repo.page(limit=500, cursor=cursor)
+                rows.extend(page)
+                if not cursor:
+                    break
+
+            # El índice nuevo se construye aparte y fuera del event loop; las
+            # búsquedas concurrentes nunca ven un índice a medio construir.
+            vectors = await self._embed_rows(rows)
+            fresh = ManualSearchIndex(self.k1, self.b, self.use_embeddings)
+            await asyncio.to_thread(fresh._load, rows, vectors)
+            self._adopt(fresh)
+
+            # Altas y bajas que llegaron mientras se leía el snapshot.
+            for manual_id, row, vector in self._pending:
+                if row is None:
+                    self._remove(manual_id)
+                else:
+                    self._add(row, vector)
+        finally:
+            self._pending = None
+        self.loaded_at = time.monotonic()
+        logger.info(f"Manual search index built: {len(self)} manuals")
+
+    def _load(self, rows: List[Dict[str, Any]], vectors: Optional[np.ndarray]) -> None:
+        for i, row in enumerate(rows):
+            self._add(row, vectors[i] if vectors is not None else None)
+
+    def _adopt(self, other: "ManualSearchIndex") -> None:
+        """Toma el estado del índice `other` (construido por `_reset`/`_load`)."""
+        self._rows = other._rows
+        self._positions = other._positions
+        self._postings = other._postings
+        self._posting_arrays = other._posting_arrays
+        self._doc_lengths = other._doc_lengths
+        self._vectors = other._vectors
+        self._alive = other._alive
+        self._arrays_dirty = True
+        self._embedding_matrix = None
+
+    async def _embed_rows(self, rows: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not self.use_embeddings or not rows:
+            return None
+        return await get_embedder().embed([_document_text(r) for r in rows])
+
+    async def add_many(self, rows: List[Dict[str, Any]]) -> None:
+        vectors = await self._embed_rows(rows)
+        for i, row in enumerate(rows):
+            vector = vectors[i] if vectors is not None else None
+            self._add(row, vector)
+            if self._pending is not None:
+                self._pending.append((str(row["id"]), row, vector))
+
+    async def add(self, manual: BrandManualResponse) -> None:
+        """Agrega o reemplaza un manual (actualización incremental)."""
+        await self.add_many([manual.model_dump()])
+
+    def remove(self, manual_id: str) -> None:
+        self._remove(manual_id)
+        if self._pending is not None:
+            self._pending.append((manual_id, None, None))
+
+    def _remove(self, manual_id: str) -> None:
+        position = self._positions.pop(manual_id, None)
+        if position is not None:
+            self._alive[position] = False
+            self._rows[position] = None
+            self._arrays_dirty = True
+
+    def _add(self, row: Dict[str, Any], vector: Optional[np.ndarray]) -> None:
+        manual_id = str(row["id"])
+        self._remove(manual_id)
+
+        position = len(self._rows)
+        terms = Counter(tokenize(_document_text(row)))
+        for term, tf in terms.items():
+            docs, tfs = self._postings.setdefault(term, ([], []))
+            docs.append(position)
+            tfs.append(tf)
+            self._posting_arrays.pop(term, None)
+
+        self._positions[manual_id] = position
+        self._rows.append(row)
+        self._doc_lengths.append(sum(terms.values()))
+        self._alive.append(True)
+        if self.use_embeddings:
+            self._vectors.append(vector if vector is not None else np.zeros(settings.embedding_dimension))
+        self._arrays_dirty = True
+
+    def _refresh_arrays(self) -> None:
+        if not self._arrays_dirty:
+            return
+        self._doc_len_array = np.asarray(self._doc_lengths, dtype=np.float32)
+        self._alive_array = np.asarray(self._alive, dtype=bool)
+        if self.use_embeddings and self._vectors:
+            self._embedding_matrix = np.vstack(self._vectors).astype(np.float32)
+        self._arrays_dirty = False
+
+    def _posting(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        arrays = self._posting_arrays.get(term)
+        if arrays is None:
+            lists = self._postings.get(term)
+            if lists is None:
+                return None
+            arrays = (np.asarray(lists[0], dtype=np.int64), np.asarray(lists[1], dtype=np.float32))
+            self._posting_arrays[term] = arrays
+        return arrays
+
+    def bm25_scores(self, query: str) -> np.ndarray:
+        self._refresh_arrays()
+        total = len(self._rows)
+        scores = np.zeros(total, dtype=np.float32)
+        alive_count = len(self)
+        if not alive_count:
+            return scores
+
+        avg_len = float(self._doc_len_array[self._alive_array].mean()) or 1.0
+        for term in set(tokenize(query)):
+            posting = self._posting(term)
+            if posting is None:
+                continue
+            docs, tfs = posting
+            live = self._alive_array[docs]
+            docs, tfs = docs[live], tfs[live]
+            if not len(docs):
+                continue
+            idf = np.log(1 + (alive_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._doc_len_array[docs] / avg_len)
+            weights = idf * tfs * (self.k1 + 1) / (tfs + norm)
+            scores += np.bincount(docs, weights=weights, minlength=total).astype(np.float32)
+        return scores
+
+    async def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        scores = self.bm25_scores(query)
+        if self.use_embeddings and self._embedding_matrix is not None and len(scores):
+            if scores.max() > 0:
+                scores = scores / scores.max()
+            query_vector = (await get_embedder().embed([query]))[0]
+            scores = scores + settings.search_embedding_weight * (self._embedding_matrix @ query_vector)
+            scores[~self._alive_array] = 0
+
+        candidates = np.flatnonzero(scores > 0)
+        if not len(candidates):
+            return []
+        if len(candidates) > limit:
+            top = np.argpartition(-scores[candidates], limit)[:limit]
+            candidates = candidates[top]
+        ordered = candidates[np.argsort(-scores[candidates])]
+        return [self._rows[i] for i in ordered]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "manuals": len(self),
+            "terms": len(self._postings),
+            "tombstones": len(self._rows) - len(self),
+            "use_embeddings": self.use_embeddings,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at else None,
+        }
+
+
+manual_search_index = ManualSearchIndex(use_embeddings=settings.search_use_embeddings)
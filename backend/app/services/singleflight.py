@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalescencia de llamadas idénticas en vuelo: la primera llamada con
+    una huella dada lanza la tarea upstream y las concurrentes esperan ese
+    mismo resultado. Cancelar a un waiter no afecta a los demás; la tarea
+    upstream solo se cancela cuando ya no queda nadie esperándola.
+    """
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.cancelled_waiters = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            self._inflight[key] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.upstream_calls += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[task] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                self.cancelled_waiters += 1
+                if self._waiters.get(task) == 1:
+                    self.abandoned += 1
+                    if self._inflight.get(key) is task:
+                        del self._inflight[key]
+                    task.cancel()
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        self._waiters.pop(task, None)
+        if not task.cancelled():
+            # Evita el aviso "exception was never retrieved" si nadie esperaba.
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "waiters": sum(self._waiters.values()),
+            "upstream_calls": self.upstream_calls,
+            "saved_calls": self.coalesced,
+            "cancelled_waiters": self.cancelled_waiters,
+            "abandoned": self.abandoned,
+        }
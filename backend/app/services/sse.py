@@ -0,0 +1,22 @@
+import json
+from typing import Any
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Serializa un evento Server-Sent Events con payload JSON."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def ndjson_line(data: Any) -> str:
+    """Serializa un objeto como una línea de NDJSON."""
+    return json.dumps(data, ensure_ascii=False, default=str) + "\n"
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# También evitan el buffering de proxies en respuestas NDJSON.
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
@@ -0,0 +1,74 @@
+import asyncio
+import importlib
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.database import get_async_supabase
+from app.services.gemini_service import get_gemini_client
+from app.services.groq_service import get_groq_client
+from app.services.langfuse_service import get_langfuse
+
+logger = logging.getLogger(__name__)
+
+# (nombre, módulo del SDK, constructor del cliente)
+WARMERS: List[Tuple[str, str, Callable[[], Any]]] = [
+    ("supabase", "supabase", get_async_supabase),
+    ("groq", "groq", get_groq_client),
+    ("gemini", "google.genai", get_gemini_client),
+    ("langfuse", "langfuse", get_langfuse),
+]
+
+
+class ClientWarmup:
+    """
+    Precalienta los SDKs en segundo plano después del arranque: el import
+    (la parte cara) corre en un hilo y el cliente se construye en el event
+    loop. `/health` responde mientras tanto; si una petición llega antes,
+    el cliente se crea bajo demanda como siempre.
+    """
+
+    def __init__(self, warmers: List[Tuple[str, str, Callable[[], Any]]]):
+        self.warmers = warmers
+        self._task: Optional[asyncio.Task] = None
+        self.timings_ms: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.done = False
+
+    def start(self) -> None:
+        if settings.prewarm_clients and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        for name, module, build in self.warmers:
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(importlib.import_module, module)
+                build()
+            except Exception as e:
+                self.errors[name] = str(e)
+                logger.warning(f"Warmup of {name} failed: {e}")
+            self.timings_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+        self.done = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.prewarm_clients,
+            "done": self.done,
+            "timings_ms": self.timings_ms,
+            "errors": self.errors,
+        }
+
+
+client_warmup = ClientWarmup(WARMERS)
@@ -0,0 +1,82 @@
+"""
+Benchmark de concurrencia de la capa de datos.
+
+Simula un PostgREST lento (latencia fija por consulta) y lanza N consultas
+concurrentes desde handlers async, midiendo:
+
+- tiempo total de las N consultas
+- lag del event loop (retraso de un heartbeat que debería despertar cada 10 ms)
+
+Compara el cliente síncrono de supabase-py (comportamiento anterior) con el
+repositorio async sobre el pool keep-alive.
+
+Uso (desde backend/):
+    python -m benchmarks.async_db_concurrency --requests 50 --latency 0.2
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import SlowSyncTransport, SlowAsyncTransport, heartbeat, percentile, ms
+
+import httpx
+from supabase import create_client, ClientOptions
+
+from app.config import settings
+from app.database import init_async_supabase, close_async_supabase
+from app.repositories import users_repo
+
+ROW = {"id": "bench", "email": "bench@alicorp.com", "role": "admin"}
+
+
+def rows(request):
+    return [ROW]
+
+
+async def _run(label: str, make_call, requests: int) -> None:
+    stop = asyncio.Event()
+    lags: list = []
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(make_call() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await beat
+    print(
+        f"{label:<8} total={ms(elapsed)}  loop_lag_p99={ms(percentile(lags, 99))}  "
+        f"loop_lag_max={ms(max(lags, default=0.0))}  heartbeats={len(lags)}"
+    )
+
+
+async def main(requests: int, latency: float) -> None:
+    print(f"{requests} consultas concurrentes, latencia simulada {latency * 1000:.0f} ms\n")
+
+    sync_client = create_client(
+        settings.supabase_url,
+        settings.supabase_anon_key,
+        ClientOptions(httpx_client=httpx.Client(transport=SlowSyncTransport(latency, rows))),
+    )
+
+    async def sync_call():
+        sync_client.table("users").select("*").eq("id", "bench").execute()
+
+    await _run("sync", sync_call, requests)
+
+    init_async_supabase(httpx.AsyncClient(transport=SlowAsyncTransport(latency, rows)))
+
+    async def async_call():
+        await users_repo.get_by_id("bench")
+
+    await _run("async", async_call, requests)
+    await close_async_supabase()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency))
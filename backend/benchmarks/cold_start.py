@@ -0,0 +1,147 @@
+"""
+Benchmark de arranque en frío.
+
+1. Tiempo de import por módulo: corre `python -X importtime -c "import
+   app.main"` en un proceso nuevo y lista los módulos de la app y los
+   paquetes de terceros más caros (tiempo acumulado), más el costo de
+   cada SDK que ahora se importa al primer uso.
+2. Time-to-first-response: levanta uvicorn en un puerto libre y mide
+   desde el spawn hasta el primer 200 de /health (y hasta que termina el
+   precalentamiento), comparando SDKs importados de entrada (comportamiento
+   anterior), imports perezosos sin precalentar y con precalentamiento.
+
+Uso (desde backend/):
+    python -m benchmarks.cold_start --runs 3
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.common import ms
+
+import httpx
+
+SDKS = ["supabase", "groq", "google.genai", "langfuse"]
+
+SERVER = "import uvicorn; uvicorn.run('app.main:app', host='127.0.0.1', port={port}, log_level='warning')"
+EAGER_SERVER = "import " + ", ".join(SDKS) + "; " + SERVER
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, float]]:
+    """Devuelve (módulo, nivel de anidamiento, acumulado en segundos)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip("\n") for part in line[len("import time:"):].split("|"))
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), depth, int(cumulative) / 1_000_000))
+    return rows
+
+
+def import_times(statement: str) -> List[Tuple[str, int, float]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    return parse_importtime(result.stderr)
+
+
+def report_imports(top: int) -> None:
+    rows = import_times("import app.main")
+    total = next((seconds for name, _, seconds in rows if name == "app.main"), 0.0)
+    print(f"import app.main: {ms(total)}\n")
+
+    app_modules: Dict[str, float] = {}
+    third_party: Dict[str, float] = {}
+    for name, depth, seconds in rows:
+        if name.startswith("app."):
+            app_modules[name] = max(app_modules.get(name, 0.0), seconds)
+        elif "." not in name and not name.startswith("_"):
+            third_party[name] = max(third_party.get(name, 0.0), seconds)
+
+    print("Módulos de la app (acumulado):")
+    for name, seconds in sorted(app_modules.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<40} {ms(seconds)}")
+    print("\nPaquetes de terceros (acumulado):")
+    for name, seconds in sorted(third_party.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<40} {ms(seconds)}")
+
+    print("\nSDKs diferidos al primer uso (import aislado):")
+    for sdk in SDKS:
+        sdk_rows = import_times(f"import {sdk}")
+        seconds = next((s for name, _, s in sdk_rows if name == sdk), 0.0)
+        print(f"  {sdk:<40} {ms(seconds)}")
+    print()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_response(server: str, prewarm: bool, timeout: float = 60.0) -> Tuple[float, Optional[float]]:
+    port = free_port()
+    env = {**os.environ, "PREWARM_CLIENTS": "true" if prewarm else "false"}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", server.format(port=port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    first_response = None
+    warm = None
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while time.perf_counter() - start < timeout:
+                try:
+                    if first_response is None:
+                        if client.get("/health").status_code == 200:
+                            first_response = time.perf_counter() - start
+                            if not prewarm:
+                                break
+                    elif client.get("/metrics").json()["warmup"]["done"]:
+                        warm = time.perf_counter() - start
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    if first_response is None:
+        raise RuntimeError("El servidor no respondió a /health")
+    return first_response, warm
+
+
+def report_startup(runs: int) -> None:
+    variants = [
+        ("eager", EAGER_SERVER, False),
+        ("lazy", SERVER, False),
+        ("prewarm", SERVER, True),
+    ]
+    for label, server, prewarm in variants:
+        firsts, warms = [], []
+        for _ in range(runs):
+            first, warm = time_to_first_response(server, prewarm)
+            firsts.append(first)
+            if warm is not None:
+                warms.append(warm)
+        line = f"{label:<8} primer_200_health: mediana={ms(statistics.median(firsts))}  min={ms(min(firsts))}"
+        if warms:
+            line += f"  clientes_listos: mediana={ms(statistics.median(warms))}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+    report_imports(args.top)
+    report_startup(args.runs)
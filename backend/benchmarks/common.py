@@ -0,0 +1,66 @@
+"""
+Utilidades compartidas por los benchmarks: un PostgREST simulado en memoria
+y helpers de percentiles / lag del event loop.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("SUPABASE_URL", "https://bench.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench-key")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret-key-bench-secret-key")
+
+import httpx
+
+RowsFactory = Callable[[httpx.Request], List[Dict]]
+
+
+def json_response(request: httpx.Request, rows: List[Dict]) -> httpx.Response:
+    return httpx.Response(
+        200,
+        content=json.dumps(rows, default=str),
+        headers={"Content-Type": "application/json"},
+        request=request,
+    )
+
+
+class SlowSyncTransport(httpx.BaseTransport):
+    def __init__(self, latency: float, rows: RowsFactory):
+        self.latency = latency
+        self.rows = rows
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        time.sleep(self.latency)
+        return json_response(request, self.rows(request))
+
+
+class SlowAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, latency: float, rows: RowsFactory):
+        self.latency = latency
+        self.rows = rows
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return json_response(request, self.rows(request))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def heartbeat(stop: asyncio.Event, lags: List[float], interval: float = 0.01) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+def ms(seconds: Optional[float]) -> str:
+    return f"{(seconds or 0.0) * 1000:8.1f} ms"
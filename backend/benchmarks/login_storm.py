@@ -0,0 +1,97 @@
+"""
+Benchmark de tormenta de logins.
+
+Lanza N logins concurrentes contra /api/auth/login (PostgREST simulado, hash
+bcrypt real) mientras una sonda consulta /health cada 20 ms. Reporta el
+throughput de logins y la latencia p50/p99 de la sonda, comparando bcrypt
+inline en el event loop (comportamiento anterior) con el pool dedicado.
+
+Uso (desde backend/):
+    python -m benchmarks.login_storm --logins 40
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import SlowAsyncTransport, percentile, ms
+
+import httpx
+
+from app.database import init_async_supabase, close_async_supabase
+from app.dependencies import auth as auth_dependency
+from app.main import app
+from app.routers import auth as auth_router
+
+PASSWORD = "admin123"
+
+
+async def _inline_verify(plain_password: str, hashed_password: str) -> bool:
+    return auth_dependency.verify_password(plain_password, hashed_password)
+
+
+async def _probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list) -> None:
+    # La latencia se mide desde el instante en que la sonda debía salir,
+    # así un event loop bloqueado cuenta como espera del cliente.
+    while not stop.is_set():
+        scheduled = time.perf_counter() + 0.02
+        await asyncio.sleep(0.02)
+        await client.get("/health")
+        latencies.append(time.perf_counter() - scheduled)
+
+
+async def _run(label: str, logins: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        latencies: list = []
+        probe = asyncio.create_task(_probe(client, stop, latencies))
+        await asyncio.sleep(0.05)
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post("/api/auth/login", json={"email": "admin@alicorp.com", "password": PASSWORD})
+            for _ in range(logins)
+        ))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await probe
+
+    ok = sum(1 for r in responses if r.status_code == 200)
+    busy = sum(1 for r in responses if r.status_code == 503)
+    print(
+        f"{label:<8} logins_ok={ok:<4} rechazados_503={busy:<4} "
+        f"throughput={ok / elapsed:6.1f}/s  health_p50={ms(percentile(latencies, 50))}  "
+        f"health_p99={ms(percentile(latencies, 99))}  muestras={len(latencies)}"
+    )
+
+
+async def main(logins: int) -> None:
+    user_row = {
+        "id": "bench-admin",
+        "email": "admin@alicorp.com",
+        "nombre": "Bench",
+        "role": "admin",
+        "is_active": True,
+        "created_at": "2024-01-01T00:00:00",
+        "password_hash": auth_dependency.get_password_hash(PASSWORD),
+    }
+    init_async_supabase(httpx.AsyncClient(transport=SlowAsyncTransport(0.0, lambda request: [user_row])))
+
+    print(f"{logins} logins concurrentes, pool de {auth_dependency.get_password_pool_size()} workers\n")
+
+    pooled_verify = auth_router.verify_password_async
+    auth_router.verify_password_async = _inline_verify
+    await _run("inline", logins)
+    auth_router.verify_password_async = pooled_verify
+    await _run("pool", logins)
+
+    auth_dependency.shutdown_password_executor()
+    await close_async_supabase()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
@@ -0,0 +1,102 @@
+"""
+Benchmark del índice de búsqueda de manuales.
+
+Construye el índice BM25 en memoria con N manuales sintéticos (~1.5 KB de
+Markdown cada uno) y mide el tiempo de construcción, la latencia p50/p99
+por consulta y la comparación con el escaneo lineal por substring anterior.
+
+Uso (desde backend/):
+    python -m benchmarks.manual_search --manuals 10000 --queries 200
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from benchmarks.common import percentile, ms
+
+from app.services.search_index import ManualSearchIndex
+
+PRODUCTOS = ["pasta", "aceite", "galletas", "detergente", "mayonesa", "harina", "jabón", "salsa"]
+MARCAS = ["Don Vittorio", "Primor", "Casino", "Bolívar", "Alacena", "Blanca Flor", "Nicolini", "Opal"]
+VOCAB = (
+    "sabor familia hogar calidad tradición frescura energía niños ahorro limpieza "
+    "textura receta cocina peruana nutrición confianza alegría rendimiento suavidad aroma"
+).split()
+
+
+def make_manuals(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        producto = rng.choice(PRODUCTOS)
+        marca = f"{rng.choice(MARCAS)} {i}"
+        body = "\n\n".join(
+            f"## Sección {s}\n\n" + " ".join(rng.choice(VOCAB) for _ in range(40))
+            for s in range(5)
+        )
+        rows.append({
+            "id": str(uuid.UUID(int=i + 1)),
+            "nombre": marca,
+            "producto": producto,
+            "tono": "cercano",
+            "público_objetivo": "familias",
+            "restricciones": "ninguna",
+            "contenido_markdown": body,
+            "version": 1,
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": "2024-01-01T00:00:00",
+        })
+    return rows
+
+
+def naive_search(rows: list, query: str, limit: int) -> list:
+    q = query.lower()
+    return [
+        r for r in rows
+        if q in r["contenido_markdown"].lower() or q in r["producto"].lower() or q in r["nombre"].lower()
+    ][:limit]
+
+
+async def main(manuals: int, queries: int, embeddings: bool) -> None:
+    rows = make_manuals(manuals)
+    rng = random.Random(11)
+    query_set = [
+        " ".join(rng.sample(VOCAB, 2)) + " " + rng.choice(PRODUCTOS) for _ in range(queries)
+    ]
+
+    index = ManualSearchIndex(use_embeddings=embeddings)
+    start = time.perf_counter()
+    await index.add_many(rows)
+    build = time.perf_counter() - start
+    print(f"{manuals} manuales, {index.stats()['terms']} términos, construcción {ms(build)}\n")
+
+    for label, run in (
+        ("índice", lambda q: index.search(q, 5)),
+        ("substring", None),
+    ):
+        latencies = []
+        for q in query_set:
+            start = time.perf_counter()
+            if run:
+                await run(q)
+            else:
+                naive_search(rows, q, 5)
+            latencies.append(time.perf_counter() - start)
+        print(f"{label:<10} p50={ms(percentile(latencies, 50))}  p99={ms(percentile(latencies, 99))}")
+
+    start = time.perf_counter()
+    await index.add_many(make_manuals(1, seed=99))
+    index.remove(rows[0]["id"])
+    await index.search(query_set[0], 5)
+    print(f"\nalta + baja incremental + primera consulta: {ms(time.perf_counter() - start)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--manuals", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--embeddings", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.manuals, args.queries, args.embeddings))
@@ -0,0 +1,106 @@
+"""
+Benchmark de payload y latencia de los listados.
+
+Simula la tabla `contenido` con N filas (texto generado de ~3 KB) detrás de
+un PostgREST que respeta `select=` y `limit=` y cobra la transferencia a un
+ancho de banda fijo. Compara el listado anterior (`select *` sin límite)
+con GET /api/contenido/ paginado y con proyección resumida.
+
+Uso (desde backend/):
+    python -m benchmarks.paginated_lists --sizes 100 1000 10000
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs
+
+from benchmarks.common import ms
+
+import httpx
+
+from app.database import init_async_supabase, close_async_supabase
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.models.contenido import ContenidoResponse
+from app.repositories import contenido_repo
+
+
+def make_rows(count: int) -> list:
+    base = datetime(2024, 1, 1)
+    return [
+        {
+            "id": str(uuid.UUID(int=i + 1)),
+            "brand_manual_id": str(uuid.UUID(int=10**6)),
+            "tipo": "descripcion",
+            "titulo": f"Producto {i}",
+            "contenido_text": ("Descripción generada para el producto. " * 80)[:3000],
+            "estado": "pendiente",
+            "aprobado_por": None,
+            "rechazo_razon": None,
+            "created_by": None,
+            "created_at": (base + timedelta(minutes=i)).isoformat(),
+            "updated_at": (base + timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(count)
+    ][::-1]
+
+
+class FakePostgrest(httpx.AsyncBaseTransport):
+    def __init__(self, rows: list, latency: float, bandwidth: float):
+        self.rows = rows
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        params = parse_qs(request.url.query.decode())
+        rows = self.rows
+        if "limit" in params:
+            rows = rows[:int(params["limit"][0])]
+        select = params.get("select", ["*"])[0]
+        if select != "*":
+            columns = select.split(",")
+            rows = [{c: row[c] for c in columns} for row in rows]
+        body = json.dumps(rows).encode()
+        await asyncio.sleep(self.latency + len(body) / self.bandwidth)
+        return httpx.Response(
+            200, content=body, headers={"Content-Type": "application/json"}, request=request
+        )
+
+
+async def main(sizes: list, latency: float, bandwidth: float) -> None:
+    app.dependency_overrides[get_current_user] = lambda: None
+    print(f"latencia base {latency * 1000:.0f} ms, ancho de banda {bandwidth / 1e6:.0f} MB/s\n")
+    print(f"{'filas':>7}  {'modo':<18} {'payload':>12}  {'latencia':>11}")
+
+    for size in sizes:
+        init_async_supabase(httpx.AsyncClient(transport=FakePostgrest(make_rows(size), latency, bandwidth)))
+
+        start = time.perf_counter()
+        rows = await contenido_repo.list()
+        payload = json.dumps([ContenidoResponse(**r).model_dump(mode="json") for r in rows])
+        elapsed = time.perf_counter() - start
+        print(f"{size:>7}  {'select * completo':<18} {len(payload) / 1024:>9.1f} KB  {ms(elapsed)}")
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.get("/api/contenido/", params={"limit": 1})
+            start = time.perf_counter()
+            response = await client.get("/api/contenido/", params={"limit": 50})
+            elapsed = time.perf_counter() - start
+        print(f"{size:>7}  {'keyset + resumen':<18} {len(response.content) / 1024:>9.1f} KB  {ms(elapsed)}")
+
+        await close_async_supabase()
+
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--bandwidth", type=float, default=20e6, help="bytes/s")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.latency, args.bandwidth))
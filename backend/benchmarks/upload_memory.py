@@ -0,0 +1,193 @@
+"""
+Benchmark de memoria de uploads de auditoría.
+
+Lanza N uploads concurrentes de S MB contra /api/auditoria/image (repos y
+Gemini simulados; lectura del upload, blob store, preprocesado y capa de
+visión reales) mientras se muestrea el RSS del proceso cada 2 ms. Compara
+la lectura completa + ida y vuelta en base64 (comportamiento anterior) con
+la lectura por bloques que pasa los bytes crudos a la capa de visión.
+
+Uso (desde backend/):
+    python -m benchmarks.upload_memory --uploads 16 --size-mb 8
+"""
+import argparse
+import asyncio
+import base64
+import gc
+import hashlib
+import os
+import resource
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.common import ms
+
+os.environ.setdefault("BLOB_STORE_PATH", tempfile.mkdtemp(prefix="bench-blobs-"))
+os.environ.setdefault("AUDIT_CACHE_SQLITE_PATH", "")
+# Sin cuota RPM/TPM: se mide memoria, no el rate limiter.
+os.environ.setdefault("GEMINI_RPM", "0")
+os.environ.setdefault("GEMINI_TPM", "0")
+
+import httpx
+
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.models.brand_manual import BrandManualResponse
+from app.models.user import UserResponse
+from app.routers import auditoria as auditoria_router
+from app.services import gemini_service
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+NOW = datetime(2024, 1, 1)
+
+
+def current_rss() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        # Sin /proc solo hay pico histórico (KB en Linux).
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def sample_rss(stop: asyncio.Event, peak: list) -> None:
+    while not stop.is_set():
+        peak[0] = max(peak[0], current_rss())
+        await asyncio.sleep(0.002)
+
+
+class FakeContenidoRepo:
+    async def get_by_id(self, record_id, **kwargs):
+        return {
+            "id": record_id,
+            "brand_manual_id": "bench-manual",
+            "contenido_text": "Texto de campaña",
+            "updated_at": NOW.isoformat(),
+        }
+
+
+class FakeAuditoriasRepo:
+    def __init__(self):
+        self.rows = {}
+
+    async def insert(self, data):
+        row = {**data, "id": str(len(self.rows) + 1), "created_at": NOW.isoformat()}
+        self.rows[row["id"]] = row
+        return row
+
+    async def get_by_id(self, record_id, **kwargs):
+        return self.rows.get(record_id)
+
+
+class FakeVisionResponse:
+    text = '{"score_conformidad": 0.9}'
+    usage_metadata = None
+
+
+class FakeVisionModels:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def generate_content(self, model, contents):
+        await asyncio.sleep(self.latency)
+        return FakeVisionResponse()
+
+
+class FakeVisionClient:
+    def __init__(self, latency: float):
+        self.aio = type("Aio", (), {"models": FakeVisionModels(latency)})()
+
+
+async def fake_manual(manual_id):
+    return BrandManualResponse(
+        id=manual_id, version=1, nombre="Bench", producto="Galletas", tono="Cercano",
+        público_objetivo="Familias", restricciones="Ninguna", contenido_markdown="## Tono\nCercano",
+        created_at=NOW, updated_at=NOW,
+    )
+
+
+async def fake_context(manual, query=""):
+    return "## Tono\nCercano"
+
+
+async def legacy_read(upload):
+    data = await upload.read()
+    return data, hashlib.sha256(data).hexdigest()
+
+
+def legacy_analyze(analyze):
+    async def wrapper(image_data, brand_manual_context, contenido_text, image_sha256=None):
+        image_base64 = base64.b64encode(image_data).decode("utf-8")
+        return await analyze(
+            image_data=image_base64,
+            brand_manual_context=brand_manual_context,
+            contenido_text=contenido_text,
+        )
+    return wrapper
+
+
+async def _run(label: str, uploads: int, size_mb: float) -> None:
+    # Cada upload es distinto para que no se coalescan en el single-flight.
+    payloads = [os.urandom(int(size_mb * 1024 * 1024)) for _ in range(uploads)]
+    gc.collect()
+    baseline = current_rss()
+    peak = [baseline]
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(stop, peak))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post(
+                "/api/auditoria/image",
+                data={"contenido_id": f"bench-{index}", "force": "true"},
+                files={"image": (f"creative-{index}.bin", payload, "application/octet-stream")},
+            )
+            for index, payload in enumerate(payloads)
+        ))
+        elapsed = time.perf_counter() - start
+
+    stop.set()
+    await sampler
+    ok = sum(1 for r in responses if r.status_code == 200)
+    delta_mb = (peak[0] - baseline) / (1024 * 1024)
+    print(
+        f"{label:<10} ok={ok:<4} tiempo={ms(elapsed)}  rss_base={baseline / 1048576:7.1f} MB  "
+        f"rss_pico={peak[0] / 1048576:7.1f} MB  delta={delta_mb:7.1f} MB  "
+        f"delta/upload={delta_mb / uploads:6.2f} MB"
+    )
+
+
+async def main(uploads: int, size_mb: float, latency: float) -> None:
+    app.dependency_overrides[get_current_user] = lambda: UserResponse(
+        id="bench-admin", email="admin@alicorp.com", nombre="Bench",
+        role="admin", is_active=True, created_at=NOW,
+    )
+    auditoria_router.contenido_repo = FakeContenidoRepo()
+    auditoria_router.auditorias_repo = FakeAuditoriasRepo()
+    auditoria_router.get_brand_manual_by_id = fake_manual
+    auditoria_router.build_brand_context = fake_context
+    gemini_service.gemini_client = FakeVisionClient(latency)
+
+    print(f"{uploads} uploads concurrentes de {size_mb:g} MB, latencia de visión {latency:g} s\n")
+
+    streaming_read = auditoria_router.read_limited_upload
+    streaming_analyze = auditoria_router.analyze_image
+    auditoria_router.read_limited_upload = legacy_read
+    auditoria_router.analyze_image = legacy_analyze(streaming_analyze)
+    await _run("anterior", uploads, size_mb)
+
+    auditoria_router.read_limited_upload = streaming_read
+    auditoria_router.analyze_image = streaming_analyze
+    await _run("streaming", uploads, size_mb)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--uploads", type=int, default=16)
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.uploads, args.size_mb, args.latency))
@@ -52,6 +52,7 @@ CREATE TABLE IF NOT EXISTS auditorias (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     contenido_id UUID REFERENCES contenido(id),
     imagen_url TEXT,
+    imagen_sha256 VARCHAR(64),
     resultado JSONB,
     gemini_analysis TEXT,
     score_conformidad FLOAT,
@@ -59,11 +60,27 @@ CREATE TABLE IF NOT EXISTS auditorias (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Fragmentos de manuales de marca con embeddings (RAG)
+CREATE TABLE IF NOT EXISTS brand_manual_chunks (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    brand_manual_id UUID NOT NULL REFERENCES brand_manuals(id) ON DELETE CASCADE,
+    chunk_index INTEGER NOT NULL,
+    seccion TEXT,
+    contenido TEXT NOT NULL,
+    tokens INTEGER,
+    embedding vector(384) NOT NULL, -- = EMBEDDING_DIMENSION en app/config.py
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Migración: imágenes en blob store direccionado por SHA-256
+ALTER TABLE auditorias ADD COLUMN IF NOT EXISTS imagen_sha256 VARCHAR(64);
+
 -- Políticas RLS (Row Level Security)
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE brand_manuals ENABLE ROW LEVEL SECURITY;
 ALTER TABLE contenido ENABLE ROW LEVEL SECURITY;
 ALTER TABLE auditorias ENABLE ROW LEVEL SECURITY;
+ALTER TABLE brand_manual_chunks ENABLE ROW LEVEL SECURITY;
 
 -- Políticas para users
 CREATE POLICY " users can read all" ON users FOR SELECT USING (true);
@@ -89,6 +106,11 @@ CREATE POLICY " auditorias can insert" ON auditorias FOR INSERT WITH CHECK (true
 CREATE POLICY " auditorias can update" ON auditorias FOR UPDATE USING (true);
 CREATE POLICY " auditorias can delete" ON auditorias FOR DELETE USING (true);
 
+-- Políticas para brand_manual_chunks
+CREATE POLICY " brand_manual_chunks can read all" ON brand_manual_chunks FOR SELECT USING (true);
+CREATE POLICY " brand_manual_chunks can insert" ON brand_manual_chunks FOR INSERT WITH CHECK (true);
+CREATE POLICY " brand_manual_chunks can delete" ON brand_manual_chunks FOR DELETE USING (true);
+
 -- Crear índice para búsquedas por email
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 
@@ -101,6 +123,130 @@ CREATE INDEX IF NOT EXISTS idx_contenido_brand_manual ON contenido(brand_manual_
 -- Crear índice para búsquedas por contenido_id en auditorias
 CREATE INDEX IF NOT EXISTS idx_auditorias_contenido ON auditorias(contenido_id);
 
+-- Índices para paginación keyset (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_brand_manuals_keyset ON brand_manuals(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_contenido_keyset ON contenido(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_contenido_estado_keyset ON contenido(estado, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_auditorias_keyset ON auditorias(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_auditorias_contenido_keyset ON auditorias(contenido_id, created_at DESC, id DESC);
+
+-- Índices para recuperación de fragmentos (RAG)
+CREATE INDEX IF NOT EXISTS idx_brand_manual_chunks_manual ON brand_manual_chunks(brand_manual_id);
+-- Un HNSW global filtra por manual después del escaneo aproximado
+-- (ef_search = 40): con muchos manuales devolvía menos de k fragmentos.
+DROP INDEX IF EXISTS idx_brand_manual_chunks_embedding;
+
+-- Top-k fragmentos de un manual por similitud coseno. Primero se filtra
+-- por manual (índice btree) y se ordena exacto: son pocos fragmentos.
+CREATE OR REPLACE FUNCTION match_brand_manual_chunks(
+    manual_id UUID,
+    query_embedding vector(384),
+    match_count INTEGER DEFAULT 6
+)
+RETURNS TABLE (
+    id UUID,
+    chunk_index INTEGER,
+    seccion TEXT,
+    contenido TEXT,
+    tokens INTEGER,
+    similarity FLOAT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH manual_chunks AS MATERIALIZED (
+        SELECT c.id, c.chunk_index, c.seccion, c.contenido, c.tokens, c.embedding
+        FROM brand_manual_chunks c
+        WHERE c.brand_manual_id = manual_id
+    )
+    SELECT m.id, m.chunk_index, m.seccion, m.contenido, m.tokens,
+           1 - (m.embedding <=> query_embedding) AS similarity
+    FROM manual_chunks m
+    ORDER BY m.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
+
+-- Reemplaza los fragmentos de un manual en una sola transacción. El lock
+-- serializa reindexados concurrentes del mismo manual (sin él, ambos
+-- DELETE ven la tabla sin los inserts del otro y quedan duplicados).
+CREATE OR REPLACE FUNCTION replace_brand_manual_chunks(
+    manual_id UUID,
+    chunks JSONB
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    inserted INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('brand_manual_chunks:' || manual_id::text));
+    DELETE FROM brand_manual_chunks WHERE brand_manual_id = manual_id;
+    INSERT INTO brand_manual_chunks (brand_manual_id, chunk_index, seccion, contenido, tokens, embedding)
+    SELECT manual_id, r.chunk_index, r.seccion, r.contenido, r.tokens, r.embedding::vector
+    FROM jsonb_to_recordset(chunks) AS r(
+        chunk_index INTEGER, seccion TEXT, contenido TEXT, tokens INTEGER, embedding TEXT
+    );
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$$;
+
+-- Estadísticas del dashboard calculadas con agregados (GET /api/stats)
+CREATE OR REPLACE FUNCTION dashboard_stats()
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+SELECT jsonb_build_object(
+    'total_manuals', (SELECT COUNT(*) FROM brand_manuals),
+    'total_contenidos', (SELECT COUNT(*) FROM contenido),
+    'total_auditorias', (SELECT COUNT(*) FROM auditorias),
+    'contenido_por_estado', COALESCE((
+        SELECT jsonb_object_agg(estado, total)
+        FROM (SELECT estado, COUNT(*) AS total FROM contenido WHERE estado IS NOT NULL GROUP BY estado) e
+    ), '{}'::jsonb),
+    'contenido_por_tipo', COALESCE((
+        SELECT jsonb_object_agg(tipo, total)
+        FROM (SELECT tipo, COUNT(*) AS total FROM contenido WHERE tipo IS NOT NULL GROUP BY tipo) t
+    ), '{}'::jsonb),
+    'contenido_por_manual', COALESCE((
+        SELECT jsonb_agg(
+            jsonb_build_object('brand_manual_id', id, 'nombre', nombre, 'total', total)
+            ORDER BY total DESC
+        )
+        FROM (
+            SELECT m.id, m.nombre, COUNT(c.id) AS total
+            FROM brand_manuals m
+            LEFT JOIN contenido c ON c.brand_manual_id = m.id
+            GROUP BY m.id, m.nombre
+        ) pm
+    ), '[]'::jsonb),
+    'auditorias', (
+        SELECT jsonb_build_object(
+            'promedio_score', AVG(score_conformidad),
+            'minimo_score', MIN(score_conformidad),
+            'maximo_score', MAX(score_conformidad),
+            'cumple', COUNT(*) FILTER (WHERE score_conformidad >= 0.7),
+            'no_cumple', COUNT(*) FILTER (WHERE score_conformidad < 0.7),
+            'distribucion', COALESCE((
+                SELECT jsonb_agg(
+                    jsonb_build_object('desde', (bucket - 1) / 10.0, 'hasta', bucket / 10.0, 'total', total)
+                    ORDER BY bucket
+                )
+                FROM (
+                    SELECT LEAST(GREATEST(width_bucket(score_conformidad, 0, 1, 10), 1), 10) AS bucket,
+                           COUNT(*) AS total
+                    FROM auditorias
+                    WHERE score_conformidad IS NOT NULL
+                    GROUP BY 1
+                ) d
+            ), '[]'::jsonb)
+        )
+        FROM auditorias
+    )
+);
+$$;
+
 -- Insertar usuario de prueba (admin)
 -- Password: admin123 (hash generado)
 INSERT INTO users (email, password_hash, nombre, role)
@@ -0,0 +1,40 @@
+"""
+Indexa (o reindexa) los fragmentos y embeddings de los manuales de marca
+existentes en `brand_manual_chunks`.
+
+Uso (desde backend/):
+    python -m scripts.index_brand_manuals [--manual-id <uuid>]
+"""
+import argparse
+import asyncio
+
+from app.database import close_async_supabase
+from app.models.brand_manual import BrandManualResponse
+from app.repositories import brand_manuals_repo
+from app.services.rag_engine import index_brand_manual
+
+
+async def main(manual_id: str = None) -> None:
+    if manual_id:
+        rows = [await brand_manuals_repo.get_by_id(manual_id)]
+    else:
+        rows = await brand_manuals_repo.list()
+
+    total = 0
+    for row in rows:
+        if not row:
+            continue
+        manual = BrandManualResponse(**row)
+        count = await index_brand_manual(manual)
+        total += count
+        print(f"{manual.id} ({manual.nombre}): {count} fragmentos")
+
+    print(f"Manuales indexados: {len([r for r in rows if r])}, fragmentos: {total}")
+    await close_async_supabase()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--manual-id")
+    args = parser.parse_args()
+    asyncio.run(main(args.manual_id))
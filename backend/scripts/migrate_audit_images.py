@@ -0,0 +1,62 @@
+"""
+Migra las imágenes de auditoría guardadas como data URL base64 en
+`auditorias.imagen_url` al blob store direccionado por SHA-256.
+
+Por cada fila: decodifica la imagen, la escribe en el blob store, guarda el
+hash en `imagen_sha256` y limpia `imagen_url`. Es idempotente y reanudable.
+
+Uso (desde backend/):
+    python -m scripts.migrate_audit_images --batch-size 50 [--dry-run]
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+
+from app.database import close_async_supabase
+from app.repositories import auditorias_repo
+from app.services.blob_store import get_blob_store
+from app.services.media import sniff_mime_type
+
+
+async def migrate(batch_size: int, dry_run: bool) -> None:
+    store = get_blob_store()
+    migrated = failed = bytes_moved = 0
+    after_id = None
+
+    while True:
+        rows = await auditorias_repo.list_legacy_images(after_id, batch_size)
+        if not rows:
+            break
+
+        for row in rows:
+            after_id = row["id"]
+            _, _, payload = row["imagen_url"].partition(",")
+            try:
+                image_bytes = base64.b64decode(payload, validate=True)
+            except (binascii.Error, ValueError) as e:
+                failed += 1
+                print(f"[error] {row['id']}: data URL inválida ({e})")
+                continue
+
+            if not dry_run:
+                image_sha256 = await store.put(image_bytes, content_type=sniff_mime_type(image_bytes))
+                await auditorias_repo.update(
+                    row["id"], {"imagen_sha256": image_sha256, "imagen_url": None}
+                )
+            migrated += 1
+            bytes_moved += len(image_bytes)
+
+        print(f"... {migrated} migradas, {failed} con error")
+
+    action = "a migrar" if dry_run else "migradas"
+    print(f"Filas {action}: {migrated} ({bytes_moved / 1024 / 1024:.1f} MB). Errores: {failed}")
+    await close_async_supabase()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.batch_size, args.dry_run))
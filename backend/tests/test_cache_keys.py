@@ -0,0 +1,48 @@
+from app.services.audit_cache import make_audit_cache_key
+from app.services.llm_cache import make_cache_key
+
+AUDIT_ARGS = ("a" * 64, "contenido-1", "2024-05-01T00:00:00", "manual-1", 3, "gemini-2.5-flash")
+
+
+def test_llm_cache_key_is_stable():
+    key = make_cache_key("llama", "system", "prompt", 0.7, 512)
+    assert key == make_cache_key("llama", "system", "prompt", 0.7, 512)
+    assert len(key) == 64
+
+
+def test_llm_cache_key_covers_every_parameter():
+    base = ("llama", "system", "prompt", 0.7, 512)
+    variants = [
+        ("otro", "system", "prompt", 0.7, 512),
+        ("llama", "otro", "prompt", 0.7, 512),
+        ("llama", "system", "otro", 0.7, 512),
+        ("llama", "system", "prompt", 0.2, 512),
+        ("llama", "system", "prompt", 0.7, 256),
+    ]
+    keys = {make_cache_key(*args) for args in [base, *variants]}
+    assert len(keys) == len(variants) + 1
+
+
+def test_llm_cache_key_does_not_collide_on_concatenation():
+    assert make_cache_key("m", "ab", "c", 0.7, 1) != make_cache_key("m", "a", "bc", 0.7, 1)
+
+
+def test_audit_cache_key_changes_with_content_manual_or_model():
+    key = make_audit_cache_key(*AUDIT_ARGS)
+    for position, value in [
+        (0, "b" * 64),
+        (2, "2024-05-02T00:00:00"),
+        (4, 4),
+        (5, "otro-modelo"),
+    ]:
+        args = list(AUDIT_ARGS)
+        args[position] = value
+        assert make_audit_cache_key(*args) != key
+
+
+def test_audit_cache_key_treats_missing_updated_at_as_empty():
+    args = list(AUDIT_ARGS)
+    args[2] = None
+    with_none = make_audit_cache_key(*args)
+    args[2] = ""
+    assert make_audit_cache_key(*args) == with_none
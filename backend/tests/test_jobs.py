@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from app.models.job import EstadoJob
+from app.services.jobs import JobQueue, JobStateError, SQLiteJobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_conditional_update_only_wins_once(store):
+    job = store.create("auditoria", {"n": 1}, "u1")
+
+    cancelled = store.update(
+        job["id"], expected_estado=EstadoJob.EN_COLA.value, estado=EstadoJob.CANCELADO.value
+    )
+    claimed = store.update(
+        job["id"], expected_estado=EstadoJob.EN_COLA.value, estado=EstadoJob.EJECUTANDO.value
+    )
+
+    assert cancelled is True
+    assert claimed is False
+    assert store.get(job["id"])["estado"] == EstadoJob.CANCELADO.value
+
+
+def test_recover_fails_running_jobs_and_requeues_pending(store):
+    running = store.create("auditoria", {}, None)
+    queued = store.create("auditoria", {}, None)
+    store.update(running["id"], estado=EstadoJob.EJECUTANDO.value)
+
+    assert store.recover() == [queued["id"]]
+    assert store.get(running["id"])["estado"] == EstadoJob.FALLIDO.value
+    assert store.counts() == {EstadoJob.FALLIDO.value: 1, EstadoJob.EN_COLA.value: 1}
+
+
+def test_cancel_before_claim_skips_the_handler(store):
+    calls = []
+
+    async def handler(payload):
+        calls.append(payload)
+        return {}
+
+    async def scenario():
+        queue = JobQueue(store, workers=1, timeout_seconds=5)
+        queue.register("auditoria", handler)
+        job = await asyncio.to_thread(store.create, "auditoria", {"n": 1}, "u1")
+        cancelled = await queue.cancel(job["id"])
+        # El worker lo lee después de la cancelación: el claim condicional falla.
+        await queue._run(job["id"])
+        stats = await queue.stats()
+        return cancelled, stats
+
+    cancelled, stats = asyncio.run(scenario())
+
+    assert cancelled["estado"] == EstadoJob.CANCELADO.value
+    assert calls == []
+    assert stats["cancelled"] == 1
+    assert stats["stored"] == {EstadoJob.CANCELADO.value: 1}
+
+
+def test_cancel_while_running_cancels_the_task(store):
+    async def scenario():
+        started = asyncio.Event()
+
+        async def handler(payload):
+            started.set()
+            await asyncio.sleep(60)
+            return {}
+
+        queue = JobQueue(store, workers=1, timeout_seconds=60)
+        queue.register("auditoria", handler)
+        job = await queue.submit("auditoria", {}, "u1")
+        await asyncio.wait_for(started.wait(), 5)
+        await queue.cancel(job["id"])
+        for _ in range(100):
+            current = await queue.get(job["id"])
+            if current["estado"] == EstadoJob.CANCELADO.value:
+                break
+            await asyncio.sleep(0.01)
+        with pytest.raises(JobStateError):
+            await queue.cancel(job["id"])
+        await queue.stop()
+        return current
+
+    job = asyncio.run(scenario())
+
+    assert job["estado"] == EstadoJob.CANCELADO.value
+    assert job["intentos"] == 1
@@ -0,0 +1,110 @@
+import asyncio
+import base64
+import json
+import uuid
+
+import pytest
+
+from app.repositories.base import BaseRepository
+from app.repositories.pagination import (
+    InvalidCursorError,
+    InvalidFieldsError,
+    decode_cursor,
+    encode_cursor,
+    resolve_columns,
+)
+
+RECORD_ID = str(uuid.uuid4())
+CREATED_AT = "2024-05-01T12:30:00.123456+00:00"
+
+
+def _raw_cursor(payload) -> str:
+    encoded = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(encoded).decode("ascii").rstrip("=")
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor({"created_at": CREATED_AT, "id": RECORD_ID})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (CREATED_AT, RECORD_ID)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "no-es-base64!!",
+        _raw_cursor({"created_at": CREATED_AT}),
+        _raw_cursor([CREATED_AT]),
+        _raw_cursor([CREATED_AT, RECORD_ID, "extra"]),
+        _raw_cursor([123, RECORD_ID]),
+        # Operadores de PostgREST inyectados en cualquiera de las dos claves
+        _raw_cursor([f'{CREATED_AT}",id.gt.0', RECORD_ID]),
+        _raw_cursor([CREATED_AT, f"{RECORD_ID}),or(id.gt.0"]),
+        _raw_cursor([CREATED_AT, "1 or 1=1"]),
+    ],
+)
+def test_decode_cursor_rejects_malformed_or_injected_values(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_resolve_columns_always_includes_sort_key():
+    assert resolve_columns(None, ["titulo", "estado"], ["titulo"]) == "id,created_at,titulo"
+    assert resolve_columns("estado, id", ["id", "estado"], []) == "id,created_at,estado"
+
+
+def test_resolve_columns_rejects_unknown_fields():
+    with pytest.raises(InvalidFieldsError):
+        resolve_columns("titulo,password_hash", ["titulo"], [])
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return record
+
+    async def execute(self):
+        limit = next(args[0] for name, args, _ in self.calls if name == "limit")
+        return type("Response", (), {"data": self.rows[:limit]})()
+
+
+class FakeRepository(BaseRepository):
+    table_name = "contenido"
+
+    def __init__(self, rows):
+        self.query = FakeQuery(rows)
+
+    def table(self):
+        return self.query
+
+
+def test_page_applies_keyset_filter_and_returns_next_cursor():
+    rows = [{"id": str(uuid.uuid4()), "created_at": f"2024-05-0{day}T00:00:00"} for day in (3, 2, 1)]
+    repo = FakeRepository(rows)
+    cursor = encode_cursor({"created_at": CREATED_AT, "id": RECORD_ID})
+
+    page, next_cursor = asyncio.run(repo.page(filters={"estado": "pendiente"}, limit=2, cursor=cursor))
+
+    assert page == rows[:2]
+    assert decode_cursor(next_cursor) == (rows[1]["created_at"], rows[1]["id"])
+    calls = {name: args for name, args, _ in repo.query.calls}
+    assert calls["eq"] == ("estado", "pendiente")
+    assert calls["or_"] == (
+        f'created_at.lt."{CREATED_AT}",'
+        f'and(created_at.eq."{CREATED_AT}",id.lt.{RECORD_ID})',
+    )
+    assert calls["limit"] == (3,)
+
+
+def test_last_page_has_no_cursor():
+    rows = [{"id": RECORD_ID, "created_at": CREATED_AT}]
+    page, next_cursor = asyncio.run(FakeRepository(rows).page(limit=2))
+    assert page == rows
+    assert next_cursor is None
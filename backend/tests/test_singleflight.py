@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        results = await asyncio.gather(*(flight.do("k", upstream) for _ in range(5)))
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(scenario())
+
+    assert results == ["ok"] * 5
+    assert calls == 1
+    assert flight.stats()["saved_calls"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def upstream():
+            await release.wait()
+            return 42
+
+        first = asyncio.create_task(flight.do("k", upstream))
+        second = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return flight, await second
+
+    flight, result = asyncio.run(scenario())
+
+    assert result == 42
+    assert flight.stats()["cancelled_waiters"] == 1
+    assert flight.stats()["abandoned"] == 0
+
+
+def test_last_waiter_cancelled_cancels_upstream():
+    async def scenario():
+        flight = SingleFlight()
+        upstream_cancelled = asyncio.Event()
+
+        async def upstream():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                upstream_cancelled.set()
+                raise
+
+        waiter = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.wait_for(upstream_cancelled.wait(), 1)
+        return flight
+
+    flight = asyncio.run(scenario())
+
+    assert flight.stats()["abandoned"] == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_failure_is_shared_and_not_cached():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            raise RuntimeError("upstream caído")
+
+        results = await asyncio.gather(
+            flight.do("k", upstream), flight.do("k", upstream), return_exceptions=True
+        )
+        with pytest.raises(RuntimeError):
+            await flight.do("k", upstream)
+        return calls, results
+
+    calls, results = asyncio.run(scenario())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert calls == 2
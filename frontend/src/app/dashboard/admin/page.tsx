@@ -1,8 +1,8 @@
 'use client';
 
 import { useEffect, useState } from 'react';
-import { brandApi, contenidoApi, auditoriaApi } from '@/lib/api';
-import { BrandManual, Contenido, Auditoria } from '@/types';
+import { brandApi, statsApi } from '@/lib/api';
+import { BrandManual, DashboardStats, StatsResponse } from '@/types';
 import { 
   DashboardLayout, 
   Card, 
@@ -18,16 +18,17 @@ import { useAuth } from '@/hooks';
 const ALLOWED_ROLES_ADMIN: ("admin")[] = ["admin"];
 
 /**
- * Calcula las estadísticas del dashboard
+ * Adapta los agregados del servidor a las estadísticas del dashboard
  */
-function calculateStats(manuals: BrandManual[], contenidos: Contenido[], auditorias: Auditoria[]) {
+function toDashboardStats(stats: StatsResponse | null): DashboardStats {
+  const porEstado = stats?.contenido_por_estado ?? {};
   return {
-    totalManuals: manuals.length,
-    totalContenidos: contenidos.length,
-    pendientes: contenidos.filter(c => c.estado === 'pendiente').length,
-    aprobados: contenidos.filter(c => c.estado === 'aprobado').length,
-    rechazados: contenidos.filter(c => c.estado === 'rechazado').length,
-    auditorias: auditorias.length
+    totalManuals: stats?.total_manuals ?? 0,
+    totalContenidos: stats?.total_contenidos ?? 0,
+    pendientes: porEstado.pendiente ?? 0,
+    aprobados: porEstado.aprobado ?? 0,
+    rechazados: porEstado.rechazado ?? 0,
+    auditorias: stats?.total_auditorias ?? 0
   };
 }
 
@@ -37,20 +38,20 @@ export default function AdminPage() {
   });
 
   const [manuals, setManuals] = useState<BrandManual[]>([]);
-  const [contenidos, setContenidos] = useState<Contenido[]>([]);
-  const [auditorias, setAuditorias] = useState<Auditoria[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [serverStats, setServerStats] = useState<StatsResponse | null>(null);
   const [loading, setLoading] = useState(true);
 
   const loadData = async () => {
     try {
-      const [manualsData, contenidoData, auditoriasData] = await Promise.all([
-        brandApi.listManuals(),
-        contenidoApi.list(),
-        auditoriaApi.list()
+      const [manualsPage, statsData] = await Promise.all([
+        brandApi.listManuals(true),
+        statsApi.get()
       ]);
-      setManuals(manualsData);
-      setContenidos(contenidoData);
-      setAuditorias(auditoriasData);
+      setManuals(manualsPage.items);
+      setNextCursor(manualsPage.nextCursor);
+      setServerStats(statsData);
     } catch (err) {
       console.error('Error loading data:', err);
     } finally {
@@ -64,6 +65,20 @@ export default function AdminPage() {
     }
   }, [user]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await brandApi.listManuals(true, nextCursor);
+      setManuals(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Error loading manuals:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDeleteManual = async (id: string) => {
     if (!confirm('¿Está seguro de eliminar este manual?')) return;
     try {
@@ -74,7 +89,7 @@ export default function AdminPage() {
     }
   };
 
-  const stats = calculateStats(manuals, contenidos, auditorias);
+  const stats = toDashboardStats(serverStats);
 
   return (
     <DashboardLayout user={user} title="Content Suite - Administrador" loading={authLoading}>
@@ -99,6 +114,17 @@ export default function AdminPage() {
                 loading={loading}
                 emptyMessage="No hay manuales"
               />
+              {nextCursor && (
+                <Button
+                  variant="outline"
+                  size="sm"
+                  className="w-full mt-3"
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? 'Cargando...' : 'Cargar más'}
+                </Button>
+              )}
             </CardContent>
           </Card>
 
@@ -1,8 +1,8 @@
 'use client';
 
 import { useEffect, useState } from 'react';
-import { contenidoApi } from '@/lib/api';
-import { Contenido } from '@/types';
+import { contenidoApi, statsApi } from '@/lib/api';
+import { Contenido, StatsResponse } from '@/types';
 import { 
   DashboardLayout, 
   Card, 
@@ -26,6 +26,9 @@ export default function AprobadorAPage() {
   });
 
   const [contenidos, setContenidos] = useState<Contenido[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [porEstado, setPorEstado] = useState<StatsResponse['contenido_por_estado']>({});
   const [loading, setLoading] = useState(true);
   const [selectedContent, setSelectedContent] = useState<Contenido | null>(null);
   const [rejectReason, setRejectReason] = useState('');
@@ -35,8 +38,13 @@ export default function AprobadorAPage() {
 
   const loadContenidos = async () => {
     try {
-      const data = await contenidoApi.list();
-      setContenidos(data);
+      const [page, stats] = await Promise.all([
+        contenidoApi.list('pendiente'),
+        statsApi.get()
+      ]);
+      setContenidos(page.items);
+      setNextCursor(page.nextCursor);
+      setPorEstado(stats.contenido_por_estado);
     } catch (err) {
       console.error('Error loading contenidos:', err);
     } finally {
@@ -44,12 +52,37 @@ export default function AprobadorAPage() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await contenidoApi.list('pendiente', false, nextCursor);
+      setContenidos(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Error loading contenidos:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     if (user) {
       loadContenidos();
     }
   }, [user]);
 
+  // El listado trae la proyección resumida; el detalle pide el contenido completo.
+  const handleSelect = async (contenido: Contenido) => {
+    setSelectedContent(contenido);
+    try {
+      const full: Contenido = await contenidoApi.get(contenido.id);
+      setSelectedContent(prev => (prev?.id === full.id ? full : prev));
+    } catch (err) {
+      console.error('Error loading contenido:', err);
+    }
+  };
+
   const handleApprove = async (id: string) => {
     setProcessing(true);
     setError('');
@@ -87,17 +120,15 @@ export default function AprobadorAPage() {
     }
   };
 
-  const pendingContents = contenidos.filter(c => c.estado === 'pendiente');
-
   return (
     <DashboardLayout user={user} title="Content Suite - Aprobador A" loading={authLoading}>
       <div className="space-y-6">
         <h1 className="text-2xl font-bold text-gray-900">Panel de Aprobación de Contenido</h1>
         
         <StatGrid>
-          <StatsCard value={pendingContents.length} label="Pendientes" valueColor="text-warning" />
-          <StatsCard value={contenidos.filter(c => c.estado === 'aprobado').length} label="Aprobados" valueColor="text-success" />
-          <StatsCard value={contenidos.filter(c => c.estado === 'rechazado').length} label="Rechazados" valueColor="text-danger" />
+          <StatsCard value={porEstado.pendiente ?? 0} label="Pendientes" valueColor="text-warning" />
+          <StatsCard value={porEstado.aprobado ?? 0} label="Aprobados" valueColor="text-success" />
+          <StatsCard value={porEstado.rechazado ?? 0} label="Rechazados" valueColor="text-danger" />
         </StatGrid>
 
         {error && <Alert variant="error" onClose={() => setError('')}>{error}</Alert>}
@@ -110,11 +141,22 @@ export default function AprobadorAPage() {
             </CardHeader>
             <CardContent>
               <ContentList
-                contenidos={pendingContents}
+                contenidos={contenidos}
                 selectedId={selectedContent?.id}
-                onSelect={setSelectedContent}
+                onSelect={handleSelect}
                 emptyMessage="No hay contenido pendiente"
               />
+              {nextCursor && (
+                <Button
+                  variant="outline"
+                  size="sm"
+                  className="w-full mt-3"
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? 'Cargando...' : 'Cargar más'}
+                </Button>
+              )}
             </CardContent>
           </Card>
 
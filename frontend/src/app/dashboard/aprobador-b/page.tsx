@@ -48,11 +48,11 @@ export default function AprobadorBPage() {
 
   const loadData = async () => {
     try {
-      const [contenidosData, auditoriasData] = await Promise.all([
-        contenidoApi.list('aprobado'),
-        auditoriaApi.list()
+      const [contenidosPage, auditoriasData] = await Promise.all([
+        contenidoApi.list('aprobado', true),
+        auditoriaApi.list(20, true)
       ]);
-      setContenidos(contenidosData);
+      setContenidos(contenidosPage.items);
       setAuditorias(auditoriasData);
     } catch (err) {
       console.error('Error loading data:', err);
@@ -101,10 +101,9 @@ export default function AprobadorBPage() {
         }
       });
       if (response.ok) {
-        let imagenBase64 = await response.text();
-        imagenBase64 = imagenBase64.replace(/^"|"$/g, '');
-        setImagenesCache(prev => ({ ...prev, [auditoriaId]: imagenBase64 }));
-        return imagenBase64;
+        const imagenUrl = URL.createObjectURL(await response.blob());
+        setImagenesCache(prev => ({ ...prev, [auditoriaId]: imagenUrl }));
+        return imagenUrl;
       }
       return null;
     } catch (err) {
@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import axios from "axios";
-import { brandApi, contenidoApi } from "@/lib/api";
+import { brandApi, contenidoApi, MANUAL_PICKER_FIELDS } from "@/lib/api";
 import { BrandManual, Contenido } from "@/types";
 import {
   DashboardLayout,
@@ -34,7 +34,11 @@ export default function CreadorPage() {
   const router = useRouter();
 
   const [manuals, setManuals] = useState<BrandManual[]>([]);
+  const [manualsCursor, setManualsCursor] = useState<string | null>(null);
+  const [manualOptions, setManualOptions] = useState<BrandManual[]>([]);
   const [contenidos, setContenidos] = useState<Contenido[]>([]);
+  const [contenidosCursor, setContenidosCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState<"manuals" | "contenido">(
     "manuals",
@@ -60,12 +64,17 @@ export default function CreadorPage() {
 
   const loadData = async () => {
     try {
-      const [manualsData, contenidoData] = await Promise.all([
-        brandApi.listManuals(),
-        contenidoApi.list(),
+      const [manualsPage, options, contenidoPage] = await Promise.all([
+        brandApi.listManuals(true),
+        // El selector necesita todos los manuales, pero solo id/nombre/producto.
+        brandApi.listAllManuals(MANUAL_PICKER_FIELDS),
+        contenidoApi.list(undefined, true),
       ]);
-      setManuals(manualsData);
-      setContenidos(contenidoData);
+      setManuals(manualsPage.items);
+      setManualsCursor(manualsPage.nextCursor);
+      setManualOptions(options);
+      setContenidos(contenidoPage.items);
+      setContenidosCursor(contenidoPage.nextCursor);
     } catch (err) {
       console.error("Error loading data:", err);
     } finally {
@@ -73,6 +82,34 @@ export default function CreadorPage() {
     }
   };
 
+  const loadMoreManuals = async () => {
+    if (!manualsCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await brandApi.listManuals(true, manualsCursor);
+      setManuals((prev) => [...prev, ...page.items]);
+      setManualsCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error loading manuals:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const loadMoreContenidos = async () => {
+    if (!contenidosCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await contenidoApi.list(undefined, true, contenidosCursor);
+      setContenidos((prev) => [...prev, ...page.items]);
+      setContenidosCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error loading contenidos:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     if (user) {
       loadData();
@@ -247,6 +284,17 @@ export default function CreadorPage() {
                   loading={loading}
                   emptyMessage="No hay manuales creados aún"
                 />
+                {manualsCursor && (
+                  <Button
+                    variant="outline"
+                    size="sm"
+                    className="w-full mt-3"
+                    onClick={loadMoreManuals}
+                    disabled={loadingMore}
+                  >
+                    {loadingMore ? "Cargando..." : "Cargar más"}
+                  </Button>
+                )}
               </CardContent>
             </Card>
           </div>
@@ -271,7 +319,7 @@ export default function CreadorPage() {
                     }
                     required
                     placeholder="Seleccionar manual..."
-                    options={manuals.map((m) => ({
+                    options={manualOptions.map((m) => ({
                       value: m.id,
                       label: `${m.nombre} - ${m.producto}`,
                     }))}
@@ -302,7 +350,7 @@ export default function CreadorPage() {
                   />
                   <Button
                     type="submit"
-                    disabled={creatingContent || manuals.length === 0}
+                    disabled={creatingContent || manualOptions.length === 0}
                     className="w-full"
                   >
                     {creatingContent ? "Generando..." : "Generar Contenido"}
@@ -347,6 +395,17 @@ export default function CreadorPage() {
                     ))}
                   </div>
                 )}
+                {contenidosCursor && (
+                  <Button
+                    variant="outline"
+                    size="sm"
+                    className="w-full mt-3"
+                    onClick={loadMoreContenidos}
+                    disabled={loadingMore}
+                  >
+                    {loadingMore ? "Cargando..." : "Cargar más"}
+                  </Button>
+                )}
               </CardContent>
             </Card>
           </div>
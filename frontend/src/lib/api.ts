@@ -1,5 +1,6 @@
-import axios from 'axios';
+import axios, { AxiosResponse } from 'axios';
 import Cookies from 'js-cookie';
+import { BrandManual, Contenido, Page } from '@/types';
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -18,6 +19,50 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+/**
+ * Los listados devuelven por defecto una proyección resumida (sin textos
+ * largos ni imágenes). Estas listas piden todos los campos vía `fields=`.
+ */
+const MANUAL_FULL_FIELDS = [
+  'nombre', 'producto', 'tono', 'público_objetivo', 'restricciones',
+  'contenido_markdown', 'version', 'created_by', 'updated_at',
+];
+const CONTENIDO_FULL_FIELDS = [
+  'brand_manual_id', 'tipo', 'titulo', 'contenido_text', 'estado',
+  'aprobado_por', 'rechazo_razon', 'created_by', 'updated_at',
+];
+/** Campos mínimos para selectores de manual (sin `contenido_markdown`). */
+export const MANUAL_PICKER_FIELDS = ['nombre', 'producto'];
+const AUDITORIA_FULL_FIELDS = [
+  'contenido_id', 'imagen_sha256', 'resultado', 'gemini_analysis',
+  'score_conformidad', 'audited_by',
+];
+
+/**
+ * Los listados paginan por cursor keyset: la página siguiente se pide con
+ * el valor del header `X-Next-Cursor` de la respuesta anterior.
+ */
+function toPage<T>(response: AxiosResponse<T[]>): Page<T> {
+  const cursor = response.headers['x-next-cursor'];
+  return {
+    items: response.data,
+    nextCursor: typeof cursor === 'string' && cursor ? cursor : null,
+  };
+}
+
+async function listManualsPage(
+  full: boolean = false,
+  cursor?: string | null,
+  fields?: string[],
+): Promise<Page<BrandManual>> {
+  const params: Record<string, string> = {};
+  const projection = fields ?? (full ? MANUAL_FULL_FIELDS : null);
+  if (projection) params.fields = projection.join(',');
+  if (cursor) params.cursor = cursor;
+  const response = await api.get('/api/brand/manual', { params });
+  return toPage(response);
+}
+
 export const authApi = {
   login: async (email: string, password: string) => {
     const response = await api.post('/api/auth/login', { email, password });
@@ -54,9 +99,20 @@ export const brandApi = {
     return response.data;
   },
 
-  listManuals: async () => {
-    const response = await api.get('/api/brand/manual');
-    return response.data;
+  listManuals: listManualsPage,
+
+  /**
+   * Recorre todas las páginas (los manuales son pocos); para selectores.
+   */
+  listAllManuals: async (fields?: string[]): Promise<BrandManual[]> => {
+    const manuals: BrandManual[] = [];
+    let cursor: string | null = null;
+    do {
+      const page = await listManualsPage(false, cursor, fields);
+      manuals.push(...page.items);
+      cursor = page.nextCursor;
+    } while (cursor);
+    return manuals;
   },
 
   getManual: async (id: string) => {
@@ -80,10 +136,17 @@ export const contenidoApi = {
     return response.data;
   },
 
-  list: async (estado?: string) => {
-    const params = estado ? { estado } : {};
+  list: async (
+    estado?: string,
+    full: boolean = false,
+    cursor?: string | null,
+  ): Promise<Page<Contenido>> => {
+    const params: Record<string, string> = {};
+    if (estado) params.estado = estado;
+    if (full) params.fields = CONTENIDO_FULL_FIELDS.join(',');
+    if (cursor) params.cursor = cursor;
     const response = await api.get('/api/contenido/', { params });
-    return response.data;
+    return toPage(response);
   },
 
   get: async (id: string) => {
@@ -121,15 +184,24 @@ export const auditoriaApi = {
     return response.data;
   },
 
-  list: async (limit: number = 20) => {
-    const response = await api.get('/api/auditoria/', { params: { limit } });
+  list: async (limit: number = 20, full: boolean = false) => {
+    const params: Record<string, string | number> = { limit };
+    if (full) params.fields = AUDITORIA_FULL_FIELDS.join(',');
+    const response = await api.get('/api/auditoria/', { params });
     return response.data;
   },
 
-  getImageBase64: async (auditoriaId: string) => {
+  getImage: async (auditoriaId: string): Promise<Blob> => {
     const response = await api.get(`/api/auditoria/${auditoriaId}/imagen`, {
-      responseType: 'text',
+      responseType: 'blob',
     });
     return response.data;
   },
 };
+
+export const statsApi = {
+  get: async () => {
+    const response = await api.get('/api/stats');
+    return response.data;
+  },
+};
@@ -39,6 +39,7 @@ export interface Auditoria {
   id: string;
   contenido_id: string;
   imagen_url?: string;
+  imagen_sha256?: string;
   resultado?: {
     cumple: boolean;
     score: number;
@@ -49,6 +50,16 @@ export interface Auditoria {
   created_at: string;
 }
 
+/**
+ * Página de un listado con paginación keyset
+ */
+export interface Page<T> {
+  /** Filas de la página */
+  items: T[];
+  /** Cursor de la página siguiente (header `X-Next-Cursor`); null si no hay más */
+  nextCursor: string | null;
+}
+
 export interface AuthResponse {
   access_token: string;
   token_type: string;
@@ -83,6 +94,27 @@ export interface DashboardStats {
   auditorias: number;
 }
 
+/**
+ * Respuesta de GET /api/stats (agregados calculados en el servidor)
+ */
+export interface StatsResponse {
+  total_manuals: number;
+  total_contenidos: number;
+  total_auditorias: number;
+  contenido_por_estado: Record<string, number>;
+  contenido_por_tipo: Record<string, number>;
+  contenido_por_manual: Array<{ brand_manual_id: string; nombre?: string; total: number }>;
+  auditorias: {
+    promedio_score?: number;
+    minimo_score?: number;
+    maximo_score?: number;
+    cumple: number;
+    no_cumple: number;
+    distribucion: Array<{ desde: number; hasta: number; total: number }>;
+  };
+  generated_at: string;
+}
+
 /**
  * Opciones para configuración de página
  */